@@ -1,12 +1,14 @@
 import streamlit as st
 import google.generativeai as genai
 import os
+import uuid
 from dotenv import load_dotenv
 import logging
 
 from schemas import Message
 from services.stt import listen
 from services.tts import speak
+from services.timing import StageStats, TurnTimer
 
 # --------- Logging Setup ---------
 logging.basicConfig(
@@ -26,7 +28,13 @@ if not GOOGLE_API_KEY:
     st.stop()
 
 # --------- Configure Gemini API ---------
-genai.configure(api_key=GOOGLE_API_KEY)
+# GEMINI_API_ENDPOINT points the client at another host (e.g. a local stub) over REST
+GEMINI_API_ENDPOINT = os.getenv("GEMINI_API_ENDPOINT")
+if GEMINI_API_ENDPOINT:
+    genai.configure(api_key=GOOGLE_API_KEY, transport="rest",
+                    client_options={"api_endpoint": GEMINI_API_ENDPOINT})
+else:
+    genai.configure(api_key=GOOGLE_API_KEY)
 
 st.title("🎤 AI Voice Agent")
 
@@ -35,6 +43,10 @@ if "chat_history" not in st.session_state:
     st.session_state.chat_history = []  # List[Message]
 if "recording" not in st.session_state:
     st.session_state.recording = False  # For Start/Stop toggle
+if "latency" not in st.session_state:
+    st.session_state.latency = StageStats()  # Rolling per-stage timings for this session
+    st.session_state.session_id = uuid.uuid4().hex[:8]
+    st.session_state.turns = 0
 
 FALLBACK_RESPONSE = "I'm having trouble connecting right now."
 
@@ -62,35 +74,57 @@ st.markdown("""
 if st.button("⏺ Start Recording" if not st.session_state.recording else "⏹ Stop Recording"):
     if not st.session_state.recording:
         st.session_state.recording = True
-        user_input = listen()
+        st.session_state.turns += 1
+        timer = TurnTimer(st.session_state.session_id, st.session_state.turns)
+        latency = st.session_state.latency
+        user_input = listen(timer)
         logger.info(f"User input: {user_input}")
 
         if user_input:
             st.session_state.chat_history.append(Message(role="user", text=user_input))
 
             # --------- Map roles for Gemini API ---------
-            gemini_history = []
-            for m in st.session_state.chat_history:
-                # Map 'user' -> 'user', 'ai' -> 'model'
-                role = "user" if m.role == "user" else "model"
-                gemini_history.append({"role": role, "parts": [{"text": m.text}]})
+            with timer.stage("history_build"):
+                gemini_history = []
+                for m in st.session_state.chat_history:
+                    # Map 'user' -> 'user', 'ai' -> 'model'
+                    role = "user" if m.role == "user" else "model"
+                    gemini_history.append({"role": role, "parts": [{"text": m.text}]})
 
             # --------- Get LLM response ---------
+            llm_ok = True
             try:
-                model = genai.GenerativeModel(MODEL_NAME)
-                chat = model.start_chat(history=gemini_history[:-1])  # exclude the latest user input
-                response = chat.send_message(user_input)
+                with timer.stage("llm"):
+                    model = genai.GenerativeModel(MODEL_NAME)
+                    chat = model.start_chat(history=gemini_history[:-1])  # exclude the latest user input
+                    response = chat.send_message(user_input)
                 ai_text = response.text.strip()
                 logger.info(f"AI response: {ai_text}")
             except Exception as e:
                 st.error(f"LLM Error: {e}")
                 logger.error(f"LLM Error: {e}")
                 ai_text = FALLBACK_RESPONSE
+                llm_ok = False
 
             st.session_state.chat_history.append(Message(role="ai", text=ai_text))
-            speak(ai_text)
+
+            # TTS timings are measured from the speak() call; the turn is logged
+            # and added to the session summary when speech finishes
+            tts_called = timer.since_start()
+
+            def on_tts_start():
+                timer.record("tts_start", round(timer.since_start() - tts_called, 1))
+
+            def on_tts_end(error):
+                timer.record("tts_end", round(timer.since_start() - tts_called, 1))
+                latency.add(timer.timings)
+                timer.log(llm_ok=llm_ok, tts_ok=error is None, total_ms=timer.since_start())
+
+            speak(ai_text, on_start=on_tts_start, on_end=on_tts_end)
         else:
             st.warning("❌ Could not understand your voice.")
+            latency.add(timer.timings)
+            timer.log(recognized=False, total_ms=timer.since_start())
 
         st.session_state.recording = False  # Auto-stop after processing
     else:
@@ -98,6 +132,13 @@ if st.button("⏺ Start Recording" if not st.session_state.recording else "⏹ S
         st.info("🛑 Recording stopped.")
         logger.info("Recording stopped by user.")
 
+# --------- Latency by Stage ---------
+latency_rows = st.session_state.latency.summary()
+if latency_rows:
+    with st.expander("⏱ Latency by stage (this session)"):
+        st.table(latency_rows)
+        st.caption("TTS timings of the latest turn appear after speech finishes.")
+
 # --------- Display Chat History ---------
 st.markdown("### 💬 Conversation")
 for msg in st.session_state.chat_history:
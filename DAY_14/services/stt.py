@@ -1,15 +1,18 @@
 import speech_recognition as sr
 import logging
+from contextlib import nullcontext
 
 logger = logging.getLogger(__name__)
 
-def listen():
+def listen(timer=None):
     recognizer = sr.Recognizer()
     with sr.Microphone() as source:
         logger.info("Listening for user input...")
-        audio = recognizer.listen(source)
+        with timer.stage("mic_capture") if timer else nullcontext():
+            audio = recognizer.listen(source)
     try:
-        return recognizer.recognize_google(audio)
+        with timer.stage("recognition") if timer else nullcontext():
+            return recognizer.recognize_google(audio)
     except sr.UnknownValueError:
         logger.warning("Could not understand voice input.")
         return None
@@ -0,0 +1,85 @@
+import json
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Stages of one voice turn, in order
+STAGES = ["mic_capture", "recognition", "history_build", "llm", "tts_start", "tts_end"]
+
+
+class TurnTimer:
+    """
+    Timings (ms) for one button press. Synchronous stages use stage();
+    TTS start/end arrive later from the speech thread via record().
+    """
+
+    def __init__(self, session_id, turn):
+        self.session_id = session_id
+        self.turn = turn
+        self.started = time.perf_counter()
+        self.timings = {}
+
+    @contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = round((time.perf_counter() - started) * 1000, 1)
+
+    def since_start(self):
+        return round((time.perf_counter() - self.started) * 1000, 1)
+
+    def record(self, name, ms):
+        self.timings[name] = ms
+
+    def log(self, **fields):
+        """
+        One structured record per turn: {"event": "voice_turn", ..., "<stage>_ms": ...}
+        """
+        record = {"event": "voice_turn", "session": self.session_id, "turn": self.turn}
+        record.update({f"{name}_ms": ms for name, ms in self.timings.items()})
+        record.update(fields)
+        logger.info(json.dumps(record))
+
+
+class StageStats:
+    """
+    Rolling per-stage latency summary for a session (last `window` turns).
+    Thread-safe: TTS timings are added from the speech thread.
+    """
+
+    def __init__(self, window=50):
+        self.window = window
+        self._samples = {name: deque(maxlen=window) for name in STAGES}
+        self._lock = threading.Lock()
+
+    def add(self, timings):
+        with self._lock:
+            for name, ms in timings.items():
+                self._samples.setdefault(name, deque(maxlen=self.window)).append(ms)
+
+    @staticmethod
+    def _percentile(values, pct):
+        return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+    def summary(self):
+        """
+        [{"stage", "count", "p50_ms", "p95_ms", "max_ms"}, ...] for stages with samples.
+        """
+        rows = []
+        with self._lock:
+            samples = {name: sorted(values) for name, values in self._samples.items() if values}
+        for name, values in samples.items():
+            rows.append({
+                "stage": name,
+                "count": len(values),
+                "p50_ms": self._percentile(values, 50),
+                "p95_ms": self._percentile(values, 95),
+                "max_ms": values[-1],
+            })
+        return rows
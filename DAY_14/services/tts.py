@@ -4,13 +4,28 @@ import threading
 
 logger = logging.getLogger(__name__)
 
-def speak(text: str):
+def speak(text: str, on_start=None, on_end=None):
+    """
+    Speak in a background thread. on_start fires when the utterance begins,
+    on_end(error) when it finishes (error is None on success).
+    """
     def run():
-        engine = pyttsx3.init()
-        engine.say(text)
-        engine.runAndWait()
+        error = None
+        try:
+            engine = pyttsx3.init()
+            if on_start:
+                engine.connect("started-utterance", lambda name: on_start())
+            engine.say(text)
+            engine.runAndWait()
+        except Exception as e:
+            error = e
+            logger.error(f"TTS Error: {e}")
+        if on_end:
+            on_end(error)
     try:
         thread = threading.Thread(target=run)
         thread.start()
     except Exception as e:
         logger.error(f"TTS Error: {e}")
+        if on_end:
+            on_end(e)
@@ -1,545 +1,269 @@
-# # app.py
-# # Import necessary modules from Flask
-# from flask import Flask, render_template, request, jsonify
-# import requests
-# import os
-# from datetime import datetime
-# import time
-
-# # Try to load environment variables from .env file
-# try:
-#     from dotenv import load_dotenv
-#     load_dotenv()
-#     print("✅ Environment variables loaded from .env file")
-# except ImportError:
-#     print("⚠️  python-dotenv not installed. Using system environment variables only.")
-
-# # Initialize the Flask application
-# app = Flask(__name__, static_folder='static', template_folder='templates')
-
-# # Murf API configuration
-# MURF_API_URL = os.getenv('MURF_API_URL', 'https://api.murf.ai/v1/speech/generate')
-# MURF_AUTH_URL = 'https://api.murf.ai/v1/auth/token'
-# MURF_API_KEY = os.getenv('MURF_API_KEY')
-
-# # Cache for auth token (simple in-memory cache)
-# auth_token_cache = {
-#     'token': None,
-#     'expires_at': 0
-# }
-
-# # Validate API key
-# if not MURF_API_KEY:
-#     print("⚠️  WARNING: MURF_API_KEY not found in environment variables!")
-#     print("Please set your API key in the .env file or as an environment variable")
-# else:
-#     print("🔑 Murf API key configured successfully")
-
-# # Define a route for the root URL ('/')
-# @app.route('/')
-# def index():
-#     """
-#     This function handles requests to the root URL.
-#     It renders and returns the 'index.html' template.
-#     """
-#     return render_template('index.html')
-
-# def get_murf_auth_token():
-#     """
-#     Get a valid Murf auth token, generating a new one if needed
-#     """
-#     current_time = int(time.time() * 1000)  # Current time in milliseconds
-    
-#     # Check if we have a valid cached token
-#     if (auth_token_cache['token'] and 
-#         auth_token_cache['expires_at'] > current_time + 60000):  # 1 minute buffer
-#         return auth_token_cache['token']
-    
-#     # Generate a new token
-#     try:
-#         headers = {
-#             'api-key': MURF_API_KEY,
-#             'Content-Type': 'application/json'
-#         }
-        
-#         print("🔑 Generating new Murf auth token...")
-#         response = requests.post(MURF_AUTH_URL, headers=headers, timeout=10)
-        
-#         if response.status_code == 200:
-#             token_data = response.json()
-#             auth_token_cache['token'] = token_data.get('token')
-#             auth_token_cache['expires_at'] = token_data.get('expiryInEpochMillis', 0)
-            
-#             print("✅ Auth token generated successfully")
-#             return auth_token_cache['token']
-#         else:
-#             print(f"❌ Failed to generate auth token: {response.status_code} - {response.text}")
-#             return None
-            
-#     except Exception as e:
-#         print(f"❌ Error generating auth token: {str(e)}")
-#         return None
-
-# @app.route('/tts/voices', methods=['GET'])
-# def get_voices():
-#     """
-#     Get available voices from Murf API
-#     """
-#     if not MURF_API_KEY:
-#         return jsonify({
-#             'error': 'API key not configured',
-#             'success': False
-#         }), 500
-    
-#     try:
-#         headers = {
-#             'api-key': MURF_API_KEY,
-#             'Accept': 'application/json'
-#         }
-        
-#         response = requests.get(
-#             'https://api.murf.ai/v1/speech/voices',
-#             headers=headers,
-#             timeout=10
-#         )
-        
-#         if response.status_code == 200:
-#             voices_data = response.json()
-#             return jsonify({
-#                 'success': True,
-#                 'voices': voices_data,
-#                 'count': len(voices_data) if isinstance(voices_data, list) else 'unknown'
-#             })
-#         else:
-#             return jsonify({
-#                 'success': False,
-#                 'error': f'Failed to fetch voices: {response.status_code}',
-#                 'details': response.text
-#             }), response.status_code
-            
-#     except Exception as e:
-#         return jsonify({
-#             'success': False,
-#             'error': f'Error fetching voices: {str(e)}'
-#         }), 500
-
-# @app.route('/tts/key-test', methods=['GET'])
-# def test_api_key():
-#     """
-#     Test if the API key format is correct
-#     """
-#     if not MURF_API_KEY:
-#         return jsonify({
-#             'error': 'API key not configured',
-#             'success': False
-#         })
-    
-#     return jsonify({
-#         'success': True,
-#         'api_key_format': 'Valid format' if MURF_API_KEY.startswith('ap2_') else 'Check format - should start with ap2_',
-#         'api_key_length': len(MURF_API_KEY),
-#         'api_key_preview': f"{MURF_API_KEY[:8]}...{MURF_API_KEY[-8:]}",
-#         'message': 'API key configuration looks good'
-#     })
-
-# @app.route('/tts/auth-test', methods=['GET'])
-# def test_auth():
-#     """
-#     Test Murf API authentication
-#     """
-#     if not MURF_API_KEY:
-#         return jsonify({
-#             'error': 'Murf API key not configured',
-#             'success': False
-#         }), 500
-    
-#     auth_token = get_murf_auth_token()
-    
-#     if auth_token:
-#         return jsonify({
-#             'success': True,
-#             'message': 'Authentication successful',
-#             'token_preview': f"{auth_token[:10]}...{auth_token[-10:]}",
-#             'expires_at': auth_token_cache['expires_at']
-#         })
-#     else:
-#         return jsonify({
-#             'success': False,
-#             'error': 'Failed to authenticate with Murf API'
-#         }), 401
-
-# @app.route('/tts/test', methods=['GET'])
-# def test_tts_endpoint():
-#     """
-#     Test endpoint to verify TTS functionality is working.
-#     """
-#     return jsonify({
-#         'message': 'TTS endpoint is active',
-#         'status': 'success',
-#         'endpoint': '/tts',
-#         'method': 'POST',
-#         'required_fields': ['text'],
-#         'optional_fields': ['voice_id', 'format', 'speech_rate', 'pitch'],
-#         'api_key_configured': bool(MURF_API_KEY),
-#         'example_request': {
-#             'text': 'Hello, this is a test message for text to speech conversion.',
-#             'voice_id': 'en-US-ken',  # Valid voice ID
-#             'format': 'mp3',
-#             'speech_rate': 0  # Speech rate: -50 (slow) to 50 (fast), 0 = normal
-#         },
-#         'common_voice_ids': [
-#             'en-US-ken',
-#             'en-US-sarah',
-#             'en-US-laura',
-#             'en-US-wayne',
-#             'en-GB-daniel',
-#             'en-AU-nicole'
-#         ],
-#         'test_urls': {
-#             'test_endpoint': '/tts/test',
-#             'auth_test_endpoint': '/tts/auth-test',
-#             'voices_endpoint': '/tts/voices',
-#             'main_endpoint': '/tts'
-#         }
-#     })
-
-# @app.route('/tts', methods=['POST'])
-# def text_to_speech():
-#     """
-#     REST TTS endpoint that accepts text and returns audio URL.
-#     Calls Murf's REST TTS API and returns the generated audio file URL.
-#     """
-#     try:
-#         # Check if API key is configured
-#         if not MURF_API_KEY:
-#             return jsonify({
-#                 'error': 'Murf API key not configured. Please set MURF_API_KEY environment variable.',
-#                 'success': False
-#             }), 500
-        
-#         # Get JSON data from request
-#         data = request.get_json()
-        
-#         # Validate input
-#         if not data or 'text' not in data:
-#             return jsonify({
-#                 'error': 'Missing required field: text',
-#                 'success': False,
-#                 'expected_format': {
-#                     'text': 'Your text to convert to speech',
-#                     'voice_id': 'en-US-ken (optional)',
-#                     'format': 'mp3 (optional)',
-#                     'speech_rate': '0 (optional, -50 to 50)'
-#                 }
-#             }), 400
-        
-#         text_input = data['text']
-        
-#         if not text_input.strip():
-#             return jsonify({
-#                 'error': 'Text cannot be empty',
-#                 'success': False
-#             }), 400
-        
-#         # Try direct API key authentication first (simpler approach)
-#         headers = {
-#             'api-key': MURF_API_KEY,
-#             'Content-Type': 'application/json',
-#             'Accept': 'application/json'
-#         }
-        
-#         # Use a valid voice ID - changed from en-US-davis to en-US-ken
-#         voice_id = data.get('voice_id', 'en-US-ken')
-        
-#         # Murf API payload (adjust parameters as needed)
-#         murf_payload = {
-#             'text': text_input,
-#             'voiceId': voice_id,
-#             'audioFormat': data.get('format', 'MP3').upper(),
-#             'modelVersion': 'GEN2',  # Use Gen2 for better quality
-#             'rate': data.get('speech_rate', 0),  # Speech rate: -50 to 50 (0 = normal speed)
-#             'channelType': 'STEREO'
-#         }
-        
-#         print(f"🎤 Making TTS request for text: '{text_input[:50]}...'")
-#         print(f"🔑 Using API key: {MURF_API_KEY[:10]}...{MURF_API_KEY[-4:]}")
-#         print(f"🎙️ Using voice ID: {voice_id}")
-        
-#         # Make request to Murf API
-#         response = requests.post(
-#             MURF_API_URL,
-#             headers=headers,
-#             json=murf_payload,
-#             timeout=30
-#         )
-        
-#         print(f"📡 Murf API response status: {response.status_code}")
-#         print(f"📝 Response headers: {dict(response.headers)}")
-        
-#         # Handle Murf API response
-#         if response.status_code == 200:
-#             murf_data = response.json()
-#             print(f"✅ Success response: {murf_data}")
-            
-#             # Extract audio URL from Murf response
-#             audio_url = murf_data.get('audioFile') or murf_data.get('audio_url') or murf_data.get('url')
-            
-#             if audio_url:
-#                 return jsonify({
-#                     'success': True,
-#                     'audio_url': audio_url,
-#                     'text_processed': text_input,
-#                     'voice_used': murf_payload['voiceId'],
-#                     'format': murf_payload['audioFormat'],
-#                     'timestamp': datetime.now().isoformat(),
-#                     'characters_used': murf_data.get('charactersUsed', 0),
-#                     'murf_response': murf_data  # Include full response for debugging
-#                 }), 200
-#             else:
-#                 return jsonify({
-#                     'error': 'Audio URL not found in Murf response',
-#                     'success': False,
-#                     'murf_response': murf_data
-#                 }), 500
-        
-#         else:
-#             error_details = response.text
-#             try:
-#                 error_json = response.json()
-#                 error_details = error_json
-#                 print(f"❌ Error response: {error_json}")
-#             except:
-#                 print(f"❌ Raw error response: {error_details}")
-                
-#             return jsonify({
-#                 'error': f'Murf API error: {response.status_code}',
-#                 'success': False,
-#                 'details': error_details,
-#                 'status_code': response.status_code,
-#                 'request_payload': murf_payload,  # Help debug the request
-#                 'suggestion': 'Try using a valid voice ID like: en-US-ken, en-US-sarah, en-US-laura, en-US-wayne'
-#             }), response.status_code
-            
-#     except requests.RequestException as e:
-#         print(f"❌ Network error: {str(e)}")
-#         return jsonify({
-#             'error': f'Network error calling Murf API: {str(e)}',
-#             'success': False
-#         }), 500
-        
-#     except Exception as e:
-#         print(f"❌ Server error: {str(e)}")
-#         return jsonify({
-#             'error': f'Server error: {str(e)}',
-#             'success': False
-#         }), 500
-
-# # Health check endpoint
-# @app.route('/health', methods=['GET'])
-# def health_check():
-#     """
-#     Health check endpoint
-#     """
-#     return jsonify({
-#         'status': 'healthy',
-#         'timestamp': datetime.now().isoformat(),
-#         'endpoints': {
-#             'root': '/',
-#             'tts': '/tts',
-#             'tts_test': '/tts/test',
-#             'voices': '/tts/voices',
-#             'health': '/health',
-#             'docs': '/docs'
-#         }
-#     })
-
-# # Documentation endpoint (Flask equivalent of FastAPI's /docs)
-# @app.route('/docs', methods=['GET'])
-# def api_documentation():
-#     """
-#     API Documentation endpoint - Flask equivalent of FastAPI's /docs
-#     """
-#     port = int(os.getenv('FLASK_PORT', 5001))
-    
-#     docs = {
-#         'title': 'Flask TTS API Documentation',
-#         'description': 'REST API for Text-to-Speech conversion using Murf API',
-#         'version': '1.0.0',
-#         'base_url': f'http://localhost:{port}',
-#         'endpoints': {
-#             'GET /': {
-#                 'description': 'Home page - renders HTML template',
-#                 'response': 'HTML page'
-#             },
-#             'GET /docs': {
-#                 'description': 'API documentation (this page)',
-#                 'response': 'JSON documentation'
-#             },
-#             'GET /health': {
-#                 'description': 'Health check endpoint',
-#                 'response': {
-#                     'status': 'healthy',
-#                     'timestamp': 'ISO timestamp',
-#                     'endpoints': 'Available endpoints list'
-#                 }
-#             },
-#             'GET /tts/voices': {
-#                 'description': 'Get list of available voices from Murf API',
-#                 'response': {
-#                     'success': True,
-#                     'voices': 'Array of voice objects',
-#                     'count': 'Number of voices available'
-#                 }
-#             },
-#             'GET /tts/test': {
-#                 'description': 'Test endpoint to verify TTS functionality',
-#                 'response': {
-#                     'message': 'TTS endpoint is active',
-#                     'status': 'success',
-#                     'common_voice_ids': 'List of valid voice IDs'
-#                 }
-#             },
-#             'POST /tts': {
-#                 'description': 'Convert text to speech using Murf API',
-#                 'method': 'POST',
-#                 'content_type': 'application/json',
-#                 'required_fields': ['text'],
-#                 'optional_fields': ['voice_id', 'format', 'speech_rate', 'pitch'],
-#                 'request_example': {
-#                     'text': 'Hello, this is a test message',
-#                     'voice_id': 'en-US-ken',
-#                     'format': 'mp3',
-#                     'speech_rate': 0
-#                 },
-#                 'valid_voice_ids': [
-#                     'en-US-ken',
-#                     'en-US-sarah',
-#                     'en-US-laura',
-#                     'en-US-wayne',
-#                     'en-GB-daniel',
-#                     'en-AU-nicole'
-#                 ],
-#                 'success_response': {
-#                     'success': True,
-#                     'audio_url': 'https://generated-audio-url.com/file.mp3',
-#                     'text_processed': 'Your input text',
-#                     'voice_used': 'en-US-ken',
-#                     'format': 'mp3',
-#                     'timestamp': 'ISO timestamp'
-#                 },
-#                 'error_response': {
-#                     'success': False,
-#                     'error': 'Error description'
-#                 }
-#             }
-#         },
-#         'quick_test_commands': {
-#             'test_endpoint': f'curl http://localhost:{port}/tts/test',
-#             'get_voices': f'curl http://localhost:{port}/tts/voices',
-#             'tts_conversion': f'curl -X POST http://localhost:{port}/tts -H "Content-Type: application/json" -d \'{{"text": "Hello world!", "voice_id": "en-US-ken"}}\'',
-#             'health_check': f'curl http://localhost:{port}/health'
-#         },
-#         'postman_setup': {
-#             'method': 'POST',
-#             'url': f'http://localhost:{port}/tts',
-#             'headers': {
-#                 'Content-Type': 'application/json'
-#             },
-#             'body': {
-#                 'text': 'Your text to convert to speech',
-#                 'voice_id': 'en-US-ken',
-#                 'format': 'mp3',
-#                 'speech_rate': 0
-#             }
-#         }
-#     }
-    
-#     return jsonify(docs)
-
-# # This block ensures the server runs only when the script is executed directly
-# if __name__ == '__main__':
-#     # Get configuration from environment variables
-#     host = os.getenv('FLASK_HOST', '0.0.0.0')
-#     port = int(os.getenv('FLASK_PORT', 5001))
-#     debug = os.getenv('FLASK_DEBUG', 'True').lower() == 'true'
-    
-#     print("=" * 50)
-#     print("🚀 Flask TTS Server Starting...")
-#     print(f"🌐 Host: {host}")
-#     print(f"🔌 Port: {port}")
-#     print(f"🐛 Debug: {debug}")
-#     print(f"🔑 API Key: {'✅ Configured' if MURF_API_KEY else '❌ Missing'}")
-#     print("=" * 50)
-#     print("📡 Available endpoints:")
-#     print(f"   • Home: http://localhost:{port}/")
-#     print(f"   • API Docs: http://localhost:{port}/docs")
-#     print(f"   • Auth Test: http://localhost:{port}/tts/auth-test")
-#     print(f"   • Voices: http://localhost:{port}/tts/voices")
-#     print(f"   • TTS Test: http://localhost:{port}/tts/test")
-#     print(f"   • TTS API: http://localhost:{port}/tts")
-#     print(f"   • Health: http://localhost:{port}/health")
-#     print("=" * 50)
-    
-#     # Run the app with environment configuration
-#     app.run(host=host, port=port, debug=debug)
-
-    
-# from flask import send_from_directory
-# from werkzeug.utils import secure_filename
-
-
-# UPLOAD_FOLDER = os.path.join(os.path.dirname(__file__), "uploads")
-# os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-# ALLOWED_EXTENSIONS = {'webm', 'wav', 'mp3', 'ogg', 'm4a'}
-# app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
-
-# def allowed_file(filename):
-#     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
-
-
-
-# @app.route('/upload-audio', methods=['POST'])
-# def upload_audio():
-#     if 'audio' not in request.files:
-#         return jsonify({'success': False, 'error': 'No audio file part'}), 400
-#     file = request.files['audio']
-#     if file.filename == '':
-#         return jsonify({'success': False, 'error': 'No selected audio file'}), 400
-#     if file and allowed_file(file.filename):
-#         filename = secure_filename(file.filename)
-#         save_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-#         file.save(save_path)
-#         file_size = os.path.getsize(save_path)
-#         return jsonify({
-#             'success': True,
-#             'filename': filename,
-#             'content_type': file.content_type,
-#             'size': file_size
-#         })
-#     return jsonify({'success': False, 'error': 'Invalid file type'}), 400
-
 # app.py
-from flask import Flask, render_template, request, jsonify, send_from_directory
+# Import necessary modules from Flask
+from flask import Flask, Response, g, has_request_context, render_template, request, jsonify, stream_with_context
 import requests
+import logging
 import os
 from datetime import datetime
 import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from werkzeug.utils import secure_filename
 
-# Load env variables
+from services.audio_store import AudioStore
+from services.audio_stitch import STITCHABLE_FORMATS, stitch_audio, strip_id3
+from services.auth_token import AuthTokenManager
+from services.cache_warmer import CacheWarmer, load_phrases, top_logged_texts
+from services.file_delivery import FileDelivery
+from services.murf_client import MurfClient
+from services.murf_payload import build_murf_payload, extract_audio_url
+from services.rate_limiter import OutboundLimiter, OverBudgetError
+from services.resilience import CircuitBreaker, CircuitOpenError, DeadlineExceeded, ResilientCaller, RetryBudget
+from services.shared_state import SharedStore
+from services.single_flight import SingleFlight
+from services import metrics, structured_log
+from services.structured_log import log_event, new_request_id, request_id_var, sample_verbose, text_summary
+from services.text_chunker import split_sentences, split_text
+from services.text_normalizer import TextNormalizer
+from services.tts_cache import TTSCache, make_cache_key
+from services.upload_ingest import UploadTooLarge, ingest_stream, init_flask as init_upload_ingest
+from services.upload_retention import UploadRetention
+from services.voice_catalog import CatalogFetchError, VoiceCatalog
+
+# Try to load environment variables from .env file
 try:
     from dotenv import load_dotenv
     load_dotenv()
+    dotenv_loaded = True
 except ImportError:
-    pass
+    dotenv_loaded = False
 
+# JSON logs through a background queue: request threads never block on log I/O.
+# Verbose payloads (Murf headers/bodies) are logged for a sample of requests only.
+structured_log.setup_logging(
+    level=os.getenv('LOG_LEVEL', 'INFO').upper(),
+    verbose_sample_rate=float(os.getenv('LOG_VERBOSE_SAMPLE_RATE', 0.01)),
+    queue_size=int(os.getenv('LOG_QUEUE_SIZE', 10000))
+)
+logger = logging.getLogger('murf_tts')
+if dotenv_loaded:
+    logger.info("Environment variables loaded from .env file")
+else:
+    logger.warning("python-dotenv not installed. Using system environment variables only.")
+
+# Initialize the Flask application
 app = Flask(__name__, static_folder='static', template_folder='templates')
 
+# Prometheus /metrics: per-route latency, in-flight, bytes and status counts
+metrics.init_flask(app)
+
+@app.before_request
+def assign_request_id():
+    g.request_id = new_request_id(request.headers.get('X-Request-ID'))
+    g.request_started = time.perf_counter()
+    request_id_var.set(g.request_id)
+
+@app.after_request
+def log_request(response):
+    response.headers['X-Request-ID'] = g.get('request_id', '')
+    started = g.get('request_started')
+    log_event(logger, logging.INFO, 'request',
+              method=request.method,
+              path=request.path,
+              status=response.status_code,
+              duration_ms=round((time.perf_counter() - started) * 1000, 2) if started else None)
+    return response
+
+@app.teardown_request
+def clear_request_id(exc):
+    # Not a token reset: streamed responses run teardown again when the stream ends
+    request_id_var.set(None)
+
+# Murf API configuration
+MURF_API_URL = os.getenv('MURF_API_URL', 'https://api.murf.ai/v1/speech/generate')
+MURF_AUTH_URL = os.getenv('MURF_AUTH_URL', 'https://api.murf.ai/v1/auth/token')
+MURF_VOICES_URL = os.getenv('MURF_VOICES_URL', 'https://api.murf.ai/v1/speech/voices')
+MURF_API_KEY = os.getenv('MURF_API_KEY')
+
+# Shared keep-alive client: every Murf call goes through one connection pool
+murf_client = MurfClient(
+    MURF_API_KEY,
+    pool_connections=int(os.getenv('MURF_POOL_CONNECTIONS', 4)),
+    pool_maxsize=int(os.getenv('MURF_POOL_MAXSIZE', 20)),
+    pool_block=os.getenv('MURF_POOL_BLOCK', 'True').lower() == 'true'
+)
+
+# Cross-worker state (SQLite WAL file) for pre-fork serving: the auth token, the voice
+# catalog and the TTS result index are fetched once per host, not once per worker.
+# gunicorn.conf.py sets SHARED_STATE_PATH; a single process runs without it.
+SHARED_STATE_PATH = os.getenv('SHARED_STATE_PATH') or None
+shared_store = SharedStore(SHARED_STATE_PATH) if SHARED_STATE_PATH else None
+
+# TTS result cache keyed by a hash of the Murf payload
+# (memory LRU + shared store when configured + optional disk tier)
+tts_cache = TTSCache(
+    max_entries=int(os.getenv('TTS_CACHE_MAX_ENTRIES', 512)),
+    ttl_seconds=int(os.getenv('TTS_CACHE_TTL', 3600)),
+    disk_dir=os.getenv('TTS_CACHE_DIR') or None,
+    shared=shared_store
+)
+
+# Canonical text (per-language rules) before the cache key and the Murf call;
+# TTS_NORMALIZATION_RULES may point at a JSON file of per-language overrides
+TTS_NORMALIZATION = os.getenv('TTS_NORMALIZATION', 'True').lower() == 'true'
+if os.getenv('TTS_NORMALIZATION_RULES'):
+    text_normalizer = TextNormalizer.from_file(os.getenv('TTS_NORMALIZATION_RULES'), enabled=TTS_NORMALIZATION)
+else:
+    text_normalizer = TextNormalizer(enabled=TTS_NORMALIZATION)
+
+# Identical in-flight /tts misses share one Murf call
+tts_coalescer = SingleFlight()
+
+# Outbound Murf budget: requests/sec and characters/min, interactive lane before bulk
+# (MURF_RATE_LIMIT_RPS=0 turns it off, e.g. for bench_serving.py)
+murf_limiter = OutboundLimiter(
+    requests_per_second=float(os.getenv('MURF_RATE_LIMIT_RPS', 10)),
+    characters_per_minute=int(os.getenv('MURF_RATE_LIMIT_CHARS_PER_MIN', 100000)),
+    max_wait={
+        'interactive': float(os.getenv('MURF_QUEUE_MAX_WAIT_INTERACTIVE', 2)),
+        'bulk': float(os.getenv('MURF_QUEUE_MAX_WAIT_BULK', 60))
+    }
+)
+
+# Murf call resilience: fail fast while Murf is unhealthy, retry with jitter
+# within a budget, optionally hedge slow calls after a delay (default: observed p95).
+# MURF_TIMEOUT caps one attempt; MURF_DEADLINE caps the whole call, retries and
+# hedges included, so one slow Murf call cannot hold a request thread for long
+MURF_TIMEOUT = float(os.getenv('MURF_TIMEOUT', 10))
+MURF_DEADLINE = float(os.getenv('MURF_DEADLINE', 15))
+MURF_HEDGE = os.getenv('MURF_HEDGE', 'False').lower() == 'true'
+MURF_HEDGE_DELAY_MS = float(os.getenv('MURF_HEDGE_DELAY_MS', 0))
+murf_resilience = ResilientCaller(
+    CircuitBreaker(
+        failure_threshold=int(os.getenv('MURF_BREAKER_FAILURES', 5)),
+        reset_timeout=float(os.getenv('MURF_BREAKER_RESET', 30))
+    ),
+    RetryBudget(ratio=float(os.getenv('MURF_RETRY_BUDGET_RATIO', 0.2))),
+    is_failure=lambda e: is_murf_failure(e),
+    max_retries=int(os.getenv('MURF_MAX_RETRIES', 2)),
+    backoff_base=float(os.getenv('MURF_RETRY_BACKOFF', 0.2)),
+    hedge_executor=ThreadPoolExecutor(max_workers=32, thread_name_prefix='murf-hedge') if MURF_HEDGE else None,
+    hedge_delay=MURF_HEDGE_DELAY_MS / 1000 or None,
+    deadline=MURF_DEADLINE or None
+)
+
+# Batch TTS: shared worker pool, per-request parallelism capped at the pool size
+TTS_BATCH_MAX_ITEMS = int(os.getenv('TTS_BATCH_MAX_ITEMS', 200))
+TTS_BATCH_MAX_PARALLELISM = int(os.getenv('TTS_BATCH_MAX_PARALLELISM', 8))
+batch_executor = ThreadPoolExecutor(max_workers=TTS_BATCH_MAX_PARALLELISM, thread_name_prefix='tts-batch')
+
+# Long-text and streaming TTS: chunk sizes and per-chunk retries
+TTS_LONG_CHUNK_CHARS = int(os.getenv('TTS_LONG_CHUNK_CHARS', 1000))
+TTS_LONG_CHUNK_RETRIES = int(os.getenv('TTS_LONG_CHUNK_RETRIES', 1))
+TTS_STREAM_CHUNK_CHARS = int(os.getenv('TTS_STREAM_CHUNK_CHARS', 300))
+
+# Local content-addressed audio store served at /audio/<id>
+AUDIO_FOLDER = os.path.join(os.path.dirname(__file__), "audio")
+TTS_STORE_AUDIO = os.getenv('TTS_STORE_AUDIO', 'False').lower() == 'true'
+AUDIO_CACHE_MAX_AGE = int(os.getenv('AUDIO_CACHE_MAX_AGE', 31536000))
+audio_store = AudioStore(AUDIO_FOLDER)
+# Who sends stored files for /audio and /uploads: '' = this app (sendfile under
+# gunicorn), 'x-accel-redirect' = nginx internal location, 'x-sendfile' = Apache/lighttpd
+FILE_OFFLOAD = os.getenv('FILE_OFFLOAD', '').lower()
+audio_delivery = FileDelivery(
+    AUDIO_FOLDER,
+    f'public, max-age={AUDIO_CACHE_MAX_AGE}, immutable',
+    offload=FILE_OFFLOAD,
+    offload_prefix=os.getenv('AUDIO_OFFLOAD_PREFIX', '/_protected/audio/')
+)
+
+# Cache warm-up: phrases from a file plus the most frequent texts in a JSON-lines
+# request log (this app's own logs work with LOG_LEVEL=DEBUG: the sampled
+# tts_request_text lines carry the text; INFO lines only its length and hash),
+# pre-synthesized for each warm-up voice at startup or via /tts/warmup.
+# Startup warm-up is off by default: every start (including each debug-reloader
+# restart) spends Murf quota on phrases x voices. Set TTS_WARMUP_ON_STARTUP=true
+# in production, where the disk/shared cache keeps the results across restarts.
+TTS_WARMUP_ON_STARTUP = os.getenv('TTS_WARMUP_ON_STARTUP', 'False').lower() == 'true'
+TTS_WARMUP_PHRASES_FILE = os.getenv('TTS_WARMUP_PHRASES_FILE', os.path.join(os.path.dirname(__file__), 'warmup_phrases.txt'))
+TTS_WARMUP_LOG_FILE = os.getenv('TTS_WARMUP_LOG_FILE') or None
+TTS_WARMUP_LOG_TOP = int(os.getenv('TTS_WARMUP_LOG_TOP', 20))
+TTS_WARMUP_VOICES = [v.strip() for v in os.getenv('TTS_WARMUP_VOICES', 'en-US-ken').split(',') if v.strip()]
+
+# Existing stats() counters exported on /metrics, read only at scrape time
+metrics.CallbackGauge('tts_cache_lookups_total', 'TTS cache lookups by result', lambda: [
+    (('hit',), tts_cache.stats()['hits']),
+    (('shared_hit',), tts_cache.stats()['shared_hits']),
+    (('disk_hit',), tts_cache.stats()['disk_hits']),
+    (('miss',), tts_cache.stats()['misses']),
+], labelnames=('result',), kind='counter')
+metrics.CallbackGauge('tts_cache_entries', 'Entries in the in-memory TTS cache', lambda: tts_cache.stats()['entries'])
+metrics.CallbackGauge('tts_coalesced_total', 'TTS misses that shared an in-flight Murf call',
+                      lambda: tts_coalescer.stats()['coalesced'], kind='counter')
+metrics.CallbackGauge('murf_rate_limit_queue_depth', 'Calls waiting for outbound Murf budget',
+                      lambda: murf_limiter.stats()['queue_depth'])
+metrics.CallbackGauge('murf_circuit_open', '1 while the Murf circuit breaker is open or half-open',
+                      lambda: int(murf_resilience.breaker.state != 'closed'))
+metrics.CallbackGauge('log_records_dropped_total', 'Log records dropped because the log queue was full',
+                      lambda: structured_log.stats()['dropped'], kind='counter')
+
+# Validate API key
+if not MURF_API_KEY:
+    logger.warning("MURF_API_KEY not found in environment variables! "
+                   "Please set your API key in the .env file or as an environment variable")
+else:
+    logger.info("Murf API key configured successfully")
+
 # === Upload support ===
 UPLOAD_FOLDER = os.path.join(os.path.dirname(__file__), "uploads")
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 ALLOWED_EXTENSIONS = {'webm', 'wav', 'mp3', 'ogg', 'm4a'}
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+# Uploads are copied to disk in fixed-size chunks; bodies over the limit are
+# refused with 413 before they are read (Content-Length) or as soon as they cross it
+UPLOAD_MAX_BYTES = int(os.getenv('UPLOAD_MAX_BYTES', 25 * 1024 * 1024))
+UPLOAD_INCOMING_FOLDER = os.path.join(UPLOAD_FOLDER, '.incoming')
+app.config['MAX_CONTENT_LENGTH'] = UPLOAD_MAX_BYTES
+# Multipart file parts are written (and hashed) straight into the incoming
+# folder while the form is parsed; ingest_stream() then claims the file
+# instead of copying Werkzeug's spool file a second time
+init_upload_ingest(app, UPLOAD_INCOMING_FOLDER, UPLOAD_MAX_BYTES)
+# Uploads are stored by content hash (sharded dirs) and looked up by that ID, so
+# same-named uploads never collide and identical recordings are kept once
+upload_store = AudioStore(UPLOAD_FOLDER)
+# Uploads are user recordings: cacheable by the browser only
+UPLOAD_CACHE_MAX_AGE = int(os.getenv('UPLOAD_CACHE_MAX_AGE', 7 * 24 * 3600))
+upload_delivery = FileDelivery(
+    UPLOAD_FOLDER,
+    f'private, max-age={UPLOAD_CACHE_MAX_AGE}, immutable',
+    offload=FILE_OFFLOAD,
+    offload_prefix=os.getenv('UPLOADS_OFFLOAD_PREFIX', '/_protected/uploads/')
+)
+
+# Upload retention: total size cap and idle age, least recently accessed evicted
+# first, enforced by a background thread that rescans one shard per tick
+upload_retention = UploadRetention(
+    UPLOAD_FOLDER,
+    max_bytes=int(os.getenv('UPLOAD_MAX_TOTAL_BYTES', 2 * 1024 ** 3)),
+    max_age=int(os.getenv('UPLOAD_MAX_AGE', 7 * 24 * 3600)),
+    interval=float(os.getenv('UPLOAD_GC_INTERVAL', 1)),
+    incoming_dir=UPLOAD_INCOMING_FOLDER
+)
+metrics.CallbackGauge('upload_store_bytes', 'Bytes held in the upload store', lambda: upload_retention.stats()['bytes'])
+metrics.CallbackGauge('upload_store_files', 'Files held in the upload store', lambda: upload_retention.stats()['files'])
+metrics.CallbackGauge('upload_store_max_bytes', 'Upload store size limit', lambda: upload_retention.max_bytes or 0)
+metrics.CallbackGauge('upload_gc_deleted_total', 'Uploads removed by retention, by reason', lambda: [
+    (('age',), upload_retention.stats()['deleted_age']),
+    (('quota',), upload_retention.stats()['deleted_quota']),
+    (('incoming',), upload_retention.stats()['deleted_incoming']),
+], labelnames=('reason',), kind='counter')
+metrics.CallbackGauge('upload_gc_freed_bytes_total', 'Bytes freed by upload retention',
+                      lambda: upload_retention.stats()['freed_bytes'], kind='counter')
+
+@app.errorhandler(413)
+@app.errorhandler(UploadTooLarge)
+def upload_too_large(e):
+    return jsonify({'success': False, 'error': str(UploadTooLarge(UPLOAD_MAX_BYTES))}), 413
 
 def allowed_file(filename):
     return '.' in filename and \
@@ -554,38 +278,1215 @@ def upload_audio():
         return jsonify({'success': False, 'error': 'No selected audio file'}), 400
     if file and allowed_file(file.filename):
         filename = secure_filename(file.filename)
-        save_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(save_path)
-        file_size = os.path.getsize(save_path)
+        try:
+            ingested = ingest_stream(file.stream, UPLOAD_INCOMING_FOLDER, UPLOAD_MAX_BYTES)
+        except UploadTooLarge as e:
+            return jsonify({'success': False, 'error': str(e)}), 413
+        upload_id, created = upload_store.put_file(ingested, filename.rsplit('.', 1)[1])
+        upload_retention.record(upload_store.path_for(upload_id), ingested.size)
         return jsonify({
             'success': True,
+            'id': upload_id,
+            'url': f'/uploads/{upload_id}',
             'filename': filename,
             'content_type': file.content_type,
-            'size': file_size
+            'size': ingested.size,
+            'duplicate': not created
         })
     return jsonify({'success': False, 'error': 'Invalid file type'}), 400
 
 # === Static uploads serving (optional, for debug) ===
-@app.route('/uploads/<filename>')
-def uploaded_file(filename):
-    return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
-
-# ---------------------------------------------------
-# --- Keep the rest of your TTS endpoints as is  ---
-# (Omitted in this code block for brevity, but leave your
-#  existing /tts, /health, etc. code unchanged.)
-# ---------------------------------------------------
-# Insert your Murf TTS routes here ...
-# (cut for brevity; see your original code or use my previous answer)
-# ---------------------------------------------------
-
-# Home page (renders index.html)
+@app.route('/uploads/<upload_id>')
+def uploaded_file(upload_id):
+    path = upload_store.path_for(upload_id)
+    if not path:
+        return jsonify({'success': False, 'error': 'Upload not found'}), 404
+    upload_retention.touch(path)
+    return upload_delivery.flask_response(path, upload_id, AudioStore.mimetype_for(path))
+
+# Define a route for the root URL ('/')
 @app.route('/')
 def index():
+    """
+    This function handles requests to the root URL.
+    It renders and returns the 'index.html' template.
+    """
     return render_template('index.html')
 
-if __name__ == "__main__":
+def fetch_murf_auth_token():
+    """
+    Generate a new Murf auth token (called only by the token manager)
+    """
+    headers = {
+        'api-key': MURF_API_KEY,
+        'Content-Type': 'application/json'
+    }
+    
+    logger.info("Generating new Murf auth token")
+    response = murf_client.post(MURF_AUTH_URL, headers=headers, timeout=10)
+    
+    if response.status_code != 200:
+        raise RuntimeError(f"Failed to generate auth token: {response.status_code} - {response.text}")
+    
+    token_data = response.json()
+    logger.info("Auth token generated successfully")
+    return token_data.get('token'), token_data.get('expiryInEpochMillis', 0)
+
+MURF_TOKEN_PROACTIVE_MARGIN_MS = int(os.getenv('MURF_TOKEN_PROACTIVE_MARGIN_MS', 300000))
+
+def fetch_shared_murf_auth_token():
+    """
+    Reuse the token another worker fetched while it is outside the proactive
+    refresh window; otherwise one worker fetches it for all of them
+    """
+    token, expires_at = shared_store.fetch_once(
+        'murf', 'auth_token',
+        lambda: list(fetch_murf_auth_token()),
+        is_fresh=lambda value, updated_at: value[1] > time.time() * 1000 + MURF_TOKEN_PROACTIVE_MARGIN_MS
+    )
+    return token, expires_at
+
+# Single-flight token manager: one refresh at a time, renewed before expiry
+auth_token_manager = AuthTokenManager(
+    fetch_shared_murf_auth_token if shared_store else fetch_murf_auth_token,
+    refresh_margin_ms=60000,  # 1 minute buffer
+    proactive_margin_ms=MURF_TOKEN_PROACTIVE_MARGIN_MS
+)
+
+def get_murf_auth_token():
+    """
+    Get a valid Murf auth token, generating a new one if needed
+    """
+    token = auth_token_manager.get_token()
+    if not token:
+        log_event(logger, logging.ERROR, 'auth_token_failed', error=str(auth_token_manager.last_error))
+    return token
+
+def fetch_murf_voices():
+    """
+    Fetch the voice catalog from Murf (used by the background refresher)
+    """
+    headers = {
+        'api-key': MURF_API_KEY,
+        'Accept': 'application/json'
+    }
+    response = murf_client.get(
+        MURF_VOICES_URL,
+        headers=headers,
+        timeout=10
+    )
+    if response.status_code != 200:
+        raise CatalogFetchError(
+            f'Failed to fetch voices: {response.status_code}',
+            status_code=response.status_code,
+            details=response.text
+        )
+    return response.json()
+
+VOICES_REFRESH_INTERVAL = int(os.getenv('VOICES_REFRESH_INTERVAL', 3600))
+
+def fetch_shared_murf_voices():
+    """
+    The catalog another worker fetched within the refresh interval, else fetch it once for all
+    """
+    return shared_store.fetch_once(
+        'murf', 'voices',
+        fetch_murf_voices,
+        is_fresh=lambda value, updated_at: time.time() - updated_at < VOICES_REFRESH_INTERVAL
+    )
+
+# Voice catalog served from memory and refreshed in the background
+voice_catalog = VoiceCatalog(
+    fetch_shared_murf_voices if shared_store else fetch_murf_voices,
+    refresh_interval=VOICES_REFRESH_INTERVAL
+)
+
+@app.route('/tts/voices', methods=['GET'])
+def get_voices():
+    """
+    Get available voices from Murf API (cached, stale-while-revalidate)
+    """
+    if not MURF_API_KEY:
+        return jsonify({
+            'error': 'API key not configured',
+            'success': False
+        }), 500
+    
+    try:
+        snapshot = voice_catalog.get()
+    except CatalogFetchError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'details': e.details
+        }), e.status_code
+    
+    headers = {
+        'ETag': f'"{snapshot.etag}"',
+        'Cache-Control': f'public, max-age=300, stale-while-revalidate={voice_catalog.refresh_interval}',
+        'X-Catalog-Age': str(int(time.time() - snapshot.fetched_at))
+    }
+    if request.if_none_match.contains(snapshot.etag):
+        return Response(status=304, headers=headers)
+    return Response(snapshot.body, status=200, mimetype='application/json', headers=headers)
+
+@app.route('/tts/key-test', methods=['GET'])
+def test_api_key():
+    """
+    Test if the API key format is correct
+    """
+    if not MURF_API_KEY:
+        return jsonify({
+            'error': 'API key not configured',
+            'success': False
+        })
+    
+    return jsonify({
+        'success': True,
+        'api_key_format': 'Valid format' if MURF_API_KEY.startswith('ap2_') else 'Check format - should start with ap2_',
+        'api_key_length': len(MURF_API_KEY),
+        'api_key_preview': f"{MURF_API_KEY[:8]}...{MURF_API_KEY[-8:]}",
+        'message': 'API key configuration looks good'
+    })
+
+@app.route('/tts/auth-test', methods=['GET'])
+def test_auth():
+    """
+    Test Murf API authentication
+    """
+    if not MURF_API_KEY:
+        return jsonify({
+            'error': 'Murf API key not configured',
+            'success': False
+        }), 500
+    
+    auth_token = get_murf_auth_token()
+    
+    if auth_token:
+        return jsonify({
+            'success': True,
+            'message': 'Authentication successful',
+            'token_preview': f"{auth_token[:10]}...{auth_token[-10:]}",
+            'expires_at': auth_token_manager.expires_at,
+            'token_metrics': auth_token_manager.stats()
+        })
+    else:
+        return jsonify({
+            'success': False,
+            'error': 'Failed to authenticate with Murf API'
+        }), 401
+
+@app.route('/tts/pool-stats', methods=['GET'])
+def murf_pool_stats():
+    """
+    Connection pool statistics for the shared Murf client
+    """
+    return jsonify({
+        'success': True,
+        'pool': murf_client.stats(),
+        'timestamp': datetime.now().isoformat()
+    })
+
+@app.route('/tts/cache-stats', methods=['GET'])
+def tts_cache_stats():
+    """
+    Hit/miss/eviction counters for the TTS result cache
+    """
+    return jsonify({
+        'success': True,
+        'cache': tts_cache.stats(),
+        'coalescing': tts_coalescer.stats(),
+        'normalization': text_normalizer.stats(),
+        'voice_catalog': voice_catalog.stats(),
+        'auth_token': auth_token_manager.stats(),
+        'shared_state': shared_store.stats() if shared_store else None,
+        'timestamp': datetime.now().isoformat()
+    })
+
+@app.route('/tts/rate-limit', methods=['GET'])
+def murf_rate_limit_stats():
+    """
+    Outbound Murf budget, queue depth and per-lane queueing times
+    """
+    return jsonify({
+        'success': True,
+        'rate_limit': murf_limiter.stats(),
+        'timestamp': datetime.now().isoformat()
+    })
+
+@app.route('/tts/upstream-health', methods=['GET'])
+def murf_upstream_health():
+    """
+    Circuit breaker state, retry budget and hedging counters for Murf calls
+    """
+    return jsonify({
+        'success': True,
+        'upstream': murf_resilience.stats(),
+        'timestamp': datetime.now().isoformat()
+    })
+
+@app.route('/tts/test', methods=['GET'])
+def test_tts_endpoint():
+    """
+    Test endpoint to verify TTS functionality is working.
+    """
+    return jsonify({
+        'message': 'TTS endpoint is active',
+        'status': 'success',
+        'endpoint': '/tts',
+        'method': 'POST',
+        'required_fields': ['text'],
+        'optional_fields': ['voice_id', 'format', 'speech_rate', 'pitch', 'no_cache', 'store_audio', 'priority'],
+        'api_key_configured': bool(MURF_API_KEY),
+        'example_request': {
+            'text': 'Hello, this is a test message for text to speech conversion.',
+            'voice_id': 'en-US-ken',  # Valid voice ID
+            'format': 'mp3',
+            'speech_rate': 0  # Speech rate: -50 (slow) to 50 (fast), 0 = normal
+        },
+        'common_voice_ids': [
+            'en-US-ken',
+            'en-US-sarah',
+            'en-US-laura',
+            'en-US-wayne',
+            'en-GB-daniel',
+            'en-AU-nicole'
+        ],
+        'test_urls': {
+            'test_endpoint': '/tts/test',
+            'auth_test_endpoint': '/tts/auth-test',
+            'voices_endpoint': '/tts/voices',
+            'main_endpoint': '/tts'
+        }
+    })
+
+class MurfAPIError(Exception):
+    """
+    Raised by synthesize() when Murf returns an error or an unusable response
+    """
+    def __init__(self, message, status_code=500, details=None, murf_response=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.details = details
+        self.murf_response = murf_response
+
+def retry_later_response(e):
+    """
+    429 when the outbound Murf budget is exhausted, 503 while the circuit
+    breaker is open; both carry Retry-After
+    """
+    body = {
+        'error': str(e),
+        'success': False,
+        'retry_after': e.retry_after
+    }
+    if isinstance(e, OverBudgetError):
+        body['lane'] = e.lane
+    response = jsonify(body)
+    response.status_code = 429 if isinstance(e, OverBudgetError) else 503
+    response.headers['Retry-After'] = str(max(1, int(round(e.retry_after))))
+    return response
+
+def synthesize(murf_payload, use_cache=True, lane='interactive'):
+    """
+    Synthesize one payload through the cache and the pooled Murf client.
+    Returns (murf_data, cached); raises MurfAPIError, OverBudgetError or
+    requests.RequestException.
+    Concurrent cache misses for the same payload share one upstream call.
+    """
+    cache_key = make_cache_key(murf_payload)
+    if not use_cache:
+        return call_murf(murf_payload, cache_key, lane), False
+    
+    cached_data = tts_cache.get(cache_key)
+    if cached_data:
+        return cached_data, True
+    
+    def leader():
+        # The previous leader for this key may have filled the cache just now
+        fresh_data = tts_cache.peek(cache_key)
+        if fresh_data:
+            return fresh_data, True
+        return call_murf(murf_payload, cache_key, lane), False
+    
+    (murf_data, cached), shared = tts_coalescer.do(cache_key, leader)
+    return murf_data, cached or shared
+
+def call_murf(murf_payload, cache_key, lane='interactive'):
+    """
+    One upstream Murf call; stores the result in the cache on success.
+    Waits for request/character budget in the given priority lane first.
+    """
+    # Try direct API key authentication first (simpler approach)
+    headers = {
+        'api-key': MURF_API_KEY,
+        'Content-Type': 'application/json',
+        'Accept': 'application/json'
+    }
+    
+    characters = len(murf_payload['text'])
+    queue_times = []
+    # Hedged attempts run on pool threads; carry the request ID over explicitly
+    request_id = request_id_var.get()
+    
+    def send(remaining):
+        # Reserve outbound budget; raises OverBudgetError instead of risking a 429
+        queue_times.append(murf_limiter.acquire(characters, lane))
+        
+        # Make request to Murf API (pooled keep-alive connection)
+        started = time.perf_counter()
+        try:
+            response = murf_client.post(
+                MURF_API_URL,
+                headers=headers,
+                json=murf_payload,
+                timeout=MURF_TIMEOUT if remaining is None else min(MURF_TIMEOUT, remaining)
+            )
+        except requests.RequestException as e:
+            murf_limiter.reconcile(characters, 0)
+            log_event(logger, logging.WARNING, 'murf_network_error', error=str(e), lane=lane, request_id=request_id)
+            raise
+        
+        log_event(logger, logging.INFO, 'murf_response',
+                  status=response.status_code,
+                  voice_id=murf_payload['voiceId'],
+                  characters=characters,
+                  lane=lane,
+                  request_id=request_id,
+                  duration_ms=round((time.perf_counter() - started) * 1000, 2))
+        if logger.isEnabledFor(logging.DEBUG) and sample_verbose():
+            log_event(logger, logging.DEBUG, 'murf_response_detail',
+                      headers=dict(response.headers), body=response.text, request_id=request_id)
+        
+        # Handle Murf API response
+        if response.status_code == 200:
+            murf_data = response.json()
+            murf_limiter.reconcile(characters, murf_data.get('charactersUsed'))
+            return murf_data
+        
+        murf_limiter.reconcile(characters, 0)
+        error_details = response.text
+        try:
+            error_details = response.json()
+        except ValueError:
+            pass
+        log_event(logger, logging.WARNING, 'murf_error', status=response.status_code, details=error_details,
+                  request_id=request_id)
+        raise MurfAPIError(f'Murf API error: {response.status_code}', response.status_code, details=error_details)
+    
+    # Breaker, jittered retries and optional hedging around the raw call
+    try:
+        murf_data = murf_resilience.call(send)
+    except DeadlineExceeded as e:
+        # Handled like any other Murf timeout by the routes
+        raise requests.Timeout(f'Murf call exceeded the {MURF_DEADLINE:g}s deadline') from e
+    finally:
+        if has_request_context():
+            g.murf_queue_ms = round(sum(queue_times) * 1000, 2)
+    
+    # Extract audio URL from Murf response
+    if not extract_audio_url(murf_data):
+        raise MurfAPIError('Audio URL not found in Murf response', 500, murf_response=murf_data)
+    tts_cache.set(cache_key, murf_data)
+    return murf_data
+
+def is_murf_failure(e):
+    """
+    Errors that mean Murf itself is unhealthy: network errors, timeouts, 429 and 5xx.
+    These are retried and count against the circuit breaker; 4xx are the caller's fault.
+    """
+    if isinstance(e, requests.RequestException):
+        return True
+    return isinstance(e, MurfAPIError) and (e.status_code == 429 or e.status_code >= 500)
+
+def localize_audio(murf_payload, murf_data):
+    """
+    Download the Murf audio once into the local store and remember its ID in
+    the cache entry, so replays and cache hits never refetch the remote URL
+    """
+    audio_id = murf_data.get('localAudioId')
+    if audio_id and audio_store.path_for(audio_id):
+        return audio_id
+    audio_id = audio_store.fetch_url(extract_audio_url(murf_data), murf_client, murf_payload['audioFormat'])
+    tts_cache.set(make_cache_key(murf_payload), {**murf_data, 'localAudioId': audio_id})
+    return audio_id
+
+def warm_phrase(text, voice_id):
+    """
+    Synthesize one warm-up phrase into the cache; returns True if it was already cached
+    """
+    murf_payload = build_murf_payload({'text': text, 'voice_id': voice_id}, text_normalizer)
+    murf_data, cached = synthesize(murf_payload, lane='bulk')
+    if TTS_STORE_AUDIO:
+        localize_audio(murf_payload, murf_data)
+    return cached
+
+def default_warmup_phrases():
+    """
+    The phrase file plus the most frequent texts from the request log
+    """
+    phrases = load_phrases(TTS_WARMUP_PHRASES_FILE)
+    if TTS_WARMUP_LOG_FILE:
+        phrases += top_logged_texts(TTS_WARMUP_LOG_FILE, limit=TTS_WARMUP_LOG_TOP)
+    return phrases
+
+cache_warmer = CacheWarmer(warm_phrase, parallelism=int(os.getenv('TTS_WARMUP_PARALLELISM', 2)))
+
+@app.route('/tts/warmup', methods=['GET', 'POST'])
+def tts_warmup():
+    """
+    GET: progress of the current/last warm-up.
+    POST: start a warm-up in the background, optionally with
+    {"phrases": [...], "voices": [...]}; defaults to the configured phrase list.
+    """
+    if request.method == 'GET':
+        return jsonify({'success': True, 'warmup': cache_warmer.stats()})
+    
+    if not MURF_API_KEY:
+        return jsonify({'error': 'Murf API key not configured', 'success': False}), 500
+    
+    data = request.get_json(silent=True) or {}
+    phrases = data.get('phrases') or default_warmup_phrases()
+    voices = data.get('voices') or TTS_WARMUP_VOICES
+    if not isinstance(phrases, list) or not isinstance(voices, list):
+        return jsonify({'error': 'phrases and voices must be lists', 'success': False}), 400
+    
+    started = cache_warmer.start(phrases, voices)
+    return jsonify({
+        'success': True,
+        'started': started,
+        'message': 'Warm-up started' if started else 'A warm-up is already running',
+        'warmup': cache_warmer.stats()
+    }), 202 if started else 409
+
+@app.route('/tts', methods=['POST'])
+def text_to_speech():
+    """
+    REST TTS endpoint that accepts text and returns audio URL.
+    Calls Murf's REST TTS API and returns the generated audio file URL.
+    """
+    try:
+        # Check if API key is configured
+        if not MURF_API_KEY:
+            return jsonify({
+                'error': 'Murf API key not configured. Please set MURF_API_KEY environment variable.',
+                'success': False
+            }), 500
+        
+        # Get JSON data from request
+        data = request.get_json()
+        
+        # Validate input
+        if not data or 'text' not in data:
+            return jsonify({
+                'error': 'Missing required field: text',
+                'success': False,
+                'expected_format': {
+                    'text': 'Your text to convert to speech',
+                    'voice_id': 'en-US-ken (optional)',
+                    'format': 'mp3 (optional)',
+                    'speech_rate': '0 (optional, -50 to 50)'
+                }
+            }), 400
+        
+        text_input = data['text']
+        
+        if not text_input.strip():
+            return jsonify({
+                'error': 'Text cannot be empty',
+                'success': False
+            }), 400
+        
+        murf_payload = build_murf_payload(data, text_normalizer)
+        lane = data.get('priority', 'interactive')
+        log_event(logger, logging.INFO, 'tts_request',
+                  **text_summary(murf_payload['text']),
+                  voice_id=murf_payload['voiceId'],
+                  format=murf_payload['audioFormat'],
+                  lane=lane)
+        if logger.isEnabledFor(logging.DEBUG) and sample_verbose():
+            log_event(logger, logging.DEBUG, 'tts_request_text', text=murf_payload['text'])
+        
+        # Serve repeats from the cache unless the caller asks to bypass it
+        bypass_cache = bool(data.get('no_cache')) or \
+            'no-cache' in request.headers.get('Cache-Control', '').lower()
+        
+        try:
+            murf_data, cached = synthesize(murf_payload, use_cache=not bypass_cache, lane=lane)
+        except (OverBudgetError, CircuitOpenError) as e:
+            return retry_later_response(e)
+        except MurfAPIError as e:
+            if e.murf_response is not None:
+                return jsonify({
+                    'error': str(e),
+                    'success': False,
+                    'murf_response': e.murf_response
+                }), e.status_code
+            return jsonify({
+                'error': str(e),
+                'success': False,
+                'details': e.details,
+                'status_code': e.status_code,
+                'request_payload': murf_payload,  # Help debug the request
+                'suggestion': 'Try using a valid voice ID like: en-US-ken, en-US-sarah, en-US-laura, en-US-wayne'
+            }), e.status_code
+        
+        audio_url = extract_audio_url(murf_data)
+        result = {}
+        if data.get('store_audio', TTS_STORE_AUDIO):
+            try:
+                audio_id = localize_audio(murf_payload, murf_data)
+                result = {'audio_id': audio_id, 'remote_audio_url': audio_url}
+                audio_url = f"/audio/{audio_id}"
+            except (requests.RequestException, OSError) as e:
+                log_event(logger, logging.WARNING, 'audio_store_failed', error=str(e), audio_url=audio_url)
+        
+        return jsonify({
+            **result,
+            'success': True,
+            'audio_url': audio_url,
+            'text_processed': text_input,
+            'text_normalized': murf_payload['text'],
+            'voice_used': murf_payload['voiceId'],
+            'format': murf_payload['audioFormat'],
+            'timestamp': datetime.now().isoformat(),
+            'characters_used': 0 if cached else murf_data.get('charactersUsed', 0),
+            'cached': cached,
+            'queue_ms': g.get('murf_queue_ms', 0),
+            'murf_response': murf_data  # Include full response for debugging
+        }), 200
+            
+    except requests.RequestException as e:
+        log_event(logger, logging.ERROR, 'tts_network_error', error=str(e))
+        return jsonify({
+            'error': f'Network error calling Murf API: {str(e)}',
+            'success': False
+        }), 500
+        
+    except Exception as e:
+        logger.exception("TTS server error")
+        return jsonify({
+            'error': f'Server error: {str(e)}',
+            'success': False
+        }), 500
+
+def synthesize_batch_item(murf_payload, use_cache, lane='bulk'):
+    """
+    Run synthesize() for one batch item and turn the outcome into a result dict
+    """
+    try:
+        murf_data, cached = synthesize(murf_payload, use_cache=use_cache, lane=lane)
+        return {
+            'success': True,
+            'audio_url': extract_audio_url(murf_data),
+            'cached': cached,
+            'characters_used': 0 if cached else murf_data.get('charactersUsed', 0)
+        }
+    except OverBudgetError as e:
+        return {'success': False, 'error': str(e), 'status_code': 429, 'retry_after': e.retry_after}
+    except CircuitOpenError as e:
+        return {'success': False, 'error': str(e), 'status_code': 503, 'retry_after': e.retry_after}
+    except MurfAPIError as e:
+        return {'success': False, 'error': str(e), 'status_code': e.status_code, 'details': e.details}
+    except requests.RequestException as e:
+        return {'success': False, 'error': f'Network error calling Murf API: {str(e)}', 'status_code': 502}
+    except Exception as e:
+        return {'success': False, 'error': f'Server error: {str(e)}', 'status_code': 500}
+
+def synthesize_many(payloads, parallelism, use_cache, lane='bulk'):
+    """
+    Synthesize a dict of key -> payload on the shared worker pool, keeping at
+    most `parallelism` Murf calls in flight. Returns key -> result dict.
+    """
+    outcomes = {}
+    pending = {}
+    keys = iter(payloads)
+    for key in keys:
+        pending[batch_executor.submit(synthesize_batch_item, payloads[key], use_cache, lane)] = key
+        if len(pending) >= parallelism:
+            break
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            outcomes[pending.pop(future)] = future.result()
+        for key in keys:
+            pending[batch_executor.submit(synthesize_batch_item, payloads[key], use_cache, lane)] = key
+            if len(pending) >= parallelism:
+                break
+    return outcomes
+
+@app.route('/tts/batch', methods=['POST'])
+def text_to_speech_batch():
+    """
+    Batch TTS endpoint: synthesizes many items concurrently (bounded) and
+    returns one result per item, in input order.
+    """
+    if not MURF_API_KEY:
+        return jsonify({
+            'error': 'Murf API key not configured. Please set MURF_API_KEY environment variable.',
+            'success': False
+        }), 500
+    
+    data = request.get_json(silent=True) or {}
+    items = data.get('items')
+    if not isinstance(items, list) or not items:
+        return jsonify({
+            'error': 'Missing required field: items (non-empty list)',
+            'success': False,
+            'expected_format': {
+                'items': [{'text': 'Text to speak', 'voice_id': 'en-US-ken', 'format': 'mp3', 'speech_rate': 0}],
+                'parallelism': f'optional, 1-{TTS_BATCH_MAX_PARALLELISM}',
+                'no_cache': 'optional, bypass the TTS cache'
+            }
+        }), 400
+    if len(items) > TTS_BATCH_MAX_ITEMS:
+        return jsonify({
+            'error': f'Too many items: {len(items)} (max {TTS_BATCH_MAX_ITEMS})',
+            'success': False
+        }), 400
+    
+    try:
+        parallelism = int(data.get('parallelism', TTS_BATCH_MAX_PARALLELISM))
+    except (TypeError, ValueError):
+        parallelism = TTS_BATCH_MAX_PARALLELISM
+    parallelism = max(1, min(parallelism, TTS_BATCH_MAX_PARALLELISM))
+    use_cache = not data.get('no_cache')
+    
+    # Validate and de-duplicate: identical payloads are synthesized once
+    results = [None] * len(items)
+    unique_payloads = {}   # cache key -> payload
+    key_for_index = {}
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or not isinstance(item.get('text'), str) or not item['text'].strip():
+            results[index] = {'index': index, 'success': False, 'error': 'Missing or empty field: text', 'status_code': 400}
+            continue
+        murf_payload = build_murf_payload(item, text_normalizer)
+        key = make_cache_key(murf_payload)
+        unique_payloads.setdefault(key, murf_payload)
+        key_for_index[index] = key
+    
+    started = time.perf_counter()
+    outcomes = synthesize_many(unique_payloads, parallelism, use_cache, data.get('priority', 'bulk'))
+    
+    for index, key in key_for_index.items():
+        results[index] = {'index': index, **outcomes[key]}
+    
+    succeeded = sum(1 for r in results if r['success'])
+    return jsonify({
+        'success': succeeded == len(results),
+        'count': len(results),
+        'unique': len(unique_payloads),
+        'succeeded': succeeded,
+        'failed': len(results) - succeeded,
+        'parallelism': parallelism,
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 2),
+        'results': results,
+        'timestamp': datetime.now().isoformat()
+    }), 200
+
+def stitch_chunk_audio(audio_urls, audio_format):
+    """
+    Download chunk audio through the pooled client, join it and put it in
+    the local audio store. Returns the audio ID.
+    """
+    def download(audio_url):
+        response = murf_client.get(audio_url, timeout=30)
+        response.raise_for_status()
+        return response.content
+    
+    parts = list(batch_executor.map(download, audio_urls))
+    return audio_store.put_bytes(stitch_audio(parts, audio_format), audio_format)
+
+@app.route('/tts/long', methods=['POST'])
+def text_to_speech_long():
+    """
+    Long-text TTS: splits the text at sentence/clause boundaries, synthesizes
+    the chunks in parallel and returns an ordered playlist or one stitched file.
+    """
+    if not MURF_API_KEY:
+        return jsonify({
+            'error': 'Murf API key not configured. Please set MURF_API_KEY environment variable.',
+            'success': False
+        }), 500
+    
+    data = request.get_json(silent=True) or {}
+    text_input = data.get('text')
+    if not isinstance(text_input, str) or not text_input.strip():
+        return jsonify({
+            'error': 'Missing or empty field: text',
+            'success': False,
+            'expected_format': {
+                'text': 'Long text to convert to speech',
+                'voice_id': 'en-US-ken (optional)',
+                'format': 'mp3 (optional)',
+                'speech_rate': '0 (optional, -50 to 50)',
+                'mode': 'playlist (default) or stitched',
+                'max_chunk_chars': f'optional, default {TTS_LONG_CHUNK_CHARS}',
+                'parallelism': f'optional, 1-{TTS_BATCH_MAX_PARALLELISM}'
+            }
+        }), 400
+    
+    mode = data.get('mode', 'playlist')
+    if mode not in ('playlist', 'stitched'):
+        return jsonify({'error': 'mode must be "playlist" or "stitched"', 'success': False}), 400
+    audio_format = data.get('format', 'MP3').upper()
+    if mode == 'stitched' and audio_format not in STITCHABLE_FORMATS:
+        return jsonify({
+            'error': f'Stitching supports {sorted(STITCHABLE_FORMATS)}; use mode "playlist" for {audio_format}',
+            'success': False
+        }), 400
+    
+    try:
+        max_chunk_chars = max(50, int(data.get('max_chunk_chars', TTS_LONG_CHUNK_CHARS)))
+        parallelism = int(data.get('parallelism', TTS_BATCH_MAX_PARALLELISM))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'max_chunk_chars and parallelism must be integers', 'success': False}), 400
+    parallelism = max(1, min(parallelism, TTS_BATCH_MAX_PARALLELISM))
+    use_cache = not data.get('no_cache')
+    
+    started = time.perf_counter()
+    chunks = split_text(text_input, max_chunk_chars)
+    payloads = {index: build_murf_payload({**data, 'text': chunk}, text_normalizer) for index, chunk in enumerate(chunks)}
+    lane = data.get('priority', 'bulk')
+    outcomes = synthesize_many(payloads, parallelism, use_cache, lane)
+    
+    # Retry only the chunks that failed; finished chunks are not redone
+    for _ in range(TTS_LONG_CHUNK_RETRIES):
+        failed = {index: payloads[index] for index, outcome in outcomes.items() if not outcome['success']}
+        if not failed:
+            break
+        outcomes.update(synthesize_many(failed, parallelism, use_cache, lane))
+    
+    results = [{'index': index, 'text_length': len(chunk), **outcomes[index]} for index, chunk in enumerate(chunks)]
+    failed_count = sum(1 for r in results if not r['success'])
+    response = {
+        'success': failed_count == 0,
+        'mode': mode,
+        'format': audio_format,
+        'chunk_count': len(chunks),
+        'failed': failed_count,
+        'characters_used': sum(r.get('characters_used', 0) for r in results),
+        'chunks': results,
+        'playlist': [r['audio_url'] for r in results if r['success']],
+        'timestamp': datetime.now().isoformat()
+    }
+    if failed_count:
+        response['error'] = f'{failed_count} of {len(chunks)} chunks failed; re-send the request to retry them (finished chunks are served from cache)'
+        response['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 2)
+        return jsonify(response), 502
+    
+    if mode == 'stitched':
+        try:
+            audio_id = stitch_chunk_audio(response['playlist'], audio_format)
+        except (requests.RequestException, ValueError) as e:
+            response.update({'success': False, 'error': f'Could not stitch chunk audio: {str(e)}'})
+            return jsonify(response), 502
+        response['audio_id'] = audio_id
+        response['audio_url'] = f"/audio/{audio_id}"
+    
+    response['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 2)
+    return jsonify(response), 200
+
+def synthesize_audio_bytes(murf_payload, use_cache, lane='interactive'):
+    """
+    Synthesize one payload and download its audio through the pooled client
+    """
+    murf_data, _ = synthesize(murf_payload, use_cache=use_cache, lane=lane)
+    local_path = audio_store.path_for(murf_data.get('localAudioId'))
+    if local_path:
+        with open(local_path, 'rb') as f:
+            return f.read()
+    response = murf_client.get(extract_audio_url(murf_data), timeout=30)
+    response.raise_for_status()
+    return response.content
+
+def stream_audio_parts(payloads, parallelism, use_cache, lane='interactive'):
+    """
+    Yield the audio of each payload in order as soon as it is ready, keeping
+    up to `parallelism` sentences synthesizing ahead of the one being sent.
+    """
+    queue = deque()
+    upcoming = iter(payloads)
+    for murf_payload in upcoming:
+        queue.append(batch_executor.submit(synthesize_audio_bytes, murf_payload, use_cache, lane))
+        if len(queue) >= parallelism:
+            break
+    index = 0
+    try:
+        while queue:
+            audio = queue.popleft().result()
+            yield audio if index == 0 else strip_id3(audio)
+            index += 1
+            for murf_payload in upcoming:
+                queue.append(batch_executor.submit(synthesize_audio_bytes, murf_payload, use_cache, lane))
+                break
+    finally:
+        for future in queue:
+            future.cancel()
+
+@app.route('/tts/stream', methods=['POST'])
+def text_to_speech_stream():
+    """
+    Streaming TTS: synthesizes sentence by sentence and sends MP3 audio with
+    chunked transfer encoding as each sentence finishes, in order.
+    """
+    if not MURF_API_KEY:
+        return jsonify({
+            'error': 'Murf API key not configured. Please set MURF_API_KEY environment variable.',
+            'success': False
+        }), 500
+    
+    data = request.get_json(silent=True) or {}
+    text_input = data.get('text')
+    if not isinstance(text_input, str) or not text_input.strip():
+        return jsonify({'error': 'Missing or empty field: text', 'success': False}), 400
+    if data.get('format', 'MP3').upper() != 'MP3':
+        return jsonify({'error': 'Streaming supports MP3 only', 'success': False}), 400
+    
+    try:
+        parallelism = int(data.get('parallelism', TTS_BATCH_MAX_PARALLELISM))
+    except (TypeError, ValueError):
+        parallelism = TTS_BATCH_MAX_PARALLELISM
+    parallelism = max(1, min(parallelism, TTS_BATCH_MAX_PARALLELISM))
+    use_cache = not data.get('no_cache')
+    
+    # One chunk per sentence so the first audio is as short (and fast) as possible
+    chunks = [chunk for sentence in split_sentences(' '.join(text_input.split()))
+              for chunk in split_text(sentence, TTS_STREAM_CHUNK_CHARS)]
+    payloads = [build_murf_payload({**data, 'text': chunk}, text_normalizer) for chunk in chunks]
+    parts = stream_audio_parts(payloads, parallelism, use_cache, data.get('priority', 'interactive'))
+    
+    # Wait for the first sentence here so a failure can still return a JSON error
+    try:
+        first_part = next(parts)
+    except (OverBudgetError, CircuitOpenError) as e:
+        return retry_later_response(e)
+    except MurfAPIError as e:
+        return jsonify({'error': str(e), 'success': False, 'details': e.details}), e.status_code
+    except requests.RequestException as e:
+        return jsonify({'error': f'Network error calling Murf API: {str(e)}', 'success': False}), 502
+    
+    def generate():
+        yield first_part
+        try:
+            for part in parts:
+                yield part
+        except Exception as e:
+            # Headers are already sent; end the stream early and log it
+            log_event(logger, logging.ERROR, 'tts_stream_aborted', error=str(e))
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='audio/mpeg',
+        headers={
+            'X-TTS-Chunks': str(len(chunks)),
+            'Cache-Control': 'no-store'
+        }
+    )
+
+@app.route('/audio/<audio_id>')
+def stored_audio(audio_id):
+    """
+    Serve locally stored audio with Range support, a strong ETag (the
+    content hash) and long-lived cache headers
+    """
+    path = audio_store.path_for(audio_id)
+    if not path:
+        return jsonify({'success': False, 'error': 'Audio not found'}), 404
+    return audio_delivery.flask_response(path, audio_id, AudioStore.mimetype_for(path))
+
+# Health check endpoint
+@app.route('/health', methods=['GET'])
+def health_check():
+    """
+    Health check endpoint
+    """
+    return jsonify({
+        'status': 'healthy',
+        'timestamp': datetime.now().isoformat(),
+        'logging': structured_log.stats(),
+        'uploads': upload_retention.stats(),
+        'endpoints': {
+            'root': '/',
+            'tts': '/tts',
+            'tts_batch': '/tts/batch',
+            'tts_long': '/tts/long',
+            'tts_stream': '/tts/stream',
+            'audio': '/audio/<audio_id>',
+            'tts_test': '/tts/test',
+            'voices': '/tts/voices',
+            'pool_stats': '/tts/pool-stats',
+            'cache_stats': '/tts/cache-stats',
+            'rate_limit': '/tts/rate-limit',
+            'upstream_health': '/tts/upstream-health',
+            'warmup': '/tts/warmup',
+            'metrics': '/metrics',
+            'health': '/health',
+            'docs': '/docs'
+        }
+    })
+
+# Documentation endpoint (Flask equivalent of FastAPI's /docs)
+@app.route('/docs', methods=['GET'])
+def api_documentation():
+    """
+    API Documentation endpoint - Flask equivalent of FastAPI's /docs
+    """
+    port = int(os.getenv('FLASK_PORT', 5001))
+    
+    docs = {
+        'title': 'Flask TTS API Documentation',
+        'description': 'REST API for Text-to-Speech conversion using Murf API',
+        'version': '1.0.0',
+        'base_url': f'http://localhost:{port}',
+        'endpoints': {
+            'GET /': {
+                'description': 'Home page - renders HTML template',
+                'response': 'HTML page'
+            },
+            'GET /docs': {
+                'description': 'API documentation (this page)',
+                'response': 'JSON documentation'
+            },
+            'GET /health': {
+                'description': 'Health check endpoint',
+                'response': {
+                    'status': 'healthy',
+                    'timestamp': 'ISO timestamp',
+                    'endpoints': 'Available endpoints list'
+                }
+            },
+            'GET /tts/voices': {
+                'description': 'Get list of available voices from Murf API (cached in process, refreshed in the background; supports If-None-Match)',
+                'response': {
+                    'success': True,
+                    'voices': 'Array of voice objects',
+                    'count': 'Number of voices available'
+                }
+            },
+            'GET /tts/pool-stats': {
+                'description': 'Connection pool statistics for the shared Murf client',
+                'response': {
+                    'success': True,
+                    'pool': 'Request counters and per-host pool usage'
+                }
+            },
+            'GET /tts/cache-stats': {
+                'description': 'Hit/miss/eviction counters for the TTS result cache',
+                'response': {
+                    'success': True,
+                    'cache': 'Cache counters, size and hit ratio'
+                }
+            },
+            'GET /tts/rate-limit': {
+                'description': 'Outbound Murf budget (requests/sec, characters/min) and per-lane queueing times',
+                'response': {
+                    'success': True,
+                    'rate_limit': 'Bucket levels, queue depth and lane stats'
+                }
+            },
+            'GET /tts/upstream-health': {
+                'description': 'Murf circuit breaker state, retries, retry budget and hedged requests',
+                'response': {
+                    'success': True,
+                    'upstream': 'Breaker state, retry/hedge counters and current hedge delay'
+                }
+            },
+            'GET|POST /tts/warmup': {
+                'description': 'Pre-synthesize known phrases into the cache in the background (also at startup with TTS_WARMUP_ON_STARTUP=true)',
+                'optional_fields': ['phrases', 'voices'],
+                'defaults': 'Phrases from TTS_WARMUP_PHRASES_FILE plus the top texts in TTS_WARMUP_LOG_FILE, for TTS_WARMUP_VOICES',
+                'response': {
+                    'success': True,
+                    'warmup': 'state, total, synthesized, already_cached, failed'
+                }
+            },
+            'GET /metrics': {
+                'description': 'Prometheus metrics: per-route latency histograms, in-flight gauges, bytes, status counts, Murf latency per operation, cache and limiter gauges',
+                'response': 'text/plain Prometheus exposition format'
+            },
+            'GET /tts/test': {
+                'description': 'Test endpoint to verify TTS functionality',
+                'response': {
+                    'message': 'TTS endpoint is active',
+                    'status': 'success',
+                    'common_voice_ids': 'List of valid voice IDs'
+                }
+            },
+            'POST /tts': {
+                'description': 'Convert text to speech using Murf API',
+                'method': 'POST',
+                'content_type': 'application/json',
+                'required_fields': ['text'],
+                'optional_fields': ['voice_id', 'format', 'speech_rate', 'pitch', 'no_cache', 'store_audio', 'priority'],
+                'priority': 'interactive (default) or bulk; over-budget requests get 429 with Retry-After',
+                'normalization': 'Text is canonicalized per voice language (whitespace, Unicode, punctuation, times, numbers) before caching; see text_normalized in the response',
+                'logging': 'JSON log lines carry the X-Request-ID header (generated when missing); the same ID is returned on every response',
+                'resilience': 'Murf 429/5xx/network errors are retried with jittered backoff; while the circuit breaker is open the endpoint returns 503 with Retry-After',
+                'store_audio': 'true to download the audio once and return a local /audio/<id> URL (default from TTS_STORE_AUDIO)',
+                'cache_bypass': 'Send "no_cache": true or a Cache-Control: no-cache header',
+                'request_example': {
+                    'text': 'Hello, this is a test message',
+                    'voice_id': 'en-US-ken',
+                    'format': 'mp3',
+                    'speech_rate': 0
+                },
+                'valid_voice_ids': [
+                    'en-US-ken',
+                    'en-US-sarah',
+                    'en-US-laura',
+                    'en-US-wayne',
+                    'en-GB-daniel',
+                    'en-AU-nicole'
+                ],
+                'success_response': {
+                    'success': True,
+                    'audio_url': 'https://generated-audio-url.com/file.mp3',
+                    'text_processed': 'Your input text',
+                    'voice_used': 'en-US-ken',
+                    'format': 'mp3',
+                    'timestamp': 'ISO timestamp'
+                },
+                'error_response': {
+                    'success': False,
+                    'error': 'Error description'
+                }
+            },
+            'POST /tts/batch': {
+                'description': 'Synthesize many texts at once; duplicates are synthesized once and Murf is called concurrently',
+                'method': 'POST',
+                'content_type': 'application/json',
+                'required_fields': ['items'],
+                'optional_fields': ['parallelism', 'no_cache'],
+                'request_example': {
+                    'items': [
+                        {'text': 'Press one for sales', 'voice_id': 'en-US-ken'},
+                        {'text': 'Press two for support', 'voice_id': 'en-US-ken', 'format': 'mp3', 'speech_rate': 0}
+                    ],
+                    'parallelism': 4
+                },
+                'success_response': {
+                    'success': 'True if every item succeeded',
+                    'results': 'One entry per item, in input order, with audio_url or error'
+                }
+            },
+            'POST /tts/long': {
+                'description': 'Long-text TTS: chunks the text at sentence boundaries and synthesizes chunks in parallel',
+                'method': 'POST',
+                'content_type': 'application/json',
+                'required_fields': ['text'],
+                'optional_fields': ['voice_id', 'format', 'speech_rate', 'mode', 'max_chunk_chars', 'parallelism', 'no_cache', 'priority'],
+                'request_example': {
+                    'text': 'A few pages of text...',
+                    'voice_id': 'en-US-ken',
+                    'mode': 'stitched'
+                },
+                'success_response': {
+                    'success': True,
+                    'playlist': 'Ordered chunk audio URLs',
+                    'audio_url': 'Single stitched file (mode "stitched", MP3/WAV only)',
+                    'chunks': 'Per-chunk results'
+                }
+            },
+            'POST /tts/stream': {
+                'description': 'Streaming TTS: MP3 audio sent sentence by sentence with chunked transfer encoding',
+                'method': 'POST',
+                'content_type': 'application/json',
+                'required_fields': ['text'],
+                'optional_fields': ['voice_id', 'speech_rate', 'parallelism', 'no_cache', 'priority'],
+                'response': 'audio/mpeg stream; playback can start on the first chunk'
+            },
+            'GET /audio/<audio_id>': {
+                'description': 'Locally stored audio by content hash; supports Range, ETag/Last-Modified revalidation and long-lived caching',
+                'response': 'Audio file (or an X-Accel-Redirect/X-Sendfile hand-off when FILE_OFFLOAD is set)'
+            },
+            'GET /uploads/<upload_id>': {
+                'description': 'An uploaded recording by content hash, served like /audio/<audio_id> with private caching',
+                'response': 'Audio file'
+            }
+        },
+        'quick_test_commands': {
+            'test_endpoint': f'curl http://localhost:{port}/tts/test',
+            'get_voices': f'curl http://localhost:{port}/tts/voices',
+            'tts_conversion': f'curl -X POST http://localhost:{port}/tts -H "Content-Type: application/json" -d \'{{"text": "Hello world!", "voice_id": "en-US-ken"}}\'',
+            'health_check': f'curl http://localhost:{port}/health'
+        },
+        'postman_setup': {
+            'method': 'POST',
+            'url': f'http://localhost:{port}/tts',
+            'headers': {
+                'Content-Type': 'application/json'
+            },
+            'body': {
+                'text': 'Your text to convert to speech',
+                'voice_id': 'en-US-ken',
+                'format': 'mp3',
+                'speech_rate': 0
+            }
+        }
+    }
+    
+    return jsonify(docs)
+
+def is_serving_process():
+    # The debug reloader runs app.py twice; background work runs only in the process that serves
+    if __name__ == '__main__' and os.getenv('FLASK_DEBUG', 'True').lower() == 'true':
+        return os.environ.get('WERKZEUG_RUN_MAIN') == 'true'
+    # Pre-fork: the app is imported in the master; gunicorn.conf.py starts the work in each worker
+    return os.getenv('TTS_PREFORK', 'False').lower() != 'true'
+
+def start_startup_warmup():
+    """
+    Start the startup warm-up. With shared state only the first worker to
+    take the lease warms; the others get the results through the shared cache.
+    """
+    if not (TTS_WARMUP_ON_STARTUP and MURF_API_KEY):
+        return False
+    if shared_store and not shared_store.acquire_lease('tts_warmup', ttl=300):
+        return False
+    return cache_warmer.start(default_warmup_phrases(), TTS_WARMUP_VOICES)
+
+# Warm the TTS cache in the background so known phrases are hits from the first request,
+# and start upload retention
+if is_serving_process():
+    start_startup_warmup()
+    upload_retention.start()
+
+# This block ensures the server runs only when the script is executed directly
+if __name__ == '__main__':
+    # Get configuration from environment variables
     host = os.getenv('FLASK_HOST', '0.0.0.0')
     port = int(os.getenv('FLASK_PORT', 5001))
     debug = os.getenv('FLASK_DEBUG', 'True').lower() == 'true'
+    
+    print("=" * 50)
+    print("🚀 Flask TTS Server Starting...")
+    print(f"🌐 Host: {host}")
+    print(f"🔌 Port: {port}")
+    print(f"🐛 Debug: {debug}")
+    print(f"🔑 API Key: {'✅ Configured' if MURF_API_KEY else '❌ Missing'}")
+    print("=" * 50)
+    print("📡 Available endpoints:")
+    print(f"   • Home: http://localhost:{port}/")
+    print(f"   • API Docs: http://localhost:{port}/docs")
+    print(f"   • Auth Test: http://localhost:{port}/tts/auth-test")
+    print(f"   • Voices: http://localhost:{port}/tts/voices")
+    print(f"   • Pool Stats: http://localhost:{port}/tts/pool-stats")
+    print(f"   • Cache Stats: http://localhost:{port}/tts/cache-stats")
+    print(f"   • Rate Limit: http://localhost:{port}/tts/rate-limit")
+    print(f"   • Upstream Health: http://localhost:{port}/tts/upstream-health")
+    print(f"   • Cache Warm-up: http://localhost:{port}/tts/warmup")
+    print(f"   • TTS Test: http://localhost:{port}/tts/test")
+    print(f"   • TTS API: http://localhost:{port}/tts")
+    print(f"   • Batch TTS: http://localhost:{port}/tts/batch")
+    print(f"   • Long TTS: http://localhost:{port}/tts/long")
+    print(f"   • Streaming TTS: http://localhost:{port}/tts/stream")
+    print(f"   • Metrics: http://localhost:{port}/metrics")
+    print(f"   • Health: http://localhost:{port}/health")
+    print("=" * 50)
+    
+    print("💡 Multi-worker: gunicorn -c gunicorn.conf.py app:app")
+    print("=" * 50)
+    
+    # Run the app with environment configuration
     app.run(host=host, port=port, debug=debug)
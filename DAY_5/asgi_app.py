@@ -0,0 +1,429 @@
+# asgi_app.py
+# Async (ASGI) serving mode for the Murf TTS routes in app.py.
+# Same routes and response shapes, but Murf calls go through an async HTTP
+# client so one process can keep thousands of calls in flight.
+#
+#   uvicorn asgi_app:app --host 0.0.0.0 --port 5002
+import logging
+import os
+from contextlib import asynccontextmanager
+from datetime import datetime
+import time
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response
+from werkzeug.utils import secure_filename
+
+from services.audio_store import AudioStore
+from services.file_delivery import FileDelivery
+from services.murf_async import AsyncMurfClient, AsyncTokenManager, AsyncVoiceCatalog
+from services.single_flight import AsyncSingleFlight
+from services import metrics, structured_log
+from services.structured_log import log_event, request_logging_middleware, sample_verbose, text_summary
+from services.murf_payload import build_murf_payload, extract_audio_url
+from services.text_normalizer import TextNormalizer
+from services.tts_cache import TTSCache, make_cache_key
+from services.upload_ingest import MaxBodySizeMiddleware, UploadTooLarge, ingest_multipart
+from services.upload_retention import UploadRetention
+from services.voice_catalog import CatalogFetchError
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+except ImportError:
+    pass
+
+# JSON logs through a background queue, same settings as app.py
+structured_log.setup_logging(
+    level=os.getenv('LOG_LEVEL', 'INFO').upper(),
+    verbose_sample_rate=float(os.getenv('LOG_VERBOSE_SAMPLE_RATE', 0.01)),
+    queue_size=int(os.getenv('LOG_QUEUE_SIZE', 10000))
+)
+logger = logging.getLogger('murf_tts.asgi')
+
+# Murf API configuration
+MURF_API_URL = os.getenv('MURF_API_URL', 'https://api.murf.ai/v1/speech/generate')
+MURF_AUTH_URL = os.getenv('MURF_AUTH_URL', 'https://api.murf.ai/v1/auth/token')
+MURF_VOICES_URL = os.getenv('MURF_VOICES_URL', 'https://api.murf.ai/v1/speech/voices')
+MURF_API_KEY = os.getenv('MURF_API_KEY')
+
+murf_client = AsyncMurfClient(
+    MURF_API_KEY,
+    max_connections=int(os.getenv('MURF_ASYNC_MAX_CONNECTIONS', 200)),
+    max_keepalive=int(os.getenv('MURF_ASYNC_MAX_KEEPALIVE', 50)),
+    http2=os.getenv('MURF_HTTP2', 'False').lower() == 'true'
+)
+
+tts_cache = TTSCache(
+    max_entries=int(os.getenv('TTS_CACHE_MAX_ENTRIES', 512)),
+    ttl_seconds=int(os.getenv('TTS_CACHE_TTL', 3600)),
+    disk_dir=os.getenv('TTS_CACHE_DIR') or None
+)
+
+TTS_NORMALIZATION = os.getenv('TTS_NORMALIZATION', 'True').lower() == 'true'
+if os.getenv('TTS_NORMALIZATION_RULES'):
+    text_normalizer = TextNormalizer.from_file(os.getenv('TTS_NORMALIZATION_RULES'), enabled=TTS_NORMALIZATION)
+else:
+    text_normalizer = TextNormalizer(enabled=TTS_NORMALIZATION)
+
+UPLOAD_FOLDER = os.path.join(os.path.dirname(__file__), "uploads")
+os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+ALLOWED_EXTENSIONS = {'webm', 'wav', 'mp3', 'ogg', 'm4a'}
+UPLOAD_MAX_BYTES = int(os.getenv('UPLOAD_MAX_BYTES', 25 * 1024 * 1024))
+UPLOAD_INCOMING_FOLDER = os.path.join(UPLOAD_FOLDER, '.incoming')
+# Same content-addressed upload store as app.py: uploads are looked up by content hash
+upload_store = AudioStore(UPLOAD_FOLDER)
+# Same cache headers and front-proxy hand-off (FILE_OFFLOAD) as app.py
+upload_delivery = FileDelivery(
+    UPLOAD_FOLDER,
+    f"private, max-age={int(os.getenv('UPLOAD_CACHE_MAX_AGE', 7 * 24 * 3600))}, immutable",
+    offload=os.getenv('FILE_OFFLOAD', '').lower(),
+    offload_prefix=os.getenv('UPLOADS_OFFLOAD_PREFIX', '/_protected/uploads/')
+)
+# Same retention policy as app.py (size cap, idle age, least recently accessed first)
+upload_retention = UploadRetention(
+    UPLOAD_FOLDER,
+    max_bytes=int(os.getenv('UPLOAD_MAX_TOTAL_BYTES', 2 * 1024 ** 3)),
+    max_age=int(os.getenv('UPLOAD_MAX_AGE', 7 * 24 * 3600)),
+    interval=float(os.getenv('UPLOAD_GC_INTERVAL', 1)),
+    incoming_dir=UPLOAD_INCOMING_FOLDER
+)
+
+
+def allowed_file(filename):
+    return '.' in filename and \
+        filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+
+
+def error(status_code, payload):
+    return JSONResponse(payload, status_code=status_code)
+
+
+async def fetch_murf_auth_token():
+    response = await murf_client.post(
+        MURF_AUTH_URL,
+        headers={'api-key': MURF_API_KEY, 'Content-Type': 'application/json'},
+        timeout=10
+    )
+    if response.status_code != 200:
+        raise RuntimeError(f"Failed to generate auth token: {response.status_code} - {response.text}")
+    token_data = response.json()
+    return token_data.get('token'), token_data.get('expiryInEpochMillis', 0)
+
+
+async def fetch_murf_voices():
+    response = await murf_client.get(
+        MURF_VOICES_URL,
+        headers={'api-key': MURF_API_KEY, 'Accept': 'application/json'},
+        timeout=10
+    )
+    if response.status_code != 200:
+        raise CatalogFetchError(
+            f'Failed to fetch voices: {response.status_code}',
+            status_code=response.status_code,
+            details=response.text
+        )
+    return response.json()
+
+
+tts_coalescer = AsyncSingleFlight()
+auth_token_manager = AsyncTokenManager(fetch_murf_auth_token)
+voice_catalog = AsyncVoiceCatalog(
+    fetch_murf_voices,
+    refresh_interval=int(os.getenv('VOICES_REFRESH_INTERVAL', 3600))
+)
+
+
+async def cache_get(key):
+    # The disk tier does blocking file I/O; keep it off the event loop
+    if tts_cache.disk_dir:
+        return await run_in_threadpool(tts_cache.get, key)
+    return tts_cache.get(key)
+
+
+async def cache_set(key, value):
+    if tts_cache.disk_dir:
+        await run_in_threadpool(tts_cache.set, key, value)
+    else:
+        tts_cache.set(key, value)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    upload_retention.start()
+    yield
+    upload_retention.stop()
+    await murf_client.aclose()
+
+
+# FastAPI's own Swagger UI is disabled so /docs keeps the JSON docs of app.py
+app = FastAPI(title='Murf TTS API (async)', docs_url=None, redoc_url=None, lifespan=lifespan)
+# Oversized uploads get 413 before the multipart body is parsed (innermost, so
+# the 413 is still logged and counted)
+app.add_middleware(MaxBodySizeMiddleware, max_bytes=UPLOAD_MAX_BYTES, paths=['/upload-audio'])
+app.middleware('http')(request_logging_middleware(logger))
+metrics.init_asgi(app)
+
+metrics.CallbackGauge('tts_cache_lookups_total', 'TTS cache lookups by result', lambda: [
+    (('hit',), tts_cache.stats()['hits']),
+    (('disk_hit',), tts_cache.stats()['disk_hits']),
+    (('miss',), tts_cache.stats()['misses']),
+], labelnames=('result',), kind='counter')
+metrics.CallbackGauge('tts_cache_entries', 'Entries in the in-memory TTS cache', lambda: tts_cache.stats()['entries'])
+metrics.CallbackGauge('tts_coalesced_total', 'TTS misses that shared an in-flight Murf call',
+                      lambda: tts_coalescer.stats()['coalesced'], kind='counter')
+metrics.CallbackGauge('upload_store_bytes', 'Bytes held in the upload store', lambda: upload_retention.stats()['bytes'])
+metrics.CallbackGauge('upload_store_files', 'Files held in the upload store', lambda: upload_retention.stats()['files'])
+metrics.CallbackGauge('upload_gc_deleted_total', 'Uploads removed by retention, by reason', lambda: [
+    (('age',), upload_retention.stats()['deleted_age']),
+    (('quota',), upload_retention.stats()['deleted_quota']),
+    (('incoming',), upload_retention.stats()['deleted_incoming']),
+], labelnames=('reason',), kind='counter')
+
+
+@app.get('/health')
+async def health_check():
+    return {
+        'status': 'healthy',
+        'mode': 'asgi',
+        'timestamp': datetime.now().isoformat(),
+        'murf_client': murf_client.stats(),
+        'coalescing': tts_coalescer.stats(),
+        'normalization': text_normalizer.stats(),
+        'logging': structured_log.stats(),
+        'uploads': upload_retention.stats(),
+        'endpoints': {
+            'tts': '/tts',
+            'voices': '/tts/voices',
+            'auth_test': '/tts/auth-test',
+            'upload_audio': '/upload-audio',
+            'uploads': '/uploads/<upload_id>',
+            'health': '/health',
+            'metrics': '/metrics',
+            'docs': '/docs'
+        }
+    }
+
+
+@app.get('/docs')
+async def api_documentation():
+    return {
+        'title': 'Murf TTS API Documentation (async mode)',
+        'description': 'Same routes and payloads as the Flask app, served by an ASGI server',
+        'version': '1.0.0',
+        'endpoints': {
+            'GET /health': 'Health check plus async client stats',
+            'GET /tts/voices': 'Voice catalog (cached, stale-while-revalidate, supports If-None-Match)',
+            'GET /tts/auth-test': 'Test Murf API authentication',
+            'POST /tts': {
+                'required_fields': ['text'],
+                'optional_fields': ['voice_id', 'format', 'speech_rate', 'no_cache']
+            },
+            'POST /upload-audio': 'multipart/form-data with an "audio" file field; returns the upload ID (content hash)',
+            'GET /uploads/<upload_id>': 'A stored upload by ID'
+        },
+        'run': 'uvicorn asgi_app:app --host 0.0.0.0 --port 5002'
+    }
+
+
+@app.get('/tts/voices')
+async def get_voices(request: Request):
+    if not MURF_API_KEY:
+        return error(500, {'error': 'API key not configured', 'success': False})
+    try:
+        snapshot = await voice_catalog.get()
+    except CatalogFetchError as e:
+        return error(e.status_code, {'success': False, 'error': str(e), 'details': e.details})
+
+    headers = {
+        'ETag': f'"{snapshot.etag}"',
+        'Cache-Control': f'public, max-age=300, stale-while-revalidate={voice_catalog.refresh_interval}',
+        'X-Catalog-Age': str(int(time.time() - snapshot.fetched_at))
+    }
+    if f'"{snapshot.etag}"' in request.headers.get('if-none-match', ''):
+        return Response(status_code=304, headers=headers)
+    return Response(snapshot.body, media_type='application/json', headers=headers)
+
+
+@app.get('/tts/auth-test')
+async def test_auth():
+    if not MURF_API_KEY:
+        return error(500, {'error': 'Murf API key not configured', 'success': False})
+    auth_token = await auth_token_manager.get_token()
+    if not auth_token:
+        return error(401, {'success': False, 'error': 'Failed to authenticate with Murf API'})
+    return {
+        'success': True,
+        'message': 'Authentication successful',
+        'token_preview': f"{auth_token[:10]}...{auth_token[-10:]}",
+        'expires_at': auth_token_manager.expires_at,
+        'token_metrics': auth_token_manager.stats()
+    }
+
+
+class UpstreamError(Exception):
+    def __init__(self, status_code, payload):
+        super().__init__(payload.get('error'))
+        self.status_code = status_code
+        self.payload = payload
+
+
+async def call_murf(murf_payload, cache_key):
+    """
+    One upstream Murf call; stores the result in the cache on success.
+    """
+    try:
+        response = await murf_client.post(
+            MURF_API_URL,
+            headers={'Content-Type': 'application/json', 'Accept': 'application/json'},
+            json=murf_payload,
+            timeout=30
+        )
+    except httpx.HTTPError as e:
+        log_event(logger, logging.WARNING, 'murf_network_error', error=str(e))
+        raise UpstreamError(500, {'error': f'Network error calling Murf API: {str(e)}', 'success': False})
+
+    log_event(logger, logging.INFO, 'murf_response',
+              status=response.status_code,
+              voice_id=murf_payload['voiceId'],
+              characters=len(murf_payload['text']))
+    if logger.isEnabledFor(logging.DEBUG) and structured_log.sample_verbose():
+        log_event(logger, logging.DEBUG, 'murf_response_detail', headers=dict(response.headers), body=response.text)
+    if response.status_code != 200:
+        try:
+            error_details = response.json()
+        except ValueError:
+            error_details = response.text
+        log_event(logger, logging.WARNING, 'murf_error', status=response.status_code, details=error_details)
+        raise UpstreamError(response.status_code, {
+            'error': f'Murf API error: {response.status_code}',
+            'success': False,
+            'details': error_details,
+            'status_code': response.status_code,
+            'request_payload': murf_payload,
+            'suggestion': 'Try using a valid voice ID like: en-US-ken, en-US-sarah, en-US-laura, en-US-wayne'
+        })
+    murf_data = response.json()
+    if not extract_audio_url(murf_data):
+        raise UpstreamError(500, {
+            'error': 'Audio URL not found in Murf response',
+            'success': False,
+            'murf_response': murf_data
+        })
+    await cache_set(cache_key, murf_data)
+    return murf_data
+
+
+@app.post('/tts')
+async def text_to_speech(request: Request):
+    if not MURF_API_KEY:
+        return error(500, {
+            'error': 'Murf API key not configured. Please set MURF_API_KEY environment variable.',
+            'success': False
+        })
+
+    try:
+        data = await request.json()
+    except ValueError:
+        data = None
+    if not data or 'text' not in data:
+        return error(400, {
+            'error': 'Missing required field: text',
+            'success': False,
+            'expected_format': {
+                'text': 'Your text to convert to speech',
+                'voice_id': 'en-US-ken (optional)',
+                'format': 'mp3 (optional)',
+                'speech_rate': '0 (optional, -50 to 50)'
+            }
+        })
+    text_input = data['text']
+    if not text_input.strip():
+        return error(400, {'error': 'Text cannot be empty', 'success': False})
+
+    murf_payload = build_murf_payload(data, text_normalizer)
+    log_event(logger, logging.INFO, 'tts_request',
+              **text_summary(murf_payload['text']),
+              voice_id=murf_payload['voiceId'],
+              format=murf_payload['audioFormat'])
+    if logger.isEnabledFor(logging.DEBUG) and sample_verbose():
+        log_event(logger, logging.DEBUG, 'tts_request_text', text=murf_payload['text'])
+    cache_key = make_cache_key(murf_payload)
+    bypass_cache = bool(data.get('no_cache')) or \
+        'no-cache' in request.headers.get('cache-control', '').lower()
+
+    try:
+        if bypass_cache:
+            murf_data, cached = await call_murf(murf_payload, cache_key), False
+        else:
+            murf_data = await cache_get(cache_key)
+            cached = murf_data is not None
+            if not cached:
+                async def leader():
+                    # The previous leader for this key may have filled the cache just now
+                    fresh_data = tts_cache.peek(cache_key)
+                    if fresh_data:
+                        return fresh_data, True
+                    return await call_murf(murf_payload, cache_key), False
+
+                # Identical in-flight misses share one Murf call
+                (murf_data, cached), shared = await tts_coalescer.do(cache_key, leader)
+                cached = cached or shared
+    except UpstreamError as e:
+        return error(e.status_code, e.payload)
+
+    return {
+        'success': True,
+        'audio_url': extract_audio_url(murf_data),
+        'text_processed': text_input,
+        'text_normalized': murf_payload['text'],
+        'voice_used': murf_payload['voiceId'],
+        'format': murf_payload['audioFormat'],
+        'timestamp': datetime.now().isoformat(),
+        'characters_used': 0 if cached else murf_data.get('charactersUsed', 0),
+        'cached': cached,
+        'murf_response': murf_data
+    }
+
+
+@app.post('/upload-audio')
+async def upload_audio(request: Request):
+    # The "audio" part is parsed from the raw body straight into the incoming
+    # folder; UploadFile would spool it to disk first and be copied again
+    try:
+        part = await ingest_multipart(request, 'audio', UPLOAD_INCOMING_FOLDER, UPLOAD_MAX_BYTES)
+    except UploadTooLarge as e:
+        return error(413, {'success': False, 'error': str(e)})
+    except ValueError as e:
+        return error(400, {'success': False, 'error': str(e)})
+    if part is None:
+        return error(400, {'success': False, 'error': 'No audio file part'})
+    ingested, original_name, content_type = part
+    if not original_name or not allowed_file(original_name):
+        ingested.discard()
+        error_message = 'Invalid file type' if original_name else 'No selected audio file'
+        return error(400, {'success': False, 'error': error_message})
+
+    filename = secure_filename(original_name)
+    upload_id, created = await run_in_threadpool(upload_store.put_file, ingested, filename.rsplit('.', 1)[1])
+    upload_retention.record(upload_store.path_for(upload_id), ingested.size)
+    return {
+        'success': True,
+        'id': upload_id,
+        'url': f'/uploads/{upload_id}',
+        'filename': filename,
+        'content_type': content_type,
+        'size': ingested.size,
+        'duplicate': not created
+    }
+
+
+@app.get('/uploads/{upload_id}')
+async def uploaded_file(upload_id: str, request: Request):
+    path = upload_store.path_for(upload_id)
+    if not path:
+        return error(404, {'success': False, 'error': 'Upload not found'})
+    upload_retention.touch(path)
+    return upload_delivery.asgi_response(request, path, upload_id, AudioStore.mimetype_for(path))
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Benchmark the Flask (WSGI) and async (ASGI) serving modes side by side.
+Both servers should point MURF_API_URL at the same upstream (ideally a local
+stub with fixed latency) so the numbers compare serving models, not Murf.
+
+The Flask app throttles its Murf calls (MURF_RATE_LIMIT_RPS, default 10/s);
+the ASGI app has no outbound limiter. Start Flask with MURF_RATE_LIMIT_RPS=0
+so neither side is throttled; the benchmark checks /tts/rate-limit and refuses
+to run against a limited Flask server unless --allow-rate-limit is given.
+Keep MURF_HEDGE off. Against a healthy stub the breaker and retries never act.
+
+Usage:
+    # Flask, e.g. 4 sync workers, outbound limiter off
+    MURF_RATE_LIMIT_RPS=0 gunicorn -w 4 -b 127.0.0.1:5001 app:app
+    # ASGI, one process
+    uvicorn asgi_app:app --host 127.0.0.1 --port 5002
+
+    python bench_serving.py --flask-url http://127.0.0.1:5001 \
+        --asgi-url http://127.0.0.1:5002 --concurrency 200 --requests 2000
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def run_benchmark(base_url, total_requests, concurrency, text, timeout):
+    """
+    Fire total_requests POST /tts calls with at most `concurrency` in flight.
+    Every request bypasses the TTS cache so each one reaches the upstream.
+    """
+    latencies = []
+    statuses = {}
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout) as client:
+        async def one(i):
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    response = await client.post('/tts', json={'text': f'{text} #{i}', 'no_cache': True})
+                    status = response.status_code
+                except httpx.HTTPError as e:
+                    status = type(e).__name__
+                latencies.append((time.perf_counter() - started) * 1000)
+                statuses[status] = statuses.get(status, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total_requests)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    ok = statuses.get(200, 0)
+    return {
+        'url': base_url,
+        'requests': total_requests,
+        'concurrency': concurrency,
+        'elapsed_s': round(elapsed, 3),
+        'throughput_rps': round(total_requests / elapsed, 1) if elapsed else 0.0,
+        'error_rate': round(1 - ok / total_requests, 4) if total_requests else 0.0,
+        'latency_ms': {
+            'mean': round(statistics.mean(latencies), 1) if latencies else 0.0,
+            'p50': round(percentile(latencies, 50), 1),
+            'p95': round(percentile(latencies, 95), 1),
+            'p99': round(percentile(latencies, 99), 1),
+            'max': round(latencies[-1], 1) if latencies else 0.0,
+        },
+        'statuses': {str(k): v for k, v in statuses.items()},
+    }
+
+
+def flask_rate_limited(base_url, timeout):
+    """
+    True if the Flask server's outbound Murf limiter is on (the ASGI app has none).
+    """
+    try:
+        stats = httpx.get(f"{base_url.rstrip('/')}/tts/rate-limit", timeout=timeout).json()['rate_limit']
+    except (httpx.HTTPError, ValueError, KeyError):
+        return False
+    return stats.get('enabled', stats.get('requests_per_second', 0) > 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compare Flask and ASGI serving modes under concurrent /tts load. '
+                    'Run the Flask app with MURF_RATE_LIMIT_RPS=0: the ASGI app has no outbound '
+                    'Murf limiter, so a throttled Flask side would not compare like with like.')
+    parser.add_argument('--flask-url', default='http://127.0.0.1:5001')
+    parser.add_argument('--asgi-url', default='http://127.0.0.1:5002')
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=100)
+    parser.add_argument('--text', default='Benchmarking the Murf TTS service.')
+    parser.add_argument('--timeout', type=float, default=60)
+    parser.add_argument('--output', help='Write the results as JSON to this file')
+    parser.add_argument('--allow-rate-limit', action='store_true',
+                        help='Run even if the Flask server throttles Murf calls (results are not comparable)')
+    args = parser.parse_args()
+
+    if args.flask_url and args.asgi_url and flask_rate_limited(args.flask_url, args.timeout):
+        if not args.allow_rate_limit:
+            parser.error('the Flask server has its outbound Murf limiter on; restart it with '
+                         'MURF_RATE_LIMIT_RPS=0 or pass --allow-rate-limit')
+        print("⚠️  Flask side is rate limited; the comparison is not like for like")
+
+    results = []
+    for name, url in (('flask', args.flask_url), ('asgi', args.asgi_url)):
+        if not url:
+            continue
+        print(f"🚀 {name}: {args.requests} requests, concurrency {args.concurrency} -> {url}")
+        result = asyncio.run(run_benchmark(url, args.requests, args.concurrency, args.text, args.timeout))
+        result['mode'] = name
+        results.append(result)
+        latency = result['latency_ms']
+        print(f"   {result['throughput_rps']} req/s | p50 {latency['p50']} ms | p95 {latency['p95']} ms | "
+              f"p99 {latency['p99']} ms | errors {result['error_rate'] * 100:.1f}%")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"📝 Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,31 @@
+# gunicorn.conf.py
+# Multi-worker serving for the Flask TTS app:
+#     gunicorn -c gunicorn.conf.py app:app
+#
+# The app is imported once in the master (preload) and forked into workers.
+# Workers share the Murf auth token, voice catalog and TTS results through a
+# SQLite WAL file, so adding workers adds throughput, not upstream calls.
+# /metrics and the stats endpoints report the worker that answered.
+import multiprocessing
+import os
+
+bind = f"{os.getenv('FLASK_HOST', '0.0.0.0')}:{os.getenv('FLASK_PORT', 5001)}"
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+# Threads per worker: requests mostly wait on Murf, so each worker overlaps several
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 8))
+preload_app = True
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 120))
+graceful_timeout = 30
+keepalive = 5
+
+# Read by app.py at import time, i.e. before the fork
+os.environ.setdefault('SHARED_STATE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'shared_state.db'))
+os.environ['TTS_PREFORK'] = 'true'
+
+
+def post_worker_init(worker):
+    # Background threads start in the workers, never in the master
+    import app
+    app.start_startup_warmup()
+    app.upload_retention.start()
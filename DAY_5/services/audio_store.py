@@ -0,0 +1,155 @@
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+
+AUDIO_MIMETYPES = {
+    'mp3': 'audio/mpeg',
+    'wav': 'audio/wav',
+    'ogg': 'audio/ogg',
+    'flac': 'audio/flac',
+    'pcm': 'application/octet-stream',
+    'webm': 'audio/webm',
+    'm4a': 'audio/mp4',
+    'alaw': 'audio/basic',
+    'ulaw': 'audio/basic',
+}
+
+AUDIO_ID = re.compile(r'^[0-9a-f]{64}$')
+CHUNK_SIZE = 64 * 1024
+
+
+class AudioStore:
+    """
+    Content-addressed store for generated and uploaded audio. Files live under
+    <root>/<first two hash chars>/<sha256>.<ext>, so the same audio is kept
+    once and its ID doubles as a strong ETag.
+
+    The ID -> path and URL -> ID lookups are LRU caches of at most
+    max_entries each; a miss falls back to the shard directory or a download.
+    """
+
+    def __init__(self, root, max_entries=10000):
+        self.root = root
+        self.max_entries = max_entries
+        os.makedirs(root, exist_ok=True)
+        self._paths = OrderedDict()   # audio id -> path
+        self._remote = OrderedDict()  # remote URL -> audio id
+        self._lock = threading.Lock()
+
+    def _remember(self, index, key, value):
+        # Caller holds self._lock
+        index[key] = value
+        index.move_to_end(key)
+        while len(index) > self.max_entries:
+            index.popitem(last=False)
+
+    def _recall(self, index, key):
+        # Caller holds self._lock
+        value = index.get(key)
+        if value is not None:
+            index.move_to_end(key)
+        return value
+
+    def put_bytes(self, data, ext):
+        """
+        Store audio bytes and return their ID. Existing content is not rewritten.
+        """
+        audio_id = hashlib.sha256(data).hexdigest()
+        path = self._path(audio_id, ext)
+        if not os.path.exists(path):
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        with self._lock:
+            self._remember(self._paths, audio_id, path)
+        return audio_id
+
+    def put_file(self, ingested, ext):
+        """
+        Move an ingested upload (hashed while it streamed in) into the store.
+        Returns (id, created); for content already stored the temp file is
+        dropped instead of written a second time.
+        """
+        audio_id = ingested.sha256
+        existing = self.path_for(audio_id)
+        if existing:
+            ingested.discard()
+            return audio_id, False
+        path = self._path(audio_id, ext)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        ingested.move_to(path)
+        with self._lock:
+            self._remember(self._paths, audio_id, path)
+        return audio_id, True
+
+    def fetch_url(self, url, client, ext, timeout=30):
+        """
+        Download remote audio once (streamed to disk while hashing) and return
+        its ID. Repeated calls for the same URL reuse the stored file.
+        """
+        with self._lock:
+            audio_id = self._recall(self._remote, url)
+        if audio_id and self.path_for(audio_id):
+            return audio_id
+
+        tmp_path = os.path.join(self.root, f"download.{os.getpid()}.{threading.get_ident()}.tmp")
+        digest = hashlib.sha256()
+        response = client.get(url, stream=True, timeout=timeout)
+        try:
+            response.raise_for_status()
+            with open(tmp_path, 'wb') as f:
+                for block in response.iter_content(CHUNK_SIZE):
+                    digest.update(block)
+                    f.write(block)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        finally:
+            response.close()
+
+        audio_id = digest.hexdigest()
+        path = self._path(audio_id, ext)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.exists(path):
+            os.remove(tmp_path)
+        else:
+            os.replace(tmp_path, path)
+        with self._lock:
+            self._remember(self._paths, audio_id, path)
+            self._remember(self._remote, url, audio_id)
+        return audio_id
+
+    def path_for(self, audio_id):
+        """
+        Path of a stored file, or None if the ID is unknown.
+        """
+        if not AUDIO_ID.match(audio_id or ''):
+            return None
+        with self._lock:
+            path = self._recall(self._paths, audio_id)
+        if path and os.path.exists(path):
+            return path
+        shard = os.path.join(self.root, audio_id[:2])
+        try:
+            with os.scandir(shard) as entries:
+                for entry in entries:
+                    if entry.name.startswith(audio_id + '.') and not entry.name.endswith('.tmp'):
+                        with self._lock:
+                            self._remember(self._paths, audio_id, entry.path)
+                        return entry.path
+        except FileNotFoundError:
+            pass
+        return None
+
+    @staticmethod
+    def mimetype_for(path):
+        ext = path.rsplit('.', 1)[-1].lower()
+        return AUDIO_MIMETYPES.get(ext, 'application/octet-stream')
+
+    def _path(self, audio_id, ext):
+        return os.path.join(self.root, audio_id[:2], f"{audio_id}.{ext.lower()}")
@@ -0,0 +1,175 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def _now_ms():
+    return int(time.time() * 1000)
+
+
+class AuthTokenManager:
+    """
+    Thread-safe holder for the Murf auth token.
+    Only one refresh is ever in flight; concurrent callers wait for it and
+    share its result. A background thread renews the token before expiry so
+    request threads normally never pay for the round trip.
+    """
+
+    def __init__(self, fetch, refresh_margin_ms=60000, proactive_margin_ms=300000,
+                 retry_interval=30, wait_timeout=15):
+        # fetch() -> (token, expires_at_ms); raises on failure
+        self._fetch = fetch
+        self.refresh_margin_ms = refresh_margin_ms
+        self.proactive_margin_ms = proactive_margin_ms
+        self.retry_interval = retry_interval
+        self.wait_timeout = wait_timeout
+
+        self._token = None
+        self._expires_at = 0
+        self._lifetime_ms = None  # of the current token, as issued
+        self._backoff = 1.0
+        self._cond = threading.Condition()
+        self._refreshing = False
+        self._generation = 0
+        self._thread = None
+        self._stop = threading.Event()
+
+        self.refreshes = 0
+        self.failures = 0
+        self.coalesced_waits = 0
+        self.proactive_refreshes = 0
+        self.last_error = None
+        self.last_refresh_ms = None
+        self._total_refresh_ms = 0.0
+
+    @property
+    def token(self):
+        return self._token
+
+    @property
+    def expires_at(self):
+        return self._expires_at
+
+    def get_token(self):
+        """
+        Return a valid token, refreshing it if needed. Returns None if the
+        refresh failed.
+        """
+        self._ensure_started()
+        with self._cond:
+            if self._is_valid(self.refresh_margin_ms):
+                return self._token
+        return self.refresh()
+
+    def refresh(self, proactive=False):
+        """
+        Refresh the token, or wait for the refresh already in flight.
+        """
+        with self._cond:
+            if self._refreshing:
+                self.coalesced_waits += 1
+                generation = self._generation
+                deadline = time.monotonic() + self.wait_timeout
+                while self._refreshing and self._generation == generation:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                return self._token if self._is_valid(0) else None
+            self._refreshing = True
+
+        started = time.perf_counter()
+        token, expires_at, error = None, 0, None
+        try:
+            token, expires_at = self._fetch()
+            if not token:
+                error = 'Empty token in auth response'
+        except Exception as e:
+            error = str(e)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        with self._cond:
+            self._refreshing = False
+            self._generation += 1
+            self.last_refresh_ms = round(elapsed_ms, 2)
+            if error is None:
+                if expires_at and expires_at != self._expires_at:
+                    self._lifetime_ms = expires_at - _now_ms()
+                self._token = token
+                self._expires_at = expires_at or 0
+                self.refreshes += 1
+                self._total_refresh_ms += elapsed_ms
+                self.last_error = None
+                if proactive:
+                    self.proactive_refreshes += 1
+            else:
+                self.failures += 1
+                self.last_error = error
+                logger.warning(f"Murf auth token refresh failed: {error}")
+            self._cond.notify_all()
+            return self._token if self._is_valid(0) else None
+
+    def stats(self):
+        with self._cond:
+            avg_ms = self._total_refresh_ms / self.refreshes if self.refreshes else 0.0
+            return {
+                'has_token': self._token is not None,
+                'expires_at': self._expires_at,
+                'expires_in_seconds': max(0, (self._expires_at - _now_ms()) // 1000),
+                'refreshes': self.refreshes,
+                'proactive_refreshes': self.proactive_refreshes,
+                'failures': self.failures,
+                'coalesced_waits': self.coalesced_waits,
+                'last_refresh_ms': self.last_refresh_ms,
+                'avg_refresh_ms': round(avg_ms, 2),
+                'last_error': self.last_error,
+            }
+
+    def stop(self):
+        self._stop.set()
+
+    def _is_valid(self, margin_ms):
+        # Caller holds self._cond
+        return bool(self._token) and self._expires_at > _now_ms() + margin_ms
+
+    def _proactive_margin(self):
+        # Caller holds self._cond. A short-lived token is renewed halfway
+        # through its life rather than as soon as it is issued.
+        if self._lifetime_ms:
+            return min(self.proactive_margin_ms, self._lifetime_ms / 2)
+        return self.proactive_margin_ms
+
+    def _ensure_started(self):
+        # Started on first use so importing the app spawns no threads
+        if self._thread is not None:
+            return
+        with self._cond:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name='murf-auth-refresh', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if self._token and self.last_error is None and self._expires_at > 0:
+                    wait = (self._expires_at - self._proactive_margin() - _now_ms()) / 1000
+                else:
+                    wait = self.retry_interval if self._token or self.last_error else None
+            if wait is None:
+                # Nothing fetched yet; the first caller does that in the foreground
+                if self._stop.wait(1):
+                    return
+                continue
+            if self._stop.wait(max(self._backoff, wait)):
+                return
+            self.refresh(proactive=True)
+            with self._cond:
+                if self._is_valid(self._proactive_margin()):
+                    self._backoff = 1.0
+                else:
+                    # The refresh did not move expiry past the margin (failed, or
+                    # handed back a token that is still about to expire): back off
+                    self._backoff = min(self._backoff * 2, self.retry_interval)
@@ -0,0 +1,133 @@
+import json
+import logging
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+def load_phrases(path):
+    """
+    One phrase per line; blank lines and lines starting with # are skipped.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            lines = [line.strip() for line in f]
+    except OSError as e:
+        logger.warning(f"Could not read warm-up phrases from {path}: {e}")
+        return []
+    return [line for line in lines if line and not line.startswith('#')]
+
+
+def top_logged_texts(path, limit=20, max_lines=100000):
+    """
+    Most frequent request texts in a JSON-lines log (records with a "text"
+    field); other lines are ignored. Only the last `max_lines` lines are read.
+    """
+    counts = Counter()
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            lines = f.readlines()[-max_lines:]
+    except OSError as e:
+        logger.warning(f"Could not read warm-up log {path}: {e}")
+        return []
+    for line in lines:
+        line = line.strip()
+        if not line.startswith('{'):
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        text = record.get('text') if isinstance(record, dict) else None
+        if isinstance(text, str) and text.strip():
+            counts[text.strip()] += 1
+    return [text for text, _ in counts.most_common(limit)]
+
+
+class CacheWarmer:
+    """
+    Pre-synthesizes known phrases for a set of voices in the background so
+    the first real request for them is a cache hit. `warm_one(text, voice_id)`
+    does the work and returns True if the phrase was already cached.
+    One warm-up runs at a time.
+    """
+
+    def __init__(self, warm_one, parallelism=2):
+        self.warm_one = warm_one
+        self.parallelism = parallelism
+        self._lock = threading.Lock()
+        self._thread = None
+        self._status = {
+            'state': 'idle',
+            'total': 0,
+            'synthesized': 0,
+            'already_cached': 0,
+            'failed': 0,
+            'started_at': None,
+            'finished_at': None,
+            'errors': [],
+        }
+
+    @property
+    def running(self):
+        with self._lock:
+            return self._thread is not None and self._thread.is_alive()
+
+    def start(self, phrases, voices):
+        """
+        Start warming in a background thread; returns False if one is already running.
+        """
+        # Keep the first occurrence of each phrase, in order
+        phrases = list(dict.fromkeys(p.strip() for p in phrases if p and p.strip()))
+        jobs = [(text, voice_id) for text in phrases for voice_id in voices]
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return False
+            self._status.update({
+                'state': 'running',
+                'total': len(jobs),
+                'synthesized': 0,
+                'already_cached': 0,
+                'failed': 0,
+                'started_at': time.time(),
+                'finished_at': None,
+                'errors': [],
+            })
+            self._thread = threading.Thread(target=self._run, args=(jobs,), name='tts-cache-warmer', daemon=True)
+            self._thread.start()
+        return True
+
+    def _run(self, jobs):
+        with ThreadPoolExecutor(max_workers=self.parallelism, thread_name_prefix='tts-warm') as executor:
+            for job, outcome in zip(jobs, executor.map(self._warm, jobs)):
+                with self._lock:
+                    if outcome is True:
+                        self._status['already_cached'] += 1
+                    elif outcome is False:
+                        self._status['synthesized'] += 1
+                    else:
+                        self._status['failed'] += 1
+                        if len(self._status['errors']) < 20:
+                            self._status['errors'].append({'text': job[0][:80], 'voice_id': job[1], 'error': outcome})
+        with self._lock:
+            self._status['state'] = 'done'
+            self._status['finished_at'] = time.time()
+        logger.info(f"TTS cache warm-up finished: {self.stats()}")
+
+    def _warm(self, job):
+        try:
+            return bool(self.warm_one(*job))
+        except Exception as e:
+            return str(e) or type(e).__name__
+
+    def stats(self):
+        with self._lock:
+            status = dict(self._status)
+            status['errors'] = list(self._status['errors'])
+        if status['started_at']:
+            end = status['finished_at'] or time.time()
+            status['duration_s'] = round(end - status['started_at'], 2)
+        return status
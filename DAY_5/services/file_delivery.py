@@ -0,0 +1,140 @@
+import os
+from email.utils import formatdate, parsedate_to_datetime
+from urllib.parse import quote
+
+CHUNK_SIZE = 64 * 1024
+
+# FILE_OFFLOAD values: which header hands the body to the front proxy
+OFFLOAD_HEADERS = {
+    'x-accel-redirect': 'X-Accel-Redirect',  # nginx: internal location + relative path
+    'x-sendfile': 'X-Sendfile',  # Apache mod_xsendfile / lighttpd: absolute path
+}
+
+
+class FileDelivery:
+    """
+    Serves files from a content-addressed folder: strong ETag (the content
+    hash), Last-Modified, Cache-Control, conditional GET (304) and byte
+    ranges (206/416), so a seeking <audio> element only fetches what it plays.
+
+    Bodies go out through the server's zero-copy path where there is one
+    (wsgi.file_wrapper, which gunicorn turns into sendfile; the ASGI pathsend
+    extension). With `offload` set, only the headers are produced and the
+    front proxy sends the file itself (ranges included).
+    """
+
+    def __init__(self, root, cache_control, offload=None, offload_prefix='/_protected/'):
+        if offload and offload not in OFFLOAD_HEADERS:
+            raise ValueError(f"Unknown file offload {offload!r}; expected one of {sorted(OFFLOAD_HEADERS)}")
+        self.root = root
+        self.cache_control = cache_control
+        self.offload = offload or None
+        self.offload_prefix = offload_prefix.rstrip('/') + '/'
+
+    def headers(self, etag, st):
+        return {
+            'ETag': f'"{etag}"',
+            'Last-Modified': formatdate(st.st_mtime, usegmt=True),
+            'Cache-Control': self.cache_control,
+            'Accept-Ranges': 'bytes',
+        }
+
+    def offload_header(self, path):
+        """
+        (header, value) telling the front proxy which file to send, or None.
+        """
+        if not self.offload:
+            return None
+        if self.offload == 'x-sendfile':
+            return OFFLOAD_HEADERS[self.offload], os.path.abspath(path)
+        relative = os.path.relpath(path, self.root).replace(os.sep, '/')
+        return OFFLOAD_HEADERS[self.offload], self.offload_prefix + quote(relative)
+
+    def flask_response(self, path, etag, mimetype):
+        """
+        Response for the current Flask request.
+        """
+        from flask import Response, request
+
+        st = os.stat(path)
+        headers = self.headers(etag, st)
+        if not_modified(request.headers.get('If-None-Match'), request.headers.get('If-Modified-Since'), etag, st):
+            return Response(status=304, headers=headers)
+        offload = self.offload_header(path)
+        if offload:
+            headers[offload[0]] = offload[1]
+            return Response(status=200, headers=headers, mimetype=mimetype)
+
+        start, length, status = 0, st.st_size, 200
+        byte_range = request.range
+        if (byte_range is not None and len(byte_range.ranges) == 1
+                and if_range_matches(request.headers.get('If-Range'), etag, st)):
+            span = byte_range.range_for_length(st.st_size)
+            if span is None:
+                headers['Content-Range'] = f"bytes */{st.st_size}"
+                return Response(status=416, headers=headers)
+            start, stop = span
+            length, status = stop - start, 206
+            headers['Content-Range'] = f"bytes {start}-{stop - 1}/{st.st_size}"
+        headers['Content-Length'] = str(length)
+
+        f = open(path, 'rb')
+        f.seek(start)
+        # A server's file_wrapper sends from the current position and stops at
+        # Content-Length (PEP 3333), so ranges get sendfile too
+        file_wrapper = request.environ.get('wsgi.file_wrapper')
+        body = file_wrapper(f, CHUNK_SIZE) if file_wrapper else _read_span(f, length)
+        return Response(body, status=status, headers=headers, mimetype=mimetype, direct_passthrough=True)
+
+    def asgi_response(self, request, path, etag, mimetype):
+        """
+        Response for a Starlette/FastAPI request. FileResponse does the range
+        handling (and uses pathsend when the server offers it).
+        """
+        from starlette.responses import FileResponse, Response
+
+        st = os.stat(path)
+        headers = self.headers(etag, st)
+        if not_modified(request.headers.get('if-none-match'), request.headers.get('if-modified-since'), etag, st):
+            return Response(status_code=304, headers=headers)
+        offload = self.offload_header(path)
+        if offload:
+            headers[offload[0]] = offload[1]
+            return Response(status_code=200, headers=headers, media_type=mimetype)
+        return FileResponse(path, media_type=mimetype, headers=headers, stat_result=st)
+
+
+def not_modified(if_none_match, if_modified_since, etag, st):
+    """
+    RFC 9110 revalidation: If-None-Match (weak comparison) wins over If-Modified-Since.
+    """
+    if if_none_match:
+        tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+        return '*' in tags or f'"{etag}"' in tags
+    if if_modified_since:
+        try:
+            return int(st.st_mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def if_range_matches(if_range, etag, st):
+    # If-Range needs a strong validator: our ETag, or the exact Last-Modified date
+    if not if_range:
+        return True
+    if if_range.startswith('"'):
+        return if_range == f'"{etag}"'
+    return if_range == formatdate(st.st_mtime, usegmt=True)
+
+
+def _read_span(f, length):
+    try:
+        while length > 0:
+            block = f.read(min(CHUNK_SIZE, length))
+            if not block:
+                break
+            length -= len(block)
+            yield block
+    finally:
+        f.close()
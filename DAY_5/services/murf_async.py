@@ -0,0 +1,188 @@
+import asyncio
+import logging
+import time
+
+import httpx
+
+from services.metrics import upstream_call
+from services.murf_client import murf_operation, with_api_key
+from services.voice_catalog import CatalogFetchError, CatalogSnapshot
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncMurfClient:
+    """
+    Async counterpart of MurfClient: one httpx.AsyncClient with a bounded
+    keep-alive pool, so a single process can hold thousands of in-flight
+    Murf calls without a worker per call.
+    """
+
+    def __init__(self, api_key, max_connections=200, max_keepalive=50, timeout=30, http2=False):
+        self.api_key = api_key
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.http2 = http2
+        self.client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive
+            ),
+            timeout=timeout,
+            http2=http2,
+        )
+        self._requests = 0
+        self._errors = 0
+        self._in_flight = 0
+        self._total_seconds = 0.0
+
+    async def request(self, method, url, **kwargs):
+        kwargs['headers'] = with_api_key(url, self.api_key, kwargs.get('headers'))
+        self._in_flight += 1
+        started = time.perf_counter()
+        try:
+            with upstream_call('murf', murf_operation(url)) as call:
+                return call.record(await self.client.request(method, url, **kwargs))
+        except httpx.HTTPError:
+            self._errors += 1
+            raise
+        finally:
+            self._in_flight -= 1
+            self._requests += 1
+            self._total_seconds += time.perf_counter() - started
+
+    async def get(self, url, **kwargs):
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.request('POST', url, **kwargs)
+
+    def stats(self):
+        avg_ms = (self._total_seconds / self._requests * 1000) if self._requests else 0.0
+        return {
+            'requests': self._requests,
+            'errors': self._errors,
+            'in_flight': self._in_flight,
+            'avg_latency_ms': round(avg_ms, 2),
+            'max_connections': self.max_connections,
+            'max_keepalive_connections': self.max_keepalive,
+            'http2': self.http2,
+        }
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+class AsyncTokenManager:
+    """
+    Single-flight auth token holder for the event loop: concurrent callers
+    near expiry share one refresh instead of each calling Murf.
+    """
+
+    def __init__(self, fetch, refresh_margin_ms=60000):
+        # fetch() -> awaitable (token, expires_at_ms); raises on failure
+        self._fetch = fetch
+        self.refresh_margin_ms = refresh_margin_ms
+        self.token = None
+        self.expires_at = 0
+        self._lock = asyncio.Lock()
+        self.refreshes = 0
+        self.failures = 0
+        self.last_error = None
+        self.last_refresh_ms = None
+
+    def _is_valid(self):
+        return bool(self.token) and self.expires_at > int(time.time() * 1000) + self.refresh_margin_ms
+
+    async def get_token(self):
+        if self._is_valid():
+            return self.token
+        async with self._lock:
+            # Whoever held the lock before us may already have refreshed
+            if self._is_valid():
+                return self.token
+            started = time.perf_counter()
+            try:
+                self.token, self.expires_at = await self._fetch()
+                self.refreshes += 1
+                self.last_error = None
+            except Exception as e:
+                self.failures += 1
+                self.last_error = str(e)
+                logger.warning(f"Murf auth token refresh failed: {e}")
+                return None
+            finally:
+                self.last_refresh_ms = round((time.perf_counter() - started) * 1000, 2)
+            return self.token
+
+    def stats(self):
+        return {
+            'has_token': self.token is not None,
+            'expires_at': self.expires_at,
+            'refreshes': self.refreshes,
+            'failures': self.failures,
+            'last_refresh_ms': self.last_refresh_ms,
+            'last_error': self.last_error,
+        }
+
+
+class AsyncVoiceCatalog:
+    """
+    Stale-while-revalidate voice catalog for the event loop. Uses the same
+    pre-serialized CatalogSnapshot as the threaded VoiceCatalog.
+    """
+
+    def __init__(self, fetch, refresh_interval=3600):
+        # fetch() -> awaitable voices list; raises CatalogFetchError on failure
+        self._fetch = fetch
+        self.refresh_interval = refresh_interval
+        self._snapshot = None
+        self._lock = asyncio.Lock()
+        self._task = None
+        self.refreshes = 0
+        self.failures = 0
+        self.last_error = None
+
+    async def get(self):
+        snapshot = self._snapshot
+        if snapshot is None:
+            async with self._lock:
+                if self._snapshot is None:
+                    return await self.refresh()
+                return self._snapshot
+        if time.time() - snapshot.fetched_at > self.refresh_interval and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._refresh_quietly())
+        return snapshot
+
+    async def refresh(self):
+        try:
+            voices = await self._fetch()
+        except Exception as e:
+            self.failures += 1
+            self.last_error = str(e)
+            if self._snapshot is not None:
+                return self._snapshot
+            if isinstance(e, CatalogFetchError):
+                raise
+            raise CatalogFetchError(f'Error fetching voices: {e}') from e
+        self._snapshot = CatalogSnapshot(voices, time.time())
+        self.refreshes += 1
+        self.last_error = None
+        return self._snapshot
+
+    async def _refresh_quietly(self):
+        try:
+            await self.refresh()
+        except CatalogFetchError:
+            pass
+
+    def stats(self):
+        snapshot = self._snapshot
+        return {
+            'cached': snapshot is not None,
+            'count': snapshot.count if snapshot else 0,
+            'age_seconds': round(time.time() - snapshot.fetched_at, 1) if snapshot else None,
+            'refreshes': self.refreshes,
+            'failures': self.failures,
+            'last_error': self.last_error,
+        }
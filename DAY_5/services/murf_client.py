@@ -0,0 +1,133 @@
+import logging
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from services.metrics import upstream_call
+
+logger = logging.getLogger(__name__)
+
+
+def murf_operation(url):
+    """
+    Metrics label for a Murf URL: generate, voices, auth or audio (downloads).
+    """
+    path = url.split('?', 1)[0].rstrip('/')
+    if path.endswith('/speech/generate'):
+        return 'generate'
+    if path.endswith('/speech/voices'):
+        return 'voices'
+    if path.endswith('/auth/token'):
+        return 'auth'
+    return 'audio'
+
+
+def with_api_key(url, api_key, headers=None):
+    """
+    Request headers for url: the api-key goes to Murf API endpoints only,
+    never to audio downloads (those URLs point at S3/CDN hosts).
+    """
+    if not api_key or murf_operation(url) == 'audio':
+        return headers
+    return {'api-key': api_key, **(headers or {})}
+
+
+class MurfClient:
+    """
+    Shared keep-alive HTTP client for every call the app makes to Murf.
+    One requests.Session backed by a bounded urllib3 connection pool, so
+    DNS, TCP and TLS setup is paid once per connection instead of per call.
+    """
+
+    def __init__(self, api_key, pool_connections=4, pool_maxsize=20,
+                 pool_block=True, timeout=30):
+        self.api_key = api_key
+        self.timeout = timeout
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+
+        # pool_connections = number of hosts kept, pool_maxsize = connections
+        # per host; with pool_block the per-host limit is enforced, not advisory.
+        self._adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+        )
+        self.session = requests.Session()
+        self.session.mount('https://', self._adapter)
+        self.session.mount('http://', self._adapter)
+
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._errors = 0
+        self._in_flight = 0
+        self._total_seconds = 0.0
+
+    def request(self, method, url, **kwargs):
+        """
+        Send a request through the shared session and record timing.
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        kwargs['headers'] = with_api_key(url, self.api_key, kwargs.get('headers'))
+        with self._lock:
+            self._in_flight += 1
+        started = time.perf_counter()
+        try:
+            with upstream_call('murf', murf_operation(url)) as call:
+                return call.record(self.session.request(method, url, **kwargs))
+        except requests.RequestException:
+            with self._lock:
+                self._errors += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._in_flight -= 1
+                self._requests += 1
+                self._total_seconds += elapsed
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def stats(self):
+        """
+        Client counters plus per-host connection pool usage.
+        """
+        hosts = {}
+        pools = self._adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            # The pool queue is pre-filled with None placeholders; only real
+            # connection objects are idle keep-alive sockets.
+            idle = sum(1 for conn in list(pool.pool.queue) if conn is not None) if pool.pool else 0
+            hosts[f"{pool.scheme}://{pool.host}:{pool.port}"] = {
+                'connections_opened': pool.num_connections,
+                'requests_sent': pool.num_requests,
+                'idle_connections': idle,
+                'max_connections': self.pool_maxsize,
+            }
+
+        with self._lock:
+            requests_total = self._requests
+            avg_ms = (self._total_seconds / requests_total * 1000) if requests_total else 0.0
+            return {
+                'requests': requests_total,
+                'errors': self._errors,
+                'in_flight': self._in_flight,
+                'avg_latency_ms': round(avg_ms, 2),
+                'pool_connections': self.pool_connections,
+                'pool_maxsize': self.pool_maxsize,
+                'pool_block': self.pool_block,
+                'hosts': hosts,
+            }
+
+    def close(self):
+        self.session.close()
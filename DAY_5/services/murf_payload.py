@@ -0,0 +1,28 @@
+from services.text_normalizer import language_of
+
+
+def build_murf_payload(data, normalizer=None):
+    """
+    Build the Murf API payload from a /tts style request body. With a
+    TextNormalizer the text is canonicalized for the voice's language, so
+    the cache key and the Murf call both see the canonical form.
+    """
+    # Use a valid voice ID - changed from en-US-davis to en-US-ken
+    voice_id = data.get('voice_id', 'en-US-ken')
+    text = data['text']
+    if normalizer is not None:
+        text = normalizer.normalize(text, language_of(voice_id))
+
+    # Murf API payload (adjust parameters as needed)
+    return {
+        'text': text,
+        'voiceId': voice_id,
+        'audioFormat': data.get('format', 'MP3').upper(),
+        'modelVersion': 'GEN2',  # Use Gen2 for better quality
+        'rate': data.get('speech_rate', 0),  # Speech rate: -50 to 50 (0 = normal speed)
+        'channelType': 'STEREO'
+    }
+
+
+def extract_audio_url(murf_data):
+    return murf_data.get('audioFile') or murf_data.get('audio_url') or murf_data.get('url')
@@ -0,0 +1,174 @@
+import heapq
+import itertools
+import threading
+import time
+
+LANES = ('interactive', 'bulk')  # in priority order
+
+
+class OverBudgetError(Exception):
+    """
+    Raised when a call cannot get Murf budget within its lane's max wait.
+    """
+
+    def __init__(self, message, retry_after=1.0, lane='interactive'):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.lane = lane
+
+
+class TokenBucket:
+    """
+    Classic token bucket: `rate` tokens per second up to `capacity`.
+    Not thread-safe on its own; OutboundLimiter holds the lock.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        """
+        Seconds until `amount` tokens are available (0 if available now).
+        """
+        self._refill(now)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount):
+        self.tokens -= amount
+
+    def give_back(self, amount):
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class OutboundLimiter:
+    """
+    Limits outbound Murf calls by requests/second and characters/minute.
+    Callers queue in priority lanes (interactive before bulk, FIFO within a
+    lane) and get OverBudgetError instead of waiting past their lane's limit.
+    requests_per_second <= 0 turns the limiter off (calls are only counted).
+    """
+
+    def __init__(self, requests_per_second=10, characters_per_minute=100000, max_wait=None):
+        self.enabled = requests_per_second > 0
+        self.requests = TokenBucket(requests_per_second, max(1.0, requests_per_second))
+        self.characters = TokenBucket(characters_per_minute / 60.0, characters_per_minute)
+        self.max_wait = {'interactive': 2.0, 'bulk': 60.0}
+        self.max_wait.update(max_wait or {})
+
+        self._cond = threading.Condition()
+        self._queue = []  # heap of (lane priority, sequence)
+        self._sequence = itertools.count()
+        self._stats = {lane: {
+            'acquired': 0,
+            'rejected': 0,
+            'queued': 0,
+            'total_wait_ms': 0.0,
+            'max_wait_ms': 0.0,
+        } for lane in LANES}
+        self.characters_reserved = 0
+        self.characters_used = 0
+
+    def acquire(self, characters, lane='interactive'):
+        """
+        Block until there is budget for one request of `characters` chars.
+        Returns the time spent queueing, in seconds.
+        """
+        if lane not in LANES:
+            lane = 'interactive'
+        stats = self._stats[lane]
+        if not self.enabled:
+            with self._cond:
+                stats['acquired'] += 1
+                self.characters_reserved += characters
+            return 0.0
+        if characters > self.characters.capacity:
+            with self._cond:
+                stats['rejected'] += 1
+            raise OverBudgetError(
+                f'Text of {characters} characters exceeds the per-minute budget of {int(self.characters.capacity)}',
+                retry_after=60, lane=lane)
+
+        started = time.monotonic()
+        deadline = started + self.max_wait[lane]
+        ticket = (LANES.index(lane), next(self._sequence))
+        with self._cond:
+            heapq.heappush(self._queue, ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = 0.05
+                    if self._queue[0] == ticket:
+                        wait = max(self.requests.wait_time(1, now), self.characters.wait_time(characters, now))
+                        if wait == 0:
+                            self.requests.take(1)
+                            self.characters.take(characters)
+                            self.characters_reserved += characters
+                            waited = now - started
+                            stats['acquired'] += 1
+                            stats['total_wait_ms'] += waited * 1000
+                            stats['max_wait_ms'] = max(stats['max_wait_ms'], waited * 1000)
+                            if waited > 0:
+                                stats['queued'] += 1
+                            return waited
+                    if now + wait > deadline:
+                        stats['rejected'] += 1
+                        raise OverBudgetError(
+                            f'Murf budget exhausted for the {lane} lane; try again later',
+                            retry_after=round(max(wait, 0.1), 2), lane=lane)
+                    self._cond.wait(wait)
+            finally:
+                if ticket in self._queue:
+                    self._queue.remove(ticket)
+                    heapq.heapify(self._queue)
+                self._cond.notify_all()
+
+    def reconcile(self, reserved, actual):
+        """
+        Settle a reservation against Murf's reported charactersUsed.
+        """
+        if actual is None:
+            actual = reserved
+        with self._cond:
+            self.characters_used += actual
+            if not self.enabled:
+                return
+            if actual < reserved:
+                self.characters.give_back(reserved - actual)
+            elif actual > reserved:
+                self.characters.take(actual - reserved)
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            now = time.monotonic()
+            self.requests.wait_time(0, now)
+            self.characters.wait_time(0, now)
+            lanes = {}
+            for lane, s in self._stats.items():
+                lanes[lane] = {
+                    **s,
+                    'total_wait_ms': round(s['total_wait_ms'], 2),
+                    'max_wait_ms': round(s['max_wait_ms'], 2),
+                    'avg_wait_ms': round(s['total_wait_ms'] / s['acquired'], 2) if s['acquired'] else 0.0,
+                    'max_queue_wait_s': self.max_wait[lane],
+                }
+            return {
+                'enabled': self.enabled,
+                'queue_depth': len(self._queue),
+                'requests_per_second': self.requests.rate,
+                'characters_per_minute': int(self.characters.capacity),
+                'request_tokens': round(self.requests.tokens, 2),
+                'character_tokens': int(self.characters.tokens),
+                'characters_reserved': self.characters_reserved,
+                'characters_used': self.characters_used,
+                'lanes': lanes,
+            }
@@ -0,0 +1,325 @@
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, wait
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling an upstream the breaker considers unhealthy.
+    """
+
+    def __init__(self, message, retry_after=1.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(TimeoutError):
+    """
+    Raised when a call, with all its retries and hedges, runs past its total deadline.
+    """
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and fails fast for
+    `reset_timeout` seconds, then lets a single probe call through
+    (half-open); the probe's outcome closes or re-opens the circuit.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        self.times_opened = 0
+        self.rejected = 0
+
+    def before_call(self):
+        """
+        Raise CircuitOpenError if the call must not go out right now.
+        """
+        with self._lock:
+            if self.state == self.OPEN:
+                remaining = self.opened_at + self.reset_timeout - time.monotonic()
+                if remaining > 0:
+                    self.rejected += 1
+                    raise CircuitOpenError('Murf API is unavailable; failing fast', retry_after=round(remaining, 2))
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN:
+                if self._probe_in_flight:
+                    self.rejected += 1
+                    raise CircuitOpenError('Murf API is recovering; probe in flight', retry_after=1.0)
+                self._probe_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            self._probe_in_flight = False
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.times_opened += 1
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def release(self):
+        """
+        The call ended without telling us anything about upstream health.
+        """
+        with self._lock:
+            self._probe_in_flight = False
+
+    def stats(self):
+        with self._lock:
+            return {
+                'state': self.state,
+                'consecutive_failures': self.consecutive_failures,
+                'failure_threshold': self.failure_threshold,
+                'reset_timeout': self.reset_timeout,
+                'times_opened': self.times_opened,
+                'rejected': self.rejected,
+            }
+
+
+class RetryBudget:
+    """
+    Caps retries (and hedges) to `ratio` of the requests seen in the last
+    `window` seconds, plus a small floor so low traffic can still retry.
+    """
+
+    def __init__(self, ratio=0.2, min_per_second=1.0, window=10.0):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.window = window
+        self._requests = deque()
+        self._retries = deque()
+        self._lock = threading.Lock()
+        self.exhausted = 0
+
+    def _trim(self, now):
+        # Caller holds self._lock
+        for events in (self._requests, self._retries):
+            while events and events[0] < now - self.window:
+                events.popleft()
+
+    def record_request(self):
+        with self._lock:
+            self._requests.append(time.monotonic())
+
+    def try_spend(self):
+        """
+        Take one retry from the budget; False if none is left.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._trim(now)
+            allowed = self.min_per_second * self.window + self.ratio * len(self._requests)
+            if len(self._retries) >= allowed:
+                self.exhausted += 1
+                return False
+            self._retries.append(now)
+            return True
+
+    def stats(self):
+        with self._lock:
+            self._trim(time.monotonic())
+            return {
+                'ratio': self.ratio,
+                'window_seconds': self.window,
+                'requests_in_window': len(self._requests),
+                'retries_in_window': len(self._retries),
+                'exhausted': self.exhausted,
+            }
+
+
+class LatencyTracker:
+    """
+    Rolling window of recent call latencies, used to pick the hedge delay.
+    """
+
+    def __init__(self, size=200):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct, min_samples=20):
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(round(pct / 100 * (len(samples) - 1))))]
+
+
+def backoff_delay(attempt, base=0.2, cap=2.0):
+    """
+    "Full jitter" exponential backoff: uniform in [0, min(cap, base * 2^attempt)].
+    """
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class ResilientCaller:
+    """
+    Runs an upstream call behind a circuit breaker, retries failures with
+    jittered backoff while the retry budget allows, and optionally hedges:
+    if the call has not answered after the hedge delay (fixed, or the
+    observed p95), a second identical call is sent and the first success wins.
+
+    `is_failure(exc)` decides which exceptions mean the upstream is unhealthy;
+    those are retried and count against the breaker. Anything else is
+    re-raised straight away.
+
+    With `deadline` (seconds) every attempt, backoff and hedge of one call
+    shares that total: fn(remaining) gets the seconds left to use as its own
+    timeout, no retry starts that could not finish in time, and running out
+    raises DeadlineExceeded.
+    """
+
+    def __init__(self, breaker, budget, is_failure, max_retries=2, backoff_base=0.2,
+                 backoff_cap=2.0, hedge_executor=None, hedge_delay=None, hedge_percentile=95,
+                 deadline=None):
+        self.breaker = breaker
+        self.budget = budget
+        self.is_failure = is_failure
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.hedge_executor = hedge_executor
+        self.hedge_delay = hedge_delay  # seconds; None means use the observed percentile
+        self.hedge_percentile = hedge_percentile
+        self.deadline = deadline
+        self.latency = LatencyTracker()
+        self._lock = threading.Lock()
+        self._counters = {
+            'calls': 0,
+            'retries': 0,
+            'hedges': 0,
+            'hedge_wins': 0,
+            'failures': 0,
+            'deadline_exceeded': 0,
+            'retries_skipped_deadline': 0,
+        }
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def call(self, fn):
+        """
+        Run fn(remaining_seconds) with breaker, retries and hedging;
+        remaining_seconds is None when there is no deadline.
+        """
+        self._count('calls')
+        deadline = time.monotonic() + self.deadline if self.deadline else None
+        attempt = 0
+        while True:
+            self.breaker.before_call()
+            self.budget.record_request()
+            try:
+                result = self._attempt(fn, deadline)
+            except DeadlineExceeded:
+                self.breaker.record_failure()
+                self._count('failures')
+                self._count('deadline_exceeded')
+                raise
+            except Exception as e:
+                if not self.is_failure(e):
+                    self.breaker.release()
+                    raise
+                self.breaker.record_failure()
+                self._count('failures')
+                if attempt >= self.max_retries:
+                    raise
+                delay = backoff_delay(attempt + 1, self.backoff_base, self.backoff_cap)
+                if deadline is not None and time.monotonic() + delay >= deadline:
+                    self._count('retries_skipped_deadline')
+                    raise
+                if not self.budget.try_spend():
+                    raise
+                attempt += 1
+                self._count('retries')
+                time.sleep(delay)
+                continue
+            self.breaker.record_success()
+            return result
+
+    def current_hedge_delay(self):
+        if self.hedge_executor is None:
+            return None
+        if self.hedge_delay:
+            return self.hedge_delay
+        return self.latency.percentile(self.hedge_percentile)
+
+    @staticmethod
+    def _remaining(deadline):
+        if deadline is None:
+            return None
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise DeadlineExceeded('Upstream call deadline exceeded')
+        return remaining
+
+    def _timed(self, fn, remaining):
+        started = time.monotonic()
+        result = fn(remaining)
+        self.latency.add(time.monotonic() - started)
+        return result
+
+    def _attempt(self, fn, deadline):
+        delay = self.current_hedge_delay()
+        if delay is None:
+            return self._timed(fn, self._remaining(deadline))
+
+        primary = self.hedge_executor.submit(self._timed, fn, self._remaining(deadline))
+        done, _ = wait([primary], timeout=delay)
+        if done or not self.budget.try_spend():
+            done, _ = wait([primary], timeout=self._remaining(deadline))
+            if not done:
+                raise DeadlineExceeded('Upstream call deadline exceeded')
+            return primary.result()
+
+        self._count('hedges')
+        hedge = self.hedge_executor.submit(self._timed, fn, self._remaining(deadline))
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, timeout=self._remaining(deadline), return_when=FIRST_COMPLETED)
+            if not done:
+                raise DeadlineExceeded('Upstream call deadline exceeded')
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        self._count('hedge_wins')
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+        delay = self.current_hedge_delay()
+        return {
+            **counters,
+            'max_retries': self.max_retries,
+            'deadline_seconds': self.deadline,
+            'hedging_enabled': self.hedge_executor is not None,
+            'hedge_delay_ms': round(delay * 1000, 1) if delay else None,
+            'circuit_breaker': self.breaker.stats(),
+            'retry_budget': self.budget.stats(),
+        }
@@ -0,0 +1,212 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class SharedStore:
+    """
+    Key/value store shared by every worker process on one host: a SQLite
+    file in WAL mode, so readers never block the single writer. Values are
+    JSON. Leases give cross-process single-flight (one worker refreshes a
+    token or catalog, the others wait and read its result).
+
+    Store errors are logged and counted, never raised: callers treat them as
+    misses and fall back to their own upstream call.
+    """
+
+    PURGE_EVERY = 256  # sets between sweeps of expired rows
+
+    def __init__(self, path, busy_timeout=5.0):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._sets_since_purge = 0
+        self._counters = {
+            'hits': 0,
+            'misses': 0,
+            'sets': 0,
+            'fetches': 0,
+            'lease_waits': 0,
+            'lease_timeouts': 0,
+            'errors': 0,
+        }
+
+        conn = self._conn()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS kv (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                expires_at REAL,
+                PRIMARY KEY (namespace, key)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS leases (
+                name TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            ) WITHOUT ROWID;
+        """)
+
+    def _conn(self):
+        # One connection per thread, reopened in a forked child
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def _error(self, action, e):
+        self._count('errors')
+        logger.warning(f"Shared state {action} failed ({self.path}): {e}")
+
+    def get_entry(self, namespace, key):
+        """
+        (value, updated_at) for a live entry, or None.
+        """
+        try:
+            row = self._conn().execute(
+                'SELECT value, updated_at, expires_at FROM kv WHERE namespace = ? AND key = ?',
+                (namespace, key)
+            ).fetchone()
+        except sqlite3.Error as e:
+            self._error('read', e)
+            return None
+        if row is None or (row[2] is not None and row[2] <= time.time()):
+            self._count('misses')
+            return None
+        self._count('hits')
+        return json.loads(row[0]), row[1]
+
+    def get(self, namespace, key):
+        entry = self.get_entry(namespace, key)
+        return entry[0] if entry else None
+
+    def set(self, namespace, key, value, expires_at=None):
+        try:
+            self._conn().execute(
+                'INSERT OR REPLACE INTO kv (namespace, key, value, updated_at, expires_at) VALUES (?, ?, ?, ?, ?)',
+                (namespace, key, json.dumps(value, separators=(',', ':')), time.time(), expires_at)
+            )
+        except sqlite3.Error as e:
+            self._error('write', e)
+            return
+        with self._lock:
+            self._counters['sets'] += 1
+            self._sets_since_purge += 1
+            purge = self._sets_since_purge >= self.PURGE_EVERY
+            if purge:
+                self._sets_since_purge = 0
+        if purge:
+            self.purge_expired()
+
+    def delete(self, namespace, key):
+        try:
+            self._conn().execute('DELETE FROM kv WHERE namespace = ? AND key = ?', (namespace, key))
+        except sqlite3.Error as e:
+            self._error('delete', e)
+
+    def purge_expired(self):
+        try:
+            return self._conn().execute(
+                'DELETE FROM kv WHERE expires_at IS NOT NULL AND expires_at <= ?', (time.time(),)
+            ).rowcount
+        except sqlite3.Error as e:
+            self._error('purge', e)
+            return 0
+
+    def _owner(self):
+        return f"{os.getpid()}:{threading.get_ident()}"
+
+    def acquire_lease(self, name, ttl):
+        """
+        Take the named lease for ttl seconds unless another live owner holds it.
+        Returns True if this thread now holds it.
+        """
+        now = time.time()
+        try:
+            cursor = self._conn().execute(
+                'INSERT INTO leases (name, owner, expires_at) VALUES (?, ?, ?) '
+                'ON CONFLICT(name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at '
+                'WHERE leases.expires_at <= ? OR leases.owner = excluded.owner',
+                (name, self._owner(), now + ttl, now)
+            )
+        except sqlite3.Error as e:
+            self._error('lease', e)
+            return False
+        return cursor.rowcount == 1
+
+    def release_lease(self, name):
+        try:
+            self._conn().execute('DELETE FROM leases WHERE name = ? AND owner = ?', (name, self._owner()))
+        except sqlite3.Error as e:
+            self._error('lease release', e)
+
+    def fetch_once(self, namespace, key, fetch, is_fresh, ttl=None, lease_ttl=30, wait_timeout=15):
+        """
+        Return the shared value if is_fresh(value, updated_at) says so. Otherwise
+        one process calls fetch() under a lease and publishes the result while
+        the others wait for it. If the lease holder does not finish within
+        wait_timeout, the caller fetches for itself.
+        """
+        entry = self.get_entry(namespace, key)
+        if entry is not None and is_fresh(*entry):
+            return entry[0]
+
+        lease = f"fetch:{namespace}:{key}"
+        deadline = time.monotonic() + wait_timeout
+        waited = False
+        while not self.acquire_lease(lease, lease_ttl):
+            if not waited:
+                waited = True
+                self._count('lease_waits')
+            if time.monotonic() >= deadline:
+                self._count('lease_timeouts')
+                self._count('fetches')
+                return fetch()
+            time.sleep(0.05)
+            entry = self.get_entry(namespace, key)
+            if entry is not None and is_fresh(*entry):
+                return entry[0]
+
+        try:
+            # Another process may have published while we took the lease
+            entry = self.get_entry(namespace, key)
+            if entry is not None and is_fresh(*entry):
+                return entry[0]
+            self._count('fetches')
+            value = fetch()
+            self.set(namespace, key, value, expires_at=time.time() + ttl if ttl else None)
+            return value
+        finally:
+            self.release_lease(lease)
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+        try:
+            rows = self._conn().execute('SELECT namespace, COUNT(*) FROM kv GROUP BY namespace').fetchall()
+        except sqlite3.Error:
+            rows = []
+        return {
+            **counters,
+            'path': self.path,
+            'entries': dict(rows),
+            'pid': os.getpid(),
+        }
@@ -0,0 +1,97 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls with the same key into one: the first caller
+    runs the function, everyone arriving while it runs waits for and shares
+    its result (or exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight = {}  # key -> Future
+        self.leaders = 0
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        """
+        Returns (result, shared); shared is True if another caller did the work.
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                future = Future()
+                self._in_flight[key] = future
+                self.leaders += 1
+                leader = True
+
+        if not leader:
+            return future.result(), True
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            in_flight = len(self._in_flight)
+        return {
+            'leaders': self.leaders,
+            'coalesced': self.coalesced,
+            'in_flight': in_flight,
+        }
+
+
+class AsyncSingleFlight:
+    """
+    SingleFlight for coroutines running on one event loop.
+    """
+
+    def __init__(self):
+        self._in_flight = {}  # key -> asyncio.Future
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key, fn):
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            # shield: a cancelled follower must not cancel the shared call
+            return await asyncio.shield(future), True
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        self.leaders += 1
+        try:
+            result = await fn()
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            self._in_flight.pop(key, None)
+
+    def stats(self):
+        return {
+            'leaders': self.leaders,
+            'coalesced': self.coalesced,
+            'in_flight': len(self._in_flight),
+        }
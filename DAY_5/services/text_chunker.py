@@ -0,0 +1,59 @@
+import re
+
+# Break after terminal punctuation, keeping up to two closing quotes/brackets
+# with the sentence (lookbehinds must be fixed width, hence one per length)
+_CLOSERS = r'["\')\]]'
+SENTENCE_BOUNDARY = re.compile(
+    rf'(?:(?<=[.!?…])|(?<=[.!?…]{_CLOSERS})|(?<=[.!?…]{_CLOSERS}{_CLOSERS}))\s+'
+)
+CLAUSE_BOUNDARY = re.compile(r'(?<=[,;:—])\s+')
+
+
+def split_sentences(text):
+    """
+    Split text into sentences, keeping the trailing punctuation.
+    """
+    return [s.strip() for s in SENTENCE_BOUNDARY.split(text) if s.strip()]
+
+
+def _split_long(piece, max_chars):
+    # A single sentence over the limit: clause boundaries, then words, then a hard cut
+    for pattern in (CLAUSE_BOUNDARY, re.compile(r'\s+')):
+        parts = [p for p in pattern.split(piece) if p]
+        if len(parts) > 1:
+            return _pack(parts, max_chars)
+    return [piece[i:i + max_chars] for i in range(0, len(piece), max_chars)]
+
+
+def _pack(parts, max_chars):
+    chunks = []
+    current = ''
+    for part in parts:
+        if len(part) > max_chars:
+            if current:
+                chunks.append(current)
+                current = ''
+            chunks.extend(_split_long(part, max_chars))
+            continue
+        candidate = f"{current} {part}" if current else part
+        if len(candidate) <= max_chars:
+            current = candidate
+        else:
+            chunks.append(current)
+            current = part
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def split_text(text, max_chars=1000):
+    """
+    Split text into chunks of at most max_chars, breaking at sentence
+    boundaries where possible and at clause or word boundaries otherwise.
+    """
+    if max_chars <= 0:
+        raise ValueError('max_chars must be positive')
+    text = ' '.join(text.split())
+    if not text:
+        return []
+    return _pack(split_sentences(text), max_chars)
@@ -0,0 +1,164 @@
+import json
+import logging
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Rules per language (the voice ID prefix, e.g. "en" for en-US-ken).
+# Languages without an entry use "default"; entries override "default" key by key.
+DEFAULT_RULES = {
+    'default': {
+        'unicode_form': 'NFKC',         # None to leave the text as is
+        'standardize_quotes': True,     # curly quotes/dashes/ellipsis -> ASCII
+        'collapse_whitespace': True,
+        'collapse_punctuation': True,   # "!!!" -> "!", "...." -> "..."
+        'terminal_punctuation': '.',    # appended when the text ends without one; None to disable
+        'thousands_separator': None,    # "1,000" -> "1000" when set to ","
+        'times': False,                 # "3pm" / "3 p.m." -> "3 PM"
+        'iso_dates': True,              # "2024/01/05" / "2024.01.05" -> "2024-01-05"
+    },
+    'en': {
+        'thousands_separator': ',',
+        'times': True,
+    },
+    'de': {
+        'thousands_separator': '.',
+    },
+    'fr': {
+        'thousands_separator': ' ',
+        'terminal_punctuation': None,   # French spacing before ! and ? must survive
+    },
+}
+
+_QUOTES = str.maketrans({
+    '‘': "'", '’': "'", '‚': "'", '‛': "'",
+    '“': '"', '”': '"', '„': '"', '‟': '"',
+    '–': '-', '—': '-', '−': '-',
+    ' ': ' ', ' ': ' ',
+})
+_TERMINAL = '.!?。！？'
+_WHITESPACE = re.compile(r'\s+')
+_SPACE_BEFORE_PUNCT = re.compile(r'\s+([,.;:!?])')
+_REPEATED_PUNCT = re.compile(r'([!?,;:])\1+')
+_LONG_ELLIPSIS = re.compile(r'\.{4,}')
+# "m." keeps its period only when it is an abbreviation mid-sentence (a lowercase
+# word follows); "at 3 p.m. Then" leaves the sentence-ending period in place
+_TIME = re.compile(r'\b(\d{1,2})(:\d{2})?\s*([ap])\.?\s*m\b(?:\.(?=\s+(?-i:[a-z])))?', re.IGNORECASE)
+_ISO_DATE = re.compile(r'\b(\d{4})[/.](\d{2})[/.](\d{2})\b')
+
+
+def language_of(voice_id):
+    """
+    "en-US-ken" -> "en"
+    """
+    return (voice_id or '').split('-', 1)[0].lower() or 'default'
+
+
+class TextNormalizer:
+    """
+    Builds a canonical form of TTS text so requests that differ only in
+    formatting share one cache key and one Murf synthesis. Keeps counters
+    of how often normalization changed the text and of collapses: distinct
+    raw texts that normalized onto a canonical form already seen from a
+    different raw text. Both are counted here, for every caller; a raw text
+    is only counted once, however often it is repeated. The last
+    `max_tracked` raw and canonical texts are remembered for this.
+    """
+
+    def __init__(self, rules=None, enabled=True, max_tracked=10000):
+        self.enabled = enabled
+        self.rules = {lang: dict(r) for lang, r in DEFAULT_RULES.items()}
+        for lang, overrides in (rules or {}).items():
+            self.rules.setdefault(lang, {}).update(overrides)
+        self.max_tracked = max_tracked
+        self._lock = threading.Lock()
+        self._counters = {'texts': 0, 'changed': 0, 'distinct': 0, 'collapsed': 0}
+        self._raw_seen = OrderedDict()  # (language, raw text) -> None, LRU order
+        self._canonical_seen = OrderedDict()  # (language, normalized text) -> None, LRU order
+
+    @classmethod
+    def from_file(cls, path, enabled=True):
+        """
+        Load per-language rule overrides from a JSON file ({"en": {...}, ...}).
+        """
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                rules = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load normalization rules from {path}: {e}")
+            rules = None
+        return cls(rules, enabled=enabled)
+
+    def rules_for(self, language):
+        return {**self.rules['default'], **self.rules.get(language, {})}
+
+    def normalize(self, text, language='default'):
+        if not self.enabled or not isinstance(text, str):
+            return text
+        normalized = self._apply(text, self.rules_for(language))
+        raw = text.strip()
+        with self._lock:
+            self._counters['texts'] += 1
+            if normalized != raw:
+                self._counters['changed'] += 1
+            if not self._touch(self._raw_seen, (language, raw)):
+                self._counters['distinct'] += 1
+                # Another raw text already produced this canonical form
+                if self._touch(self._canonical_seen, (language, normalized)) and normalized != raw:
+                    self._counters['collapsed'] += 1
+            else:
+                self._touch(self._canonical_seen, (language, normalized))
+        return normalized
+
+    def _touch(self, seen, key):
+        """
+        Mark `key` as recently seen; True if it was already there.
+        """
+        if key in seen:
+            seen.move_to_end(key)
+            return True
+        seen[key] = None
+        if len(seen) > self.max_tracked:
+            seen.popitem(last=False)
+        return False
+
+    def _apply(self, text, rules):
+        if rules.get('unicode_form'):
+            text = unicodedata.normalize(rules['unicode_form'], text)
+        if rules.get('standardize_quotes'):
+            text = text.translate(_QUOTES).replace('…', '...')
+        if rules.get('collapse_whitespace'):
+            text = _WHITESPACE.sub(' ', text).strip()
+            if rules.get('terminal_punctuation'):
+                text = _SPACE_BEFORE_PUNCT.sub(r'\1', text)
+        else:
+            text = text.strip()
+        if rules.get('collapse_punctuation'):
+            text = _REPEATED_PUNCT.sub(r'\1', text)
+            text = _LONG_ELLIPSIS.sub('...', text)
+        separator = rules.get('thousands_separator')
+        if separator:
+            text = re.sub(rf'(?<=\d){re.escape(separator)}(?=\d{{3}}\b)', '', text)
+        if rules.get('times'):
+            text = _TIME.sub(lambda m: f"{m.group(1)}{m.group(2) or ''} {m.group(3).upper()}M", text)
+        if rules.get('iso_dates'):
+            text = _ISO_DATE.sub(r'\1-\2-\3', text)
+        terminal = rules.get('terminal_punctuation')
+        if terminal and text and text[-1] not in _TERMINAL and text[-1].isalnum():
+            text += terminal
+        return text
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+        texts, distinct = counters['texts'], counters['distinct']
+        return {
+            **counters,
+            'enabled': self.enabled,
+            'languages': sorted(lang for lang in self.rules if lang != 'default'),
+            'changed_ratio': round(counters['changed'] / texts, 4) if texts else 0.0,
+            'collapse_ratio': round(counters['collapsed'] / distinct, 4) if distinct else 0.0,
+        }
@@ -0,0 +1,176 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(murf_payload):
+    """
+    Content hash of a Murf payload. Keys are sorted and the text is stripped
+    so equivalent requests map to the same entry.
+    """
+    normalized = dict(murf_payload)
+    if isinstance(normalized.get('text'), str):
+        normalized['text'] = normalized['text'].strip()
+    if isinstance(normalized.get('audioFormat'), str):
+        normalized['audioFormat'] = normalized['audioFormat'].upper()
+    blob = json.dumps(normalized, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(blob.encode('utf-8')).hexdigest()
+
+
+class TTSCache:
+    """
+    Tiered cache for Murf TTS results: a bounded in-memory LRU with TTL,
+    then an optional SharedStore that every worker process on the host
+    reads and writes, then an optional on-disk tier that survives restarts.
+    """
+
+    def __init__(self, max_entries=512, ttl_seconds=3600, disk_dir=None, shared=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_dir = disk_dir
+        self.shared = shared
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._counters = {
+            'hits': 0,
+            'shared_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'sets': 0,
+            'evictions': 0,
+            'expirations': 0,
+        }
+
+    def get(self, key):
+        """
+        Return the cached value for key, or None on a miss.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self._counters['hits'] += 1
+                    return value
+                del self._entries[key]
+                self._counters['expirations'] += 1
+
+        entry = self.shared.get('tts', key) if self.shared else None
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > now:
+                with self._lock:
+                    self._store(key, expires_at, value)
+                    self._counters['shared_hits'] += 1
+                return value
+
+        entry = self._read_disk(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > now:
+                with self._lock:
+                    self._store(key, expires_at, value)
+                    self._counters['disk_hits'] += 1
+                return value
+            self._delete_disk(key)
+            with self._lock:
+                self._counters['expirations'] += 1
+
+        with self._lock:
+            self._counters['misses'] += 1
+        return None
+
+    def peek(self, key):
+        """
+        Memory-only lookup that does not touch the counters or LRU order.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.time():
+            return entry[1]
+        return None
+
+    def set(self, key, value, ttl_seconds=None):
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        expires_at = time.time() + ttl
+        with self._lock:
+            self._store(key, expires_at, value)
+            self._counters['sets'] += 1
+        if self.shared:
+            self.shared.set('tts', key, [expires_at, value], expires_at=expires_at)
+        self._write_disk(key, expires_at, value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+            size = len(self._entries)
+        hits = counters['hits'] + counters['shared_hits'] + counters['disk_hits']
+        lookups = hits + counters['misses']
+        hit_ratio = hits / lookups if lookups else 0.0
+        return {
+            **counters,
+            'entries': size,
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl_seconds,
+            'shared_enabled': bool(self.shared),
+            'disk_enabled': bool(self.disk_dir),
+            'hit_ratio': round(hit_ratio, 4),
+        }
+
+    def _store(self, key, expires_at, value):
+        # Caller holds self._lock
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters['evictions'] += 1
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, key[:2], f"{key}.json")
+
+    def _read_disk(self, key):
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._disk_path(key), 'r', encoding='utf-8') as f:
+                record = json.load(f)
+            return record['expires_at'], record['value']
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Unreadable TTS cache entry {key}: {e}")
+            return None
+
+    def _write_disk(self, key, expires_at, value):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'expires_at': expires_at, 'value': value}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write TTS cache entry {key}: {e}")
+
+    def _delete_disk(self, key):
+        try:
+            os.remove(self._disk_path(key))
+        except OSError:
+            pass
@@ -0,0 +1,317 @@
+import hashlib
+import mmap
+import os
+import tempfile
+
+CHUNK_SIZE = 64 * 1024
+
+
+class UploadTooLarge(Exception):
+    """
+    Raised when an upload grows past the configured maximum.
+    """
+
+    def __init__(self, max_bytes):
+        super().__init__(f"Upload exceeds the {max_bytes} byte limit")
+        self.max_bytes = max_bytes
+
+
+class IngestedFile:
+    """
+    An upload written to disk, with the SHA-256 of its content computed while
+    it streamed in. Later stages open() or map() it instead of holding a bytes
+    copy; use as a context manager to delete it afterwards.
+    """
+
+    def __init__(self, path, size, sha256):
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+
+    def open(self):
+        return open(self.path, 'rb')
+
+    def map(self):
+        """
+        Read-only memory map of the file (pages are loaded on access, not up front).
+        """
+        with open(self.path, 'rb') as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def move_to(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(self.path, path)
+        self.path = path
+
+    def discard(self):
+        _remove(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.discard()
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _temp_path(directory):
+    # Same directory (and filesystem) as the final location, so move_to is a rename
+    os.makedirs(directory, exist_ok=True)
+    fd, path = tempfile.mkstemp(dir=directory, prefix='ingest.', suffix='.tmp')
+    os.close(fd)
+    return path
+
+
+class HashingSpoolFile:
+    """
+    Write target for one multipart file part: a temp file in `directory`
+    that hashes and counts the bytes as the form parser writes them, so the
+    upload lands on disk once, already in its final filesystem. Raises
+    UploadTooLarge (and removes the file) as soon as the limit is crossed.
+    Unless claimed by ingest_stream(), close() removes the file.
+    """
+
+    def __init__(self, directory, max_bytes=None):
+        self.path = _temp_path(directory)
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._digest = hashlib.sha256()
+        self._file = open(self.path, 'w+b')
+        self._claimed = False
+
+    def write(self, data):
+        self.size += len(data)
+        if self.max_bytes and self.size > self.max_bytes:
+            self.close()
+            raise UploadTooLarge(self.max_bytes)
+        self._digest.update(data)
+        return self._file.write(data)
+
+    def claim(self):
+        """
+        Hand the written file over as an IngestedFile; close() keeps it.
+        """
+        self._file.close()
+        self._claimed = True
+        return IngestedFile(self.path, self.size, self._digest.hexdigest())
+
+    def close(self):
+        self._file.close()
+        if not self._claimed:
+            _remove(self.path)
+
+    def __getattr__(self, name):
+        # read/seek/tell/flush etc. for the parser and FileStorage
+        return getattr(self._file, name)
+
+
+def init_flask(app, directory, max_bytes=None):
+    """
+    Have Werkzeug write multipart file parts straight into HashingSpoolFiles
+    in `directory` instead of its own spool file, so ingest_stream() on the
+    part's stream is a hand-over rather than a second copy.
+    """
+    class IngestRequest(app.request_class):
+        def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+            return HashingSpoolFile(directory, max_bytes)
+
+    app.request_class = IngestRequest
+
+
+def ingest_stream(stream, directory, max_bytes=None, chunk_size=CHUNK_SIZE):
+    """
+    Copy a binary stream (e.g. a Werkzeug FileStorage.stream) to a temp file
+    in `directory` one chunk at a time, hashing as it goes. Raises
+    UploadTooLarge as soon as the limit is crossed; nothing is left on disk
+    on failure. A HashingSpoolFile (see init_flask) is claimed, not copied.
+    """
+    if isinstance(stream, HashingSpoolFile):
+        return stream.claim()
+    path = _temp_path(directory)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(path, 'wb') as f:
+            while True:
+                block = stream.read(chunk_size)
+                if not block:
+                    break
+                size += len(block)
+                if max_bytes and size > max_bytes:
+                    raise UploadTooLarge(max_bytes)
+                digest.update(block)
+                f.write(block)
+    except BaseException:
+        _remove(path)
+        raise
+    return IngestedFile(path, size, digest.hexdigest())
+
+
+async def ingest_upload(upload, directory, max_bytes=None, chunk_size=CHUNK_SIZE):
+    """
+    ingest_stream for a Starlette/FastAPI UploadFile: chunks are read with
+    await upload.read() and written through anyio's async file API, so the
+    event loop never blocks on disk I/O.
+    """
+    import anyio
+
+    path = _temp_path(directory)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async with await anyio.open_file(path, 'wb') as f:
+            while True:
+                block = await upload.read(chunk_size)
+                if not block:
+                    break
+                size += len(block)
+                if max_bytes and size > max_bytes:
+                    raise UploadTooLarge(max_bytes)
+                digest.update(block)
+                await f.write(block)
+    except BaseException:
+        _remove(path)
+        raise
+    return IngestedFile(path, size, digest.hexdigest())
+
+
+async def ingest_multipart(request, field, directory, max_bytes=None):
+    """
+    Parse a Starlette/FastAPI multipart/form-data request from
+    request.stream() and write the file part named `field` straight to a
+    temp file in `directory`, hashing as it goes (an UploadFile would be
+    spooled to disk first and then copied). Other parts are skipped.
+    Returns (IngestedFile, filename, content_type), or None when the part
+    is missing. Raises ValueError for a body that is not multipart.
+    """
+    import anyio
+    from python_multipart.multipart import MultipartParser, parse_options_header
+
+    content_type, params = parse_options_header(request.headers.get('content-type'))
+    if content_type != b'multipart/form-data' or not params.get(b'boundary'):
+        raise ValueError('Expected a multipart/form-data body')
+
+    wanted = field.encode('utf-8')
+    part = {'headers': {}, 'field': b'', 'value': b'', 'target': False}
+    found = []
+    pending = []
+
+    def on_part_begin():
+        part.update(headers={}, target=False)
+
+    def on_header_field(data, start, end):
+        part['field'] += data[start:end]
+
+    def on_header_value(data, start, end):
+        part['value'] += data[start:end]
+
+    def on_header_end():
+        part['headers'][part['field'].lower()] = part['value']
+        part.update(field=b'', value=b'')
+
+    def on_headers_finished():
+        _, options = parse_options_header(part['headers'].get(b'content-disposition'))
+        if options.get(b'name') == wanted and b'filename' in options and not found:
+            part['target'] = True
+            found.append((options[b'filename'].decode('utf-8', 'replace'),
+                          part['headers'].get(b'content-type', b'').decode('latin-1') or None))
+
+    def on_part_data(data, start, end):
+        if part['target']:
+            pending.append(bytes(data[start:end]))
+
+    def on_part_end():
+        part['target'] = False
+
+    parser = MultipartParser(params[b'boundary'], {
+        'on_part_begin': on_part_begin,
+        'on_header_field': on_header_field,
+        'on_header_value': on_header_value,
+        'on_header_end': on_header_end,
+        'on_headers_finished': on_headers_finished,
+        'on_part_data': on_part_data,
+        'on_part_end': on_part_end,
+    })
+
+    path = _temp_path(directory)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async with await anyio.open_file(path, 'wb') as f:
+            async for chunk in request.stream():
+                parser.write(chunk)
+                # The parser's callbacks are synchronous; write what they collected
+                for block in pending:
+                    size += len(block)
+                    if max_bytes and size > max_bytes:
+                        raise UploadTooLarge(max_bytes)
+                    digest.update(block)
+                    await f.write(block)
+                pending.clear()
+            parser.finalize()
+    except BaseException:
+        _remove(path)
+        raise
+    if not found:
+        _remove(path)
+        return None
+    filename, part_type = found[0]
+    return IngestedFile(path, size, digest.hexdigest()), filename, part_type
+
+
+class MaxBodySizeMiddleware:
+    """
+    ASGI middleware that rejects oversized request bodies on the given paths
+    before they are parsed: 413 straight away when Content-Length is too big,
+    or as soon as a body without one crosses the limit.
+    Register with app.add_middleware(MaxBodySizeMiddleware, max_bytes=..., paths=[...]).
+    """
+
+    def __init__(self, app, max_bytes, paths=None):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.paths = set(paths) if paths else None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not self.max_bytes or (self.paths and scope['path'] not in self.paths):
+            await self.app(scope, receive, send)
+            return
+
+        from starlette.responses import JSONResponse
+
+        too_large = JSONResponse({'detail': str(UploadTooLarge(self.max_bytes))}, status_code=413)
+        length = dict(scope['headers']).get(b'content-length', b'')
+        if length.isdigit() and int(length) > self.max_bytes:
+            await too_large(scope, receive, send)
+            return
+
+        received = 0
+        rejected = False
+
+        async def limited_receive():
+            # Past the limit: answer 413 ourselves and tell the app the client
+            # went away, so the body parser stops reading
+            nonlocal received, rejected
+            if rejected:
+                return {'type': 'http.disconnect'}
+            message = await receive()
+            if message['type'] == 'http.request':
+                received += len(message.get('body', b''))
+                if received > self.max_bytes:
+                    rejected = True
+                    await too_large(scope, receive, send)
+                    return {'type': 'http.disconnect'}
+            return message
+
+        async def guarded_send(message):
+            # The app's own reply to the aborted body is dropped
+            if not rejected:
+                await send(message)
+
+        await self.app(scope, limited_receive, guarded_send)
@@ -0,0 +1,163 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogFetchError(Exception):
+    """
+    Raised by a catalog fetch function when the upstream call fails.
+    """
+
+    def __init__(self, message, status_code=502, details=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.details = details
+
+
+class CatalogSnapshot:
+    """
+    One immutable copy of the voice catalog, pre-serialized for serving.
+    """
+
+    def __init__(self, voices, fetched_at):
+        self.voices = voices
+        self.fetched_at = fetched_at
+        self.count = len(voices) if isinstance(voices, list) else 'unknown'
+        self.body = json.dumps({
+            'success': True,
+            'voices': voices,
+            'count': self.count
+        }).encode('utf-8')
+        self.etag = hashlib.sha256(self.body).hexdigest()[:32]
+
+
+class VoiceCatalog:
+    """
+    In-process voice catalog with stale-while-revalidate semantics.
+    Readers always get the last good snapshot immediately; refreshes run
+    in a background thread and failures keep the stale copy in service.
+    """
+
+    def __init__(self, fetch, refresh_interval=3600, retry_interval=60):
+        self._fetch = fetch
+        self.refresh_interval = refresh_interval
+        self.retry_interval = retry_interval
+
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._first_fetch_lock = threading.Lock()
+        self._refreshing = False
+        self._thread = None
+        self._stop = threading.Event()
+
+        self.refreshes = 0
+        self.failures = 0
+        self.last_error = None
+        self.last_refresh_ms = None
+
+    def get(self):
+        """
+        Return the current snapshot. Only the very first call (nothing
+        cached yet) waits on the upstream; later calls never block.
+        """
+        self._ensure_started()
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._first_fetch_lock:
+                if self._snapshot is None:
+                    return self.refresh()
+                return self._snapshot
+        if time.time() - snapshot.fetched_at > self.refresh_interval:
+            self.refresh_async()
+        return snapshot
+
+    def refresh(self):
+        """
+        Fetch the catalog now. Raises CatalogFetchError only if there is
+        no earlier snapshot to fall back to.
+        """
+        started = time.perf_counter()
+        try:
+            voices = self._fetch()
+        except Exception as e:
+            self.failures += 1
+            self.last_error = str(e)
+            logger.warning(f"Voice catalog refresh failed: {e}")
+            if self._snapshot is not None:
+                return self._snapshot
+            if isinstance(e, CatalogFetchError):
+                raise
+            raise CatalogFetchError(f'Error fetching voices: {e}') from e
+        finally:
+            self.last_refresh_ms = round((time.perf_counter() - started) * 1000, 2)
+
+        snapshot = CatalogSnapshot(voices, time.time())
+        self._snapshot = snapshot
+        self.refreshes += 1
+        self.last_error = None
+        return snapshot
+
+    def refresh_async(self):
+        """
+        Start a background refresh unless one is already running.
+        """
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self.refresh()
+            except CatalogFetchError:
+                pass
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=run, name='voice-catalog-refresh', daemon=True).start()
+
+    def stats(self):
+        snapshot = self._snapshot
+        return {
+            'cached': snapshot is not None,
+            'count': snapshot.count if snapshot else 0,
+            'etag': snapshot.etag if snapshot else None,
+            'age_seconds': round(time.time() - snapshot.fetched_at, 1) if snapshot else None,
+            'refresh_interval': self.refresh_interval,
+            'refreshes': self.refreshes,
+            'failures': self.failures,
+            'last_error': self.last_error,
+            'last_refresh_ms': self.last_refresh_ms,
+        }
+
+    def stop(self):
+        self._stop.set()
+
+    def _ensure_started(self):
+        # Started lazily so importing the app (e.g. before a fork) spawns no threads
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name='voice-catalog', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            snapshot = self._snapshot
+            if snapshot is None or self.last_error:
+                wait = self.retry_interval
+            else:
+                wait = max(1.0, snapshot.fetched_at + self.refresh_interval - time.time())
+            if self._stop.wait(wait):
+                return
+            try:
+                self.refresh()
+            except CatalogFetchError:
+                pass
@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the upstream APIs the day apps call: Murf TTS, AssemblyAI
+and Gemini. Latency, error rate and payload sizes are configurable per
+operation, so load tests and benchmarks measure our code against a known,
+repeatable upstream instead of the real services.
+
+Endpoints:
+    POST /v1/speech/generate              Murf TTS (audioFile points back at /audio/...)
+    GET  /v1/speech/voices                Murf voice catalog
+    GET|POST /v1/auth/token               Murf auth token
+    GET  /audio/{audio_id}.mp3            generated audio (silent MP3 frames)
+    POST /v2/upload                       AssemblyAI upload
+    POST /v2/transcript                   AssemblyAI transcript request
+    GET  /v2/transcript/{transcript_id}   AssemblyAI poll
+    POST /v1beta/models/{model}:generateContent   Gemini chat
+    GET  /stub/stats                      calls, injected errors and latency per operation
+
+Usage:
+    python stub_upstreams.py --port 8800 \
+        --latency generate=lognormal:400:0.5 --latency default=fixed:20 \
+        --error-rate generate=0.02 --error-status 429,503
+
+    # then start an app against it
+    MURF_API_URL=http://127.0.0.1:8800/v1/speech/generate \
+    MURF_AUTH_URL=http://127.0.0.1:8800/v1/auth/token \
+    MURF_VOICES_URL=http://127.0.0.1:8800/v1/speech/voices \
+    ASSEMBLYAI_BASE_URL=http://127.0.0.1:8800 \
+    GEMINI_API_ENDPOINT=http://127.0.0.1:8800 python app.py
+
+Latency specs (milliseconds):
+    fixed:MS                 always MS
+    uniform:LOW:HIGH         uniform between LOW and HIGH
+    normal:MEAN:STDDEV       gaussian, clipped at 0
+    lognormal:MEDIAN:SIGMA   long-tailed, like most real APIs (sigma 0.5 gives p99 ~3x median)
+"""
+
+import argparse
+import asyncio
+import math
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+OPERATIONS = ['generate', 'voices', 'auth', 'audio', 'upload', 'transcript', 'poll', 'gemini']
+
+# One silent MPEG-1 Layer III frame: 128 kbps, 44.1 kHz, 417 bytes, 1152 samples
+MP3_FRAME = b'\xff\xfb\x90\x00' + bytes(413)
+MP3_FRAME_SECONDS = 1152 / 44100
+
+WORDS = ('the quick brown fox jumps over a lazy dog while voice agents stream '
+         'speech to text and text to speech for every turn of the conversation').split()
+
+
+class Latency:
+    """
+    A latency distribution parsed from "kind:arg[:arg]"; sample() returns seconds.
+    """
+
+    def __init__(self, spec):
+        kind, _, args = spec.partition(':')
+        values = [float(v) for v in args.split(':')] if args else []
+        expected = {'fixed': 1, 'uniform': 2, 'normal': 2, 'lognormal': 2}
+        if kind not in expected or len(values) != expected[kind]:
+            raise ValueError(f"Bad latency spec {spec!r}; use fixed:MS, uniform:LOW:HIGH, "
+                             f"normal:MEAN:STDDEV or lognormal:MEDIAN:SIGMA")
+        self.spec = spec
+        self.kind = kind
+        self.values = values
+
+    def sample(self):
+        if self.kind == 'fixed':
+            ms = self.values[0]
+        elif self.kind == 'uniform':
+            ms = random.uniform(*self.values)
+        elif self.kind == 'normal':
+            ms = max(0.0, random.gauss(*self.values))
+        else:
+            median, sigma = self.values
+            ms = random.lognormvariate(math.log(median), sigma) if median > 0 else 0.0
+        return ms / 1000
+
+
+def per_operation(pairs, parse, default):
+    """
+    ["generate=lognormal:400:0.5", "default=fixed:20"] -> {operation: parsed}
+    """
+    raw = {}
+    for pair in pairs or []:
+        operation, _, value = pair.partition('=')
+        if operation != 'default' and operation not in OPERATIONS:
+            raise ValueError(f"Unknown operation {operation!r}; expected one of {OPERATIONS} or 'default'")
+        raw[operation] = parse(value)
+    fallback = raw.get('default', default)
+    return {operation: raw.get(operation, fallback) for operation in OPERATIONS}
+
+
+class StubState:
+    """
+    Behaviour settings plus the little state the stubs need (issued audio
+    sizes, pending transcripts) and per-operation counters.
+    """
+
+    def __init__(self, latencies, error_rates, error_statuses, transcript_delay,
+                 audio_bytes_per_char, audio_min_bytes, voice_count, transcript_words,
+                 reply_words, max_entries=10000, seed=None):
+        self.latencies = latencies
+        self.error_rates = error_rates
+        self.error_statuses = error_statuses
+        self.transcript_delay = transcript_delay
+        self.audio_bytes_per_char = audio_bytes_per_char
+        self.audio_min_bytes = audio_min_bytes
+        self.voice_count = voice_count
+        self.transcript_words = transcript_words
+        self.reply_words = reply_words
+        self.max_entries = max_entries
+        self.random = random.Random(seed)
+
+        self.audio = OrderedDict()  # audio_id -> size in bytes
+        self.transcripts = OrderedDict()  # transcript_id -> (ready_at, audio_url)
+        self._lock = threading.Lock()
+        self._stats = {operation: {'calls': 0, 'errors': 0, 'latency_total_s': 0.0} for operation in OPERATIONS}
+
+    def _remember(self, table, key, value):
+        with self._lock:
+            table[key] = value
+            while len(table) > self.max_entries:
+                table.popitem(last=False)
+
+    def words(self, count):
+        return ' '.join(self.random.choice(WORDS) for _ in range(count))
+
+    async def behave(self, operation):
+        """
+        Sleep for the operation's sampled latency, then return an error response
+        for the configured share of calls (None means "answer normally").
+        """
+        delay = self.latencies[operation].sample()
+        failed = self.random.random() < self.error_rates[operation]
+        with self._lock:
+            entry = self._stats[operation]
+            entry['calls'] += 1
+            entry['latency_total_s'] += delay
+            if failed:
+                entry['errors'] += 1
+        if delay:
+            await asyncio.sleep(delay)
+        if not failed:
+            return None
+        status = self.random.choice(self.error_statuses)
+        headers = {'Retry-After': '1'} if status in (429, 503) else None
+        return JSONResponse({'error': f'stub injected {status}', 'operation': operation},
+                            status_code=status, headers=headers)
+
+    def stats(self):
+        with self._lock:
+            operations = {
+                operation: {
+                    'calls': entry['calls'],
+                    'errors': entry['errors'],
+                    'mean_latency_ms': round(entry['latency_total_s'] / entry['calls'] * 1000, 2) if entry['calls'] else 0.0,
+                    'latency': self.latencies[operation].spec,
+                    'error_rate': self.error_rates[operation],
+                }
+                for operation, entry in self._stats.items()
+            }
+            return {
+                'operations': operations,
+                'audio_files': len(self.audio),
+                'transcripts': len(self.transcripts),
+            }
+
+
+def create_app(state):
+    app = FastAPI(title='Upstream stubs')
+
+    # ---- Murf ----
+
+    @app.post('/v1/speech/generate')
+    async def murf_generate(request: Request):
+        error = await state.behave('generate')
+        if error:
+            return error
+        payload = await request.json()
+        text = payload.get('text', '')
+        if not text:
+            return JSONResponse({'errorMessage': 'text is required'}, status_code=400)
+        size = max(state.audio_min_bytes, len(text) * state.audio_bytes_per_char)
+        frames = max(1, size // len(MP3_FRAME))
+        audio_id = uuid.uuid4().hex
+        state._remember(state.audio, audio_id, frames)
+        return {
+            'audioFile': f"{str(request.base_url).rstrip('/')}/audio/{audio_id}.mp3",
+            'audioLengthInSeconds': round(frames * MP3_FRAME_SECONDS, 3),
+            'charactersUsed': len(text),
+            'remainingCharacterCount': 1_000_000,
+            'wordDurations': [],
+            'warning': '',
+        }
+
+    @app.get('/audio/{filename}')
+    async def murf_audio(filename: str):
+        error = await state.behave('audio')
+        if error:
+            return error
+        frames = state.audio.get(filename.rsplit('.', 1)[0])
+        if frames is None:
+            return JSONResponse({'error': 'audio not found'}, status_code=404)
+        return Response(MP3_FRAME * frames, media_type='audio/mpeg')
+
+    @app.get('/v1/speech/voices')
+    async def murf_voices():
+        error = await state.behave('voices')
+        if error:
+            return error
+        locales = ['en-US', 'en-UK', 'en-IN', 'de-DE', 'fr-FR', 'es-ES']
+        return [
+            {
+                'voiceId': f"{locales[i % len(locales)]}-stub{i}",
+                'displayName': f"Stub {i} ({'F' if i % 2 else 'M'})",
+                'gender': 'Female' if i % 2 else 'Male',
+                'locale': locales[i % len(locales)],
+                'displayLanguage': locales[i % len(locales)],
+                'accent': '',
+                'description': 'Stub voice',
+                'availableStyles': ['Conversational', 'Promo', 'Narration'],
+                'supportedLocales': {},
+            }
+            for i in range(state.voice_count)
+        ]
+
+    @app.api_route('/v1/auth/token', methods=['GET', 'POST'])
+    async def murf_auth():
+        error = await state.behave('auth')
+        if error:
+            return error
+        return {'token': uuid.uuid4().hex, 'expiryInEpochMillis': int((time.time() + 3600) * 1000)}
+
+    # ---- AssemblyAI ----
+
+    @app.post('/v2/upload')
+    async def assemblyai_upload(request: Request):
+        error = await state.behave('upload')
+        if error:
+            return error
+        size = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+        return {'upload_url': f"{str(request.base_url).rstrip('/')}/uploads/{uuid.uuid4().hex}?bytes={size}"}
+
+    @app.post('/v2/transcript')
+    async def assemblyai_transcript(request: Request):
+        error = await state.behave('transcript')
+        if error:
+            return error
+        payload = await request.json()
+        audio_url = payload.get('audio_url')
+        if not audio_url:
+            return JSONResponse({'error': 'audio_url is required'}, status_code=400)
+        transcript_id = uuid.uuid4().hex
+        state._remember(state.transcripts, transcript_id,
+                        (time.time() + state.transcript_delay.sample(), audio_url))
+        return transcript_body(transcript_id, 'queued', audio_url)
+
+    @app.get('/v2/transcript/{transcript_id}')
+    async def assemblyai_poll(transcript_id: str):
+        error = await state.behave('poll')
+        if error:
+            return error
+        entry = state.transcripts.get(transcript_id)
+        if entry is None:
+            return JSONResponse({'error': 'Transcript not found'}, status_code=404)
+        ready_at, audio_url = entry
+        if time.time() < ready_at:
+            return transcript_body(transcript_id, 'processing', audio_url)
+        return transcript_body(transcript_id, 'completed', audio_url, state.words(state.transcript_words))
+
+    def transcript_body(transcript_id, status, audio_url, text=None):
+        return {
+            'id': transcript_id,
+            'status': status,
+            'audio_url': audio_url,
+            'text': text,
+            'words': [] if text is not None else None,
+            'confidence': 0.95 if text is not None else None,
+            'audio_duration': 3 if text is not None else None,
+            'language_code': 'en_us',
+            'error': None,
+        }
+
+    # ---- Gemini ----
+
+    @app.post('/v1beta/models/{model_action}')
+    async def gemini_generate(model_action: str):
+        model, _, action = model_action.partition(':')
+        if action != 'generateContent':
+            return JSONResponse({'error': {'code': 404, 'message': f'Unsupported action {action!r}'}}, status_code=404)
+        error = await state.behave('gemini')
+        if error:
+            return error
+        text = state.words(state.reply_words).capitalize() + '.'
+        return {
+            'candidates': [{
+                'content': {'parts': [{'text': text}], 'role': 'model'},
+                'finishReason': 'STOP',
+                'index': 0,
+            }],
+            'usageMetadata': {'promptTokenCount': 0, 'candidatesTokenCount': state.reply_words,
+                              'totalTokenCount': state.reply_words},
+            'modelVersion': model,
+        }
+
+    @app.get('/stub/stats')
+    async def stub_stats():
+        return state.stats()
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local Murf / AssemblyAI / Gemini stand-in')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8800)
+    parser.add_argument('--latency', action='append', metavar='OP=SPEC',
+                        help=f"per-operation latency, OP in {OPERATIONS} or 'default' (default: fixed:20)")
+    parser.add_argument('--error-rate', action='append', metavar='OP=RATE',
+                        help='share of calls (0-1) answered with an injected error (default: 0)')
+    parser.add_argument('--error-status', default='503',
+                        help='comma-separated statuses to pick injected errors from (default: 503)')
+    parser.add_argument('--transcript-delay', default='fixed:1000',
+                        help='time a transcript stays "processing" before it completes (default: fixed:1000)')
+    parser.add_argument('--audio-bytes-per-char', type=int, default=1000,
+                        help='generated audio size per input character (default: 1000, roughly real MP3 speech)')
+    parser.add_argument('--audio-min-bytes', type=int, default=4096)
+    parser.add_argument('--voices', type=int, default=50, help='voices in the catalog (default: 50)')
+    parser.add_argument('--transcript-words', type=int, default=12)
+    parser.add_argument('--reply-words', type=int, default=30, help='words in each Gemini reply (default: 30)')
+    parser.add_argument('--seed', type=int, help='seed error injection and generated text')
+    args = parser.parse_args()
+
+    state = StubState(
+        latencies=per_operation(args.latency, Latency, Latency('fixed:20')),
+        error_rates=per_operation(args.error_rate, float, 0.0),
+        error_statuses=[int(s) for s in args.error_status.split(',') if s.strip()],
+        transcript_delay=Latency(args.transcript_delay),
+        audio_bytes_per_char=args.audio_bytes_per_char,
+        audio_min_bytes=args.audio_min_bytes,
+        voice_count=args.voices,
+        transcript_words=args.transcript_words,
+        reply_words=args.reply_words,
+        seed=args.seed,
+    )
+    print(f"🧪 Upstream stubs on http://{args.host}:{args.port}")
+    for operation in OPERATIONS:
+        print(f"   {operation:<10} latency={state.latencies[operation].spec:<22} error_rate={state.error_rates[operation]}")
+    uvicorn.run(create_app(state), host=args.host, port=args.port, log_level='warning')
+
+
+if __name__ == '__main__':
+    main()
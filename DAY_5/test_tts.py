@@ -1,16 +1,47 @@
 #!/usr/bin/env python3
 """
-Test script for the TTS Flask server
-Usage: python test_tts.py
+Test script for the TTS Flask server: a one-request-per-endpoint smoke test
+and a concurrent load generator with a latency report.
+
+Usage:
+    python test_tts.py                      # smoke test
+    python test_tts.py load --concurrency 20 --rate 50 --duration 60 \
+        --endpoints tts:8,tts/stream:1,tts/long:1 --output results.json
 """
 
-import requests
+import argparse
 import json
+import random
+import statistics
+import subprocess
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import requests
 
 # Configuration
 BASE_URL = "http://localhost:5001"
 
+SHORT_TEXTS = [
+    "Hello! This is a test of the Murf TTS integration.",
+    "I'm having trouble connecting right now.",
+    "Your order has shipped and will arrive tomorrow at 3 PM.",
+    "Thanks for calling. How can I help you today?",
+]
+LONG_TEXT = (
+    "The Murf TTS service turns text into natural sounding speech. "
+    "Long passages are split into sentence-aligned chunks, synthesized in parallel "
+    "and either returned as a playlist or stitched into a single file. "
+    "This paragraph is long enough to exercise that path, with several sentences "
+    "of ordinary prose, numbers like 1,250 and times like 10:30 am. "
+    "Latency under load depends on the cache hit rate, the outbound rate limit "
+    "and how quickly the upstream answers, so the load test mixes short and long texts."
+) * 2
+DEFAULT_VOICES = "en-US-ken,en-US-sarah,en-US-natalie"
+
 def test_endpoint(url, method="GET", data=None, description=""):
     """Test a single endpoint"""
     print(f"\n🧪 Testing: {description}")
@@ -117,5 +148,184 @@ def main():
     print(f"   • Health check: {BASE_URL}/health")
     print(f"   • Main app: {BASE_URL}/")
 
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def build_request(endpoint, voices, long_ratio, no_cache, unique):
+    """
+    One request body for an endpoint from the payload mix
+    """
+    text = LONG_TEXT if random.random() < long_ratio else random.choice(SHORT_TEXTS)
+    if unique:
+        text = f"{text} ({random.getrandbits(32):08x})"
+    voice_id = random.choice(voices)
+    if endpoint == "tts/batch":
+        return {
+            "items": [{"text": random.choice(SHORT_TEXTS), "voice_id": random.choice(voices)} for _ in range(5)],
+            "no_cache": no_cache,
+        }
+    if endpoint == "tts/long":
+        return {"text": LONG_TEXT if not unique else text, "voice_id": voice_id, "no_cache": no_cache}
+    return {"text": text, "voice_id": voice_id, "format": "mp3", "no_cache": no_cache}
+
+def parse_endpoints(spec):
+    """
+    "tts:8,tts/stream:1" -> [("tts", 8), ("tts/stream", 1)]
+    """
+    endpoints = []
+    for part in spec.split(","):
+        name, _, weight = part.strip().partition(":")
+        endpoints.append((name.strip("/"), float(weight or 1)))
+    return endpoints
+
+def run_load(args):
+    """
+    Load until --duration or --requests runs out. With --rate, request i is
+    scheduled at start + i / rate and its latency is measured from that
+    scheduled time. A request held back because all --concurrency slots are
+    busy (the server has fallen behind) is therefore charged for the wait,
+    which keeps queueing delay in p95/p99 (no coordinated omission). With
+    --rate 0 it is a closed loop: as fast as --concurrency allows, latency
+    measured from each send.
+    """
+    endpoints = parse_endpoints(args.endpoints)
+    names = [name for name, _ in endpoints]
+    weights = [weight for _, weight in endpoints]
+    voices = [v.strip() for v in args.voices.split(",") if v.strip()]
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=args.concurrency)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    results = {name: {"latencies": [], "statuses": {}} for name in names}
+    lock = threading.Lock()
+    slots = threading.Semaphore(args.concurrency)
+
+    def one(endpoint, scheduled):
+        body = build_request(endpoint, voices, args.long_ratio, args.no_cache, args.unique)
+        started = scheduled if scheduled is not None else time.perf_counter()
+        try:
+            with session.post(f"{args.url}/{endpoint}", json=body, timeout=args.timeout, stream=True) as response:
+                for _ in response.iter_content(64 * 1024):
+                    pass  # read the whole body (streaming endpoints included)
+                status = response.status_code
+        except requests.RequestException as e:
+            status = type(e).__name__
+        finally:
+            slots.release()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with lock:
+            results[endpoint]["latencies"].append(elapsed_ms)
+            statuses = results[endpoint]["statuses"]
+            statuses[status] = statuses.get(status, 0) + 1
+
+    print(f"🚀 Load test: {args.url} | concurrency {args.concurrency} | "
+          f"rate {args.rate or 'max'}/s | duration {args.duration}s | mix {args.endpoints}")
+    started = time.perf_counter()
+    deadline = started + args.duration
+    sent = 0
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        while time.perf_counter() < deadline and (not args.requests or sent < args.requests):
+            scheduled = None
+            if args.rate:
+                # Sleep until this request's scheduled start time; if we are
+                # late, the latency still counts from the schedule
+                scheduled = started + sent / args.rate
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            if not slots.acquire(timeout=max(0.0, deadline - time.perf_counter())):
+                break
+            executor.submit(one, random.choices(names, weights)[0], scheduled)
+            sent += 1
+    elapsed = time.perf_counter() - started
+
+    report = {name: summarize(data, elapsed) for name, data in results.items() if data["latencies"]}
+    report["all"] = summarize({
+        "latencies": [ms for data in results.values() for ms in data["latencies"]],
+        "statuses": {},
+    }, elapsed, [data["statuses"] for data in results.values()])
+    return report, elapsed
+
+def summarize(data, elapsed, status_maps=None):
+    latencies = sorted(data["latencies"])
+    statuses = dict(data["statuses"])
+    for extra in status_maps or []:
+        for status, count in extra.items():
+            statuses[status] = statuses.get(status, 0) + count
+    total = len(latencies)
+    ok = sum(count for status, count in statuses.items() if isinstance(status, int) and status < 400)
+    return {
+        "requests": total,
+        "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "error_rate": round(1 - ok / total, 4) if total else 0.0,
+        "latency_ms": {
+            "mean": round(statistics.mean(latencies), 1) if latencies else 0.0,
+            "p50": round(percentile(latencies, 50), 1),
+            "p95": round(percentile(latencies, 95), 1),
+            "p99": round(percentile(latencies, 99), 1),
+            "max": round(latencies[-1], 1) if latencies else 0.0,
+        },
+        "statuses": {str(status): count for status, count in statuses.items()},
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def load_main(args):
+    report, elapsed = run_load(args)
+
+    print("\n" + "=" * 78)
+    print(f"{'endpoint':<14}{'reqs':>7}{'req/s':>9}{'err%':>7}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}  (ms)")
+    print("-" * 78)
+    for name, stats in report.items():
+        latency = stats["latency_ms"]
+        print(f"{name:<14}{stats['requests']:>7}{stats['throughput_rps']:>9}{stats['error_rate'] * 100:>6.1f}%"
+              f"{latency['p50']:>9}{latency['p95']:>9}{latency['p99']:>9}{latency['max']:>9}")
+    print("=" * 78)
+
+    if args.output:
+        result = {
+            "timestamp": datetime.now().isoformat(),
+            "commit": git_commit(),
+            "config": {key: value for key, value in vars(args).items() if key != "command"},
+            "elapsed_s": round(elapsed, 3),
+            "endpoints": report,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"📝 Results written to {args.output}")
+    return report["all"]["error_rate"] if "all" in report else 1.0
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Smoke test or load test the TTS Flask server")
+    sub = parser.add_subparsers(dest="command")
+    sub.add_parser("smoke", help="One request per endpoint (default)")
+    load = sub.add_parser("load", help="Concurrent load with a latency report")
+    load.add_argument("--url", default=BASE_URL)
+    load.add_argument("--concurrency", type=int, default=10, help="Max requests in flight")
+    load.add_argument("--rate", type=float, default=0, help="Requests per second (0 = as fast as concurrency allows)")
+    load.add_argument("--duration", type=float, default=30, help="Seconds to run")
+    load.add_argument("--requests", type=int, default=0, help="Stop after this many requests (0 = no limit)")
+    load.add_argument("--endpoints", default="tts", help="Weighted mix, e.g. tts:8,tts/stream:1,tts/long:1,tts/batch:1")
+    load.add_argument("--voices", default=DEFAULT_VOICES, help="Comma-separated voice IDs to pick from")
+    load.add_argument("--long-ratio", type=float, default=0.2, help="Share of requests using the long text")
+    load.add_argument("--no-cache", action="store_true", help="Bypass the server-side TTS cache")
+    load.add_argument("--unique", action="store_true", help="Make every text unique (cache misses)")
+    load.add_argument("--timeout", type=float, default=60)
+    load.add_argument("--output", help="Write the results as JSON to this file")
+    return parser.parse_args(argv)
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    args = parse_args(sys.argv[1:])
+    if args.command == "load":
+        load_main(args)
+    else:
+        main()
\ No newline at end of file
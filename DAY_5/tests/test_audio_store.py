@@ -0,0 +1,57 @@
+import io
+
+from services.audio_store import AudioStore
+from services.upload_ingest import ingest_stream
+
+
+class FakeDownload:
+    def __init__(self, data):
+        self.data = data
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, size):
+        yield self.data
+
+    def close(self):
+        pass
+
+
+class FakeClient:
+    def __init__(self):
+        self.calls = 0
+
+    def get(self, url, **kwargs):
+        self.calls += 1
+        return FakeDownload(url.encode())
+
+
+def test_same_content_is_stored_once(tmp_path):
+    store = AudioStore(str(tmp_path))
+    first = store.put_bytes(b'abc', 'mp3')
+    assert store.put_bytes(b'abc', 'mp3') == first
+    assert store.path_for(first).endswith(f"{first[:2]}/{first}.mp3")
+
+    ingested = ingest_stream(io.BytesIO(b'abc'), str(tmp_path / '.incoming'))
+    assert store.put_file(ingested, 'mp3') == (first, False)
+
+
+def test_unknown_and_malformed_ids(tmp_path):
+    store = AudioStore(str(tmp_path))
+    assert store.path_for('0' * 64) is None
+    assert store.path_for('../etc/passwd') is None
+
+
+def test_lookup_maps_are_bounded(tmp_path):
+    store = AudioStore(str(tmp_path), max_entries=3)
+    client = FakeClient()
+    ids = [store.fetch_url(f'https://cdn.example.com/{i}.mp3', client, 'mp3') for i in range(10)]
+
+    assert len(store._paths) == 3
+    assert len(store._remote) == 3
+    # Evicted entries are still found on disk
+    assert store.path_for(ids[0])
+    # Recent URLs are served without downloading again
+    store.fetch_url('https://cdn.example.com/9.mp3', client, 'mp3')
+    assert client.calls == 10
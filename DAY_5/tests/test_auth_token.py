@@ -0,0 +1,68 @@
+import threading
+import time
+
+from services.auth_token import AuthTokenManager
+
+
+def now_ms():
+    return int(time.time() * 1000)
+
+
+def test_concurrent_callers_share_one_refresh():
+    calls = []
+    release = threading.Event()
+
+    def fetch():
+        calls.append(1)
+        release.wait(2)
+        return 'tok', now_ms() + 3600_000
+
+    manager = AuthTokenManager(fetch)
+    manager._thread = object()  # keep the background refresher out of the test
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(manager.get_token())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    time.sleep(0.1)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert results == ['tok'] * 8
+    assert len(calls) == 1
+    assert manager.stats()['coalesced_waits'] == 7
+
+
+def test_failed_refresh_returns_none_and_records_error():
+    def fetch():
+        raise RuntimeError('boom')
+
+    manager = AuthTokenManager(fetch)
+    manager._thread = object()
+    assert manager.get_token() is None
+    assert manager.stats()['failures'] == 1
+    assert manager.stats()['last_error'] == 'boom'
+
+
+def test_margin_is_capped_for_short_lived_tokens():
+    manager = AuthTokenManager(lambda: ('tok', now_ms() + 10_000), proactive_margin_ms=300_000)
+    manager._thread = object()
+    manager.get_token()
+    with manager._cond:
+        margin = manager._proactive_margin()
+    assert 4_000 < margin <= 5_000
+
+
+def test_short_lived_token_is_not_refreshed_every_second():
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return 'tok', now_ms() + 4_000
+
+    manager = AuthTokenManager(fetch, refresh_margin_ms=0, proactive_margin_ms=300_000)
+    manager.get_token()
+    time.sleep(2.5)
+    manager.stop()
+    # One foreground fetch plus one renewal at half-life (~2 s), not one per second
+    assert len(calls) <= 2
@@ -0,0 +1,79 @@
+import pytest
+from flask import Flask
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from services.file_delivery import FileDelivery
+
+DATA = bytes(range(256)) * 40
+ETAG = 'abc123'
+
+
+@pytest.fixture
+def audio_file(tmp_path):
+    path = tmp_path / 'ab' / 'abc123.mp3'
+    path.parent.mkdir()
+    path.write_bytes(DATA)
+    return str(path)
+
+
+def flask_client(root, path, **kwargs):
+    app = Flask(__name__)
+    delivery = FileDelivery(root, 'public, max-age=60', **kwargs)
+    app.add_url_rule('/f', 'f', lambda: delivery.flask_response(path, ETAG, 'audio/mpeg'))
+    return app.test_client()
+
+
+def test_full_response_has_validators(tmp_path, audio_file):
+    response = flask_client(str(tmp_path), audio_file).get('/f')
+    assert response.status_code == 200
+    assert response.data == DATA
+    assert response.headers['ETag'] == f'"{ETAG}"'
+    assert response.headers['Accept-Ranges'] == 'bytes'
+    assert response.headers['Cache-Control'] == 'public, max-age=60'
+
+
+def test_conditional_get_returns_304(tmp_path, audio_file):
+    client = flask_client(str(tmp_path), audio_file)
+    assert client.get('/f', headers={'If-None-Match': f'W/"{ETAG}"'}).status_code == 304
+    last_modified = client.get('/f').headers['Last-Modified']
+    assert client.get('/f', headers={'If-Modified-Since': last_modified}).status_code == 304
+    # If-None-Match wins over If-Modified-Since
+    assert client.get('/f', headers={'If-None-Match': '"other"', 'If-Modified-Since': last_modified}).status_code == 200
+
+
+def test_byte_ranges(tmp_path, audio_file):
+    client = flask_client(str(tmp_path), audio_file)
+    response = client.get('/f', headers={'Range': 'bytes=100-199'})
+    assert response.status_code == 206
+    assert response.data == DATA[100:200]
+    assert response.headers['Content-Range'] == f'bytes 100-199/{len(DATA)}'
+
+    assert client.get('/f', headers={'Range': f'bytes={len(DATA)}-'}).status_code == 416
+    # A stale If-Range gets the whole file
+    response = client.get('/f', headers={'Range': 'bytes=0-9', 'If-Range': '"old"'})
+    assert response.status_code == 200 and response.data == DATA
+
+
+def test_offload_sends_headers_only(tmp_path, audio_file):
+    client = flask_client(str(tmp_path), audio_file, offload='x-accel-redirect', offload_prefix='/_protected/audio')
+    response = client.get('/f')
+    assert response.headers['X-Accel-Redirect'] == '/_protected/audio/ab/abc123.mp3'
+    assert response.data == b''
+
+    with pytest.raises(ValueError):
+        FileDelivery(str(tmp_path), 'no-cache', offload='x-bogus')
+
+
+def test_asgi_response(tmp_path, audio_file):
+    delivery = FileDelivery(str(tmp_path), 'no-cache')
+
+    async def serve(request: Request):
+        return delivery.asgi_response(request, audio_file, ETAG, 'audio/mpeg')
+
+    client = TestClient(Starlette(routes=[Route('/f', serve)]))
+    assert client.get('/f', headers={'If-None-Match': f'"{ETAG}"'}).status_code == 304
+    response = client.get('/f', headers={'Range': 'bytes=10-19'})
+    assert response.status_code == 206 and response.content == DATA[10:20]
@@ -0,0 +1,77 @@
+import asyncio
+import time
+
+import httpx
+from flask import Flask, Response
+
+from services import metrics
+from services.murf_async import AsyncMurfClient
+
+
+def _latency(route):
+    child = metrics.http_latency.labels(route, 'GET')
+    return child.count, child.sum
+
+
+def test_upstream_call_records_request_bytes():
+    bodies = []
+
+    def handler(request):
+        bodies.append(request.content)
+        return httpx.Response(200, json={'ok': True})
+
+    async def run():
+        client = AsyncMurfClient('k')
+        client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        await client.post('https://api.murf.ai/v1/speech/generate', json={'text': 'Hello world.'})
+        await client.client.aclose()
+
+    sent = metrics.upstream_bytes_out.labels('murf', 'generate')
+    before = sent.value
+    asyncio.run(run())
+    assert sent.value - before == len(bodies[0]) > 0
+
+
+def test_flask_streamed_response_timed_until_closed():
+    app = Flask(__name__)
+    metrics.init_flask(app)
+
+    @app.route('/slow-stream')
+    def slow_stream():
+        def body():
+            yield b'a'
+            time.sleep(0.05)
+            yield b'b'
+        return Response(body())
+
+    count, total = _latency('/slow-stream')
+    response = app.test_client().get('/slow-stream', buffered=False)
+    assert _latency('/slow-stream')[0] == count  # still streaming
+    assert b''.join(response.response) == b'ab'
+    response.close()
+    assert _latency('/slow-stream')[0] == count + 1
+    assert _latency('/slow-stream')[1] - total >= 0.05
+
+
+def test_asgi_streamed_response_timed_until_the_last_body_message():
+    from fastapi import FastAPI
+    from fastapi.responses import StreamingResponse
+    from fastapi.testclient import TestClient
+
+    app = FastAPI()
+    metrics.init_asgi(app)
+
+    @app.get('/asgi-slow-stream')
+    async def slow_stream():
+        async def body():
+            yield b'a'
+            await asyncio.sleep(0.05)
+            yield b'bc'
+        return StreamingResponse(body())
+
+    count, total = _latency('/asgi-slow-stream')
+    response = TestClient(app).get('/asgi-slow-stream')
+    assert response.content == b'abc'
+    assert _latency('/asgi-slow-stream')[0] == count + 1
+    assert _latency('/asgi-slow-stream')[1] - total >= 0.05
+    assert metrics.http_bytes_out.labels('/asgi-slow-stream').value == 3
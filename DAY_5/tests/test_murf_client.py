@@ -0,0 +1,57 @@
+from services.murf_client import MurfClient, murf_operation, with_api_key
+
+
+class FakeResponse:
+    status_code = 200
+    content = b''
+    headers = {}
+
+
+def test_murf_operation_labels():
+    assert murf_operation('https://api.murf.ai/v1/speech/generate') == 'generate'
+    assert murf_operation('https://api.murf.ai/v1/speech/voices?x=1') == 'voices'
+    assert murf_operation('https://api.murf.ai/v1/auth/token') == 'auth'
+    assert murf_operation('https://murf.s3.amazonaws.com/a/b.mp3?sig=1') == 'audio'
+
+
+def test_api_key_only_on_api_urls():
+    assert with_api_key('https://api.murf.ai/v1/speech/generate', 'k', {'Accept': 'x'}) == {'api-key': 'k', 'Accept': 'x'}
+    assert with_api_key('https://murf.s3.amazonaws.com/a.mp3', 'k') is None
+    assert with_api_key('https://api.murf.ai/v1/speech/voices', None) is None
+
+
+def test_session_has_no_default_api_key(monkeypatch):
+    client = MurfClient('secret')
+    sent = []
+    monkeypatch.setattr(client.session, 'request',
+                        lambda method, url, **kwargs: sent.append((url, kwargs.get('headers'))) or FakeResponse())
+    client.post('https://api.murf.ai/v1/speech/generate', json={})
+    client.get('https://cdn.example.com/audio.mp3')
+
+    assert 'api-key' not in client.session.headers
+    assert sent[0][1]['api-key'] == 'secret'
+    assert not (sent[1][1] or {}).get('api-key')
+
+
+def test_async_client_keeps_api_key_off_audio_downloads():
+    import asyncio
+
+    import httpx
+
+    from services.murf_async import AsyncMurfClient
+
+    seen = {}
+
+    def handler(request):
+        seen[request.url.host] = request.headers.get('api-key')
+        return httpx.Response(200, json={})
+
+    async def run():
+        client = AsyncMurfClient('secret')
+        client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        await client.post('https://api.murf.ai/v1/speech/generate', json={})
+        await client.get('https://cdn.example.com/audio.mp3')
+        await client.client.aclose()
+
+    asyncio.run(run())
+    assert seen == {'api.murf.ai': 'secret', 'cdn.example.com': None}
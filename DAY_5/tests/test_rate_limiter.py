@@ -0,0 +1,66 @@
+import threading
+import time
+
+import pytest
+
+from services.rate_limiter import OutboundLimiter, OverBudgetError, TokenBucket
+
+
+def test_token_bucket_wait_time():
+    bucket = TokenBucket(rate=10, capacity=2)
+    now = time.monotonic()
+    assert bucket.wait_time(2, now) == 0
+    bucket.take(2)
+    assert bucket.wait_time(1, now) == pytest.approx(0.1, abs=0.01)
+
+
+def test_interactive_lane_goes_before_bulk():
+    limiter = OutboundLimiter(requests_per_second=2, characters_per_minute=10 ** 6,
+                              max_wait={'interactive': 5, 'bulk': 5})
+    limiter.acquire(1)  # drain the burst of two
+    limiter.acquire(1)
+    order = []
+
+    def call(lane):
+        limiter.acquire(1, lane)
+        order.append(lane)
+
+    bulk = threading.Thread(target=call, args=('bulk',))
+    bulk.start()
+    time.sleep(0.05)
+    interactive = threading.Thread(target=call, args=('interactive',))
+    interactive.start()
+    bulk.join()
+    interactive.join()
+    assert order == ['interactive', 'bulk']
+
+
+def test_lane_max_wait_raises_over_budget():
+    limiter = OutboundLimiter(requests_per_second=1, max_wait={'interactive': 0.1})
+    limiter.acquire(1)
+    with pytest.raises(OverBudgetError) as err:
+        limiter.acquire(1)
+    assert err.value.lane == 'interactive'
+    assert limiter.stats()['lanes']['interactive']['rejected'] == 1
+
+
+def test_text_over_the_character_budget_is_rejected_up_front():
+    limiter = OutboundLimiter(characters_per_minute=100)
+    with pytest.raises(OverBudgetError):
+        limiter.acquire(101)
+
+
+def test_reconcile_returns_unused_characters():
+    limiter = OutboundLimiter(characters_per_minute=600)
+    limiter.acquire(500)
+    limiter.reconcile(500, 100)
+    assert limiter.stats()['character_tokens'] >= 499
+
+
+def test_zero_rate_disables_the_limiter():
+    limiter = OutboundLimiter(requests_per_second=0, characters_per_minute=10)
+    for _ in range(100):
+        assert limiter.acquire(1000) == 0.0
+    stats = limiter.stats()
+    assert stats['enabled'] is False
+    assert stats['lanes']['interactive']['acquired'] == 100
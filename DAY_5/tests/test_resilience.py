@@ -0,0 +1,119 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from services.resilience import (CircuitBreaker, CircuitOpenError, DeadlineExceeded, ResilientCaller,
+                                 RetryBudget)
+
+
+class Flaky(Exception):
+    pass
+
+
+def make_caller(**kwargs):
+    options = dict(breaker=CircuitBreaker(failure_threshold=3, reset_timeout=0.2),
+                   budget=RetryBudget(ratio=1.0),
+                   is_failure=lambda e: isinstance(e, Flaky),
+                   backoff_base=0.001)
+    options.update(kwargs)
+    return ResilientCaller(**options)
+
+
+def test_breaker_opens_half_opens_and_closes():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.1)
+    breaker.record_failure()
+    assert breaker.state == 'closed'
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    time.sleep(0.12)
+    breaker.before_call()
+    assert breaker.state == 'half_open'
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # only one probe at a time
+    breaker.record_success()
+    assert breaker.state == 'closed'
+
+
+def test_failed_probe_reopens():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    assert breaker.stats()['times_opened'] == 2
+
+
+def test_retries_then_succeeds():
+    attempts = []
+
+    def fn(remaining):
+        attempts.append(remaining)
+        if len(attempts) < 3:
+            raise Flaky()
+        return 'ok'
+
+    caller = make_caller(max_retries=2)
+    assert caller.call(fn) == 'ok'
+    assert caller.stats()['retries'] == 2
+    assert attempts == [None, None, None]
+
+
+def test_non_failures_are_not_retried():
+    caller = make_caller()
+    with pytest.raises(ValueError):
+        caller.call(lambda remaining: (_ for _ in ()).throw(ValueError()))
+    assert caller.stats()['retries'] == 0
+    assert caller.breaker.state == 'closed'
+
+
+def test_deadline_is_shared_by_attempts():
+    remaining_seen = []
+
+    def fn(remaining):
+        remaining_seen.append(remaining)
+        time.sleep(min(remaining, 0.15))
+        raise Flaky()
+
+    caller = make_caller(max_retries=10, deadline=0.4)
+    started = time.monotonic()
+    with pytest.raises(Flaky):
+        caller.call(fn)
+    assert time.monotonic() - started < 0.6
+    assert remaining_seen[0] == pytest.approx(0.4, abs=0.05)
+    assert all(later < earlier for earlier, later in zip(remaining_seen, remaining_seen[1:]))
+    assert caller.stats()['retries_skipped_deadline'] == 1
+
+
+def test_hedged_call_respects_the_deadline():
+    executor = ThreadPoolExecutor(max_workers=4)
+    caller = make_caller(hedge_executor=executor, hedge_delay=0.05, deadline=0.2)
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        caller.call(lambda remaining: time.sleep(1))
+    assert time.monotonic() - started < 0.4
+    stats = caller.stats()
+    assert stats['hedges'] == 1
+    assert stats['deadline_exceeded'] == 1
+    executor.shutdown(wait=False)
+
+
+def test_hedge_wins_when_primary_is_slow():
+    executor = ThreadPoolExecutor(max_workers=4)
+    calls = []
+
+    def fn(remaining):
+        calls.append(1)
+        if len(calls) == 1:
+            time.sleep(0.5)
+            return 'primary'
+        return 'hedge'
+
+    caller = make_caller(hedge_executor=executor, hedge_delay=0.05)
+    assert caller.call(fn) == 'hedge'
+    assert caller.stats()['hedge_wins'] == 1
+    executor.shutdown(wait=False)
@@ -0,0 +1,54 @@
+import threading
+import time
+
+from services.shared_state import SharedStore
+
+
+def test_values_expire_and_are_visible_to_other_instances(tmp_path):
+    path = str(tmp_path / 'state.db')
+    SharedStore(path).set('tts', 'k', {'audioFile': 'x'})
+    SharedStore(path).set('tts', 'gone', 1, expires_at=time.time() - 1)
+
+    other = SharedStore(path)
+    assert other.get('tts', 'k') == {'audioFile': 'x'}
+    assert other.get('tts', 'gone') is None
+    assert other.purge_expired() == 1
+
+
+def test_lease_has_one_owner_until_released(tmp_path):
+    store = SharedStore(str(tmp_path / 'state.db'))
+    assert store.acquire_lease('warmup', ttl=30)
+    assert store.acquire_lease('warmup', ttl=30)  # same owner renews
+
+    taken = []
+    t = threading.Thread(target=lambda: taken.append(store.acquire_lease('warmup', ttl=30)))
+    t.start()
+    t.join()
+    assert taken == [False]
+
+    store.release_lease('warmup')
+    t = threading.Thread(target=lambda: taken.append(store.acquire_lease('warmup', ttl=30)))
+    t.start()
+    t.join()
+    assert taken == [False, True]
+
+
+def test_fetch_once_runs_a_single_fetch(tmp_path):
+    store = SharedStore(str(tmp_path / 'state.db'))
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.2)
+        return 'token'
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(
+        store.fetch_once('auth', 'murf', fetch, lambda value, updated_at: True))) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == ['token'] * 4
+    assert len(calls) == 1
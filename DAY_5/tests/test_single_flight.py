@@ -0,0 +1,74 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from services.single_flight import AsyncSingleFlight, SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    calls = []
+
+    def work():
+        calls.append(1)
+        time.sleep(0.1)
+        return 'audio'
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do('k', work))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert sorted(results) == [('audio', False)] + [('audio', True)] * 4
+    assert flight.stats() == {'leaders': 1, 'coalesced': 4, 'in_flight': 0}
+
+
+def test_leader_exception_reaches_followers_and_is_not_cached():
+    flight = SingleFlight()
+    started = threading.Event()
+
+    def failing():
+        started.set()
+        time.sleep(0.05)
+        raise ValueError('boom')
+
+    errors = []
+
+    def follower():
+        started.wait()
+        try:
+            flight.do('k', lambda: 'unused')
+        except ValueError as e:
+            errors.append(e)
+
+    t = threading.Thread(target=follower)
+    t.start()
+    with pytest.raises(ValueError):
+        flight.do('k', failing)
+    t.join()
+
+    assert len(errors) == 1
+    assert flight.do('k', lambda: 'fresh') == ('fresh', False)
+
+
+def test_async_single_flight():
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return 'audio'
+
+    async def run():
+        return await asyncio.gather(*(flight.do('k', work) for _ in range(3)))
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert results.count(('audio', True)) == 2
+    assert flight.stats()['in_flight'] == 0
@@ -0,0 +1,33 @@
+import io
+import json
+import logging
+
+from services.cache_warmer import top_logged_texts
+from services.structured_log import JsonFormatter, log_event, text_summary
+
+
+def test_text_summary_hides_the_text():
+    summary = text_summary('Hello world.')
+    assert summary['text_chars'] == 12
+    assert len(summary['text_sha256']) == 16
+    assert summary == text_summary('Hello world.')
+    assert 'Hello' not in json.dumps(summary)
+
+
+def test_warmup_reads_texts_from_debug_records(tmp_path):
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(JsonFormatter())
+    logger = logging.getLogger('test_structured_log')
+    logger.addHandler(handler)
+    logger.setLevel(logging.DEBUG)
+    try:
+        for text in ['Hi.', 'Hi.', 'Bye.']:
+            log_event(logger, logging.INFO, 'tts_request', **text_summary(text))
+            log_event(logger, logging.DEBUG, 'tts_request_text', text=text)
+    finally:
+        logger.removeHandler(handler)
+
+    log_file = tmp_path / 'app.log'
+    log_file.write_text(stream.getvalue(), encoding='utf-8')
+    assert top_logged_texts(str(log_file)) == ['Hi.', 'Bye.']
@@ -0,0 +1,36 @@
+import struct
+
+import pytest
+
+from services.audio_stitch import stitch_audio, strip_id3
+from services.text_chunker import split_sentences, split_text
+
+
+def test_split_sentences_keeps_punctuation():
+    assert split_sentences('Hi there. How are you?  "Fine!" Ok') == ['Hi there.', 'How are you?', '"Fine!"', 'Ok']
+
+
+def test_split_text_respects_the_limit():
+    text = 'One two three. ' * 20 + 'A very long clause, another long clause; ' * 10
+    chunks = split_text(text, max_chars=60)
+    assert all(len(chunk) <= 60 for chunk in chunks)
+    assert ' '.join(chunks).split() == text.split()
+    assert split_text('x' * 25, max_chars=10) == ['x' * 10, 'x' * 10, 'x' * 5]
+    with pytest.raises(ValueError):
+        split_text('text', max_chars=0)
+
+
+def wav(frames):
+    fmt = struct.pack('<HHIIHH', 1, 1, 8000, 16000, 2, 16)
+    body = b'WAVE' + b'fmt ' + struct.pack('<I', len(fmt)) + fmt + b'data' + struct.pack('<I', len(frames)) + frames
+    return b'RIFF' + struct.pack('<I', len(body)) + body
+
+
+def test_stitch_wav_and_mp3():
+    assert stitch_audio([wav(b'\x01\x00'), wav(b'\x02\x00')], 'wav') == wav(b'\x01\x00\x02\x00')
+
+    tagged = b'ID3\x03\x00\x00\x00\x00\x00\x02ab' + b'\xff\xfbframe'
+    assert strip_id3(tagged) == b'\xff\xfbframe'
+    assert stitch_audio([tagged, tagged], 'MP3') == tagged + b'\xff\xfbframe'
+    with pytest.raises(ValueError):
+        stitch_audio([b'x'], 'ogg')
@@ -0,0 +1,43 @@
+import pytest
+
+from services.text_normalizer import TextNormalizer, language_of
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('  Hello   world  ', 'Hello world.'),
+    ('Wait!!!  Really??', 'Wait! Really?'),
+    ('“Quoted” — fine….', '"Quoted" - fine...'),
+    ('It costs 1,000 dollars', 'It costs 1000 dollars.'),
+    ('Meet at 3pm', 'Meet at 3 PM.'),
+    ('Meet at 10:30 a.m. tomorrow', 'Meet at 10:30 AM tomorrow.'),
+    ('Due 2024/01/05', 'Due 2024-01-05.'),
+])
+def test_normalize_english(text, expected):
+    assert TextNormalizer().normalize(text, 'en') == expected
+
+
+def test_time_keeps_sentence_ending_period():
+    normalizer = TextNormalizer()
+    assert normalizer.normalize('Meet at 3 p.m. Then we leave.', 'en') == 'Meet at 3 PM. Then we leave.'
+    assert normalizer.normalize('Meet at 3 p.m.', 'en') == 'Meet at 3 PM.'
+
+
+def test_language_rules_and_disabled():
+    assert language_of('fr-FR-denise') == 'fr'
+    assert TextNormalizer().normalize('Vraiment !', 'fr') == 'Vraiment !'
+    assert TextNormalizer(enabled=False).normalize('  a  b ', 'en') == '  a  b '
+
+
+def test_collapses_are_counted_once_per_raw_text():
+    normalizer = TextNormalizer()
+    for _ in range(3):
+        normalizer.normalize('Hello world.', 'en')
+    for _ in range(3):
+        normalizer.normalize('Hello   world', 'en')
+    normalizer.normalize('Hello world!!', 'en')
+
+    stats = normalizer.stats()
+    assert stats['texts'] == 7
+    assert stats['distinct'] == 3
+    assert stats['collapsed'] == 1  # only "Hello   world"; "Hello world!!" is a new canonical form
+    assert stats['collapse_ratio'] == pytest.approx(1 / 3, abs=1e-3)
@@ -0,0 +1,40 @@
+import time
+
+from services.tts_cache import TTSCache, make_cache_key
+
+
+def test_cache_key_ignores_key_order_and_outer_whitespace():
+    a = make_cache_key({'text': ' Hello. ', 'voiceId': 'en-US-ken', 'audioFormat': 'mp3'})
+    b = make_cache_key({'audioFormat': 'MP3', 'voiceId': 'en-US-ken', 'text': 'Hello.'})
+    assert a == b
+    assert a != make_cache_key({'text': 'Hello.', 'voiceId': 'en-US-natalie', 'audioFormat': 'MP3'})
+
+
+def test_lru_evicts_least_recently_used():
+    cache = TTSCache(max_entries=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1  # b is now the oldest
+    cache.set('c', 3)
+
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
+    assert cache.stats()['evictions'] == 1
+
+
+def test_entries_expire_after_ttl():
+    cache = TTSCache(ttl_seconds=0.05)
+    cache.set('a', 1)
+    assert cache.get('a') == 1
+    time.sleep(0.06)
+    assert cache.get('a') is None
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['expirations']) == (1, 1, 1)
+
+
+def test_disk_tier_survives_a_new_instance(tmp_path):
+    TTSCache(disk_dir=str(tmp_path)).set('k' * 64, {'audioFile': 'x'})
+    cache = TTSCache(disk_dir=str(tmp_path))
+    assert cache.get('k' * 64) == {'audioFile': 'x'}
+    assert cache.stats()['disk_hits'] == 1
+    assert cache.peek('k' * 64) == {'audioFile': 'x'}  # promoted to memory
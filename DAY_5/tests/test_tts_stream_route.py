@@ -0,0 +1,27 @@
+import os
+
+import pytest
+
+os.environ.setdefault('TTS_WARMUP_ON_STARTUP', 'false')
+
+import app as tts_app  # noqa: E402
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(tts_app, 'MURF_API_KEY', 'test-key')
+    return tts_app.app.test_client()
+
+
+@pytest.mark.parametrize('body, lane', [
+    ({}, 'interactive'),
+    ({'priority': 'bulk'}, 'bulk'),
+])
+def test_stream_uses_the_requested_lane(client, monkeypatch, body, lane):
+    lanes = []
+    monkeypatch.setattr(tts_app, 'synthesize_audio_bytes',
+                        lambda payload, use_cache, lane='interactive': lanes.append(lane) or b'ID3')
+    response = client.post('/tts/stream', json={'text': 'One. Two.', **body})
+    assert response.status_code == 200
+    response.get_data()
+    assert lanes == [lane, lane]
@@ -0,0 +1,85 @@
+import hashlib
+import io
+import os
+
+import pytest
+from flask import Flask, jsonify, request
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from services.upload_ingest import HashingSpoolFile, UploadTooLarge, ingest_multipart, ingest_stream, init_flask
+
+BODY = b'RIFF' + os.urandom(200 * 1024)
+
+
+def flask_app(directory, max_bytes=None):
+    app = Flask(__name__)
+    init_flask(app, directory, max_bytes)
+
+    @app.route('/upload', methods=['POST'])
+    def upload():
+        stream = request.files['audio'].stream
+        if request.form.get('keep') != 'yes':
+            return jsonify({'kept': False})
+        ingested = ingest_stream(stream, directory, max_bytes)
+        return jsonify({'spooled': isinstance(stream, HashingSpoolFile), 'path': ingested.path,
+                        'size': ingested.size, 'sha256': ingested.sha256})
+
+    return app
+
+
+def test_flask_part_is_written_once_and_claimed(tmp_path):
+    client = flask_app(str(tmp_path)).test_client()
+    result = client.post('/upload', data={'keep': 'yes', 'audio': (io.BytesIO(BODY), 'a.wav')}).get_json()
+
+    assert result['spooled']
+    assert result['size'] == len(BODY)
+    assert result['sha256'] == hashlib.sha256(BODY).hexdigest()
+    assert os.listdir(tmp_path) == [os.path.basename(result['path'])]
+
+
+def test_flask_unclaimed_part_is_removed(tmp_path):
+    client = flask_app(str(tmp_path)).test_client()
+    assert client.post('/upload', data={'audio': (io.BytesIO(BODY), 'a.wav')}).get_json() == {'kept': False}
+    assert os.listdir(tmp_path) == []
+
+
+def test_flask_part_over_limit(tmp_path):
+    spool = HashingSpoolFile(str(tmp_path), max_bytes=10)
+    spool.write(b'12345')
+    with pytest.raises(UploadTooLarge):
+        spool.write(b'678901')
+    assert os.listdir(tmp_path) == []
+
+
+def asgi_client(directory, max_bytes=None):
+    async def upload(request):
+        try:
+            part = await ingest_multipart(request, 'audio', directory, max_bytes)
+        except UploadTooLarge:
+            return JSONResponse({}, status_code=413)
+        if part is None:
+            return JSONResponse({'found': False})
+        ingested, filename, content_type = part
+        return JSONResponse({'found': True, 'filename': filename, 'content_type': content_type,
+                             'size': ingested.size, 'sha256': ingested.sha256})
+
+    return TestClient(Starlette(routes=[Route('/upload', upload, methods=['POST'])]))
+
+
+def test_asgi_part_is_parsed_from_the_stream(tmp_path):
+    client = asgi_client(str(tmp_path))
+    result = client.post('/upload', data={'note': 'x'}, files={'audio': ('a.wav', BODY, 'audio/wav')}).json()
+
+    assert result == {'found': True, 'filename': 'a.wav', 'content_type': 'audio/wav',
+                      'size': len(BODY), 'sha256': hashlib.sha256(BODY).hexdigest()}
+    assert len(os.listdir(tmp_path)) == 1
+
+
+def test_asgi_missing_part_and_limit(tmp_path):
+    client = asgi_client(str(tmp_path), max_bytes=1024)
+    assert client.post('/upload', data={'note': 'x'}, files={'other': ('a.wav', b'abc')}).json() == {'found': False}
+    assert client.post('/upload', files={'audio': ('a.wav', BODY)}).status_code == 413
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,61 @@
+import os
+import time
+
+from services.upload_retention import UploadRetention
+
+
+def make_upload(root, name, age, size=10):
+    shard = os.path.join(root, name[:2])
+    os.makedirs(shard, exist_ok=True)
+    path = os.path.join(shard, name + '.webm')
+    with open(path, 'wb') as f:
+        f.write(b'x' * size)
+    accessed = time.time() - age
+    os.utime(path, (accessed, accessed))
+    return path
+
+
+def run_cycle(retention):
+    for _ in range(len(os.listdir(retention.root)) + 1):
+        retention.run_once()
+
+
+def test_quota_evicts_least_recently_accessed(tmp_path):
+    root = str(tmp_path)
+    oldest = make_upload(root, 'aa1', age=100)
+    older = make_upload(root, 'bb1', age=50)
+    recent = make_upload(root, 'cc1', age=0)
+    retention = UploadRetention(root, max_bytes=20)
+    run_cycle(retention)
+
+    assert not os.path.exists(oldest)
+    assert os.path.exists(older) and os.path.exists(recent)
+    assert retention.stats()['deleted_quota'] == 1
+    assert retention.stats()['bytes'] == 20
+
+
+def test_idle_files_expire_and_touch_keeps_them(tmp_path):
+    root = str(tmp_path)
+    idle = make_upload(root, 'aa1', age=100)
+    read = make_upload(root, 'bb1', age=100)
+    retention = UploadRetention(root, max_age=60, touch_interval=0)
+    retention.touch(read)
+    run_cycle(retention)
+
+    assert not os.path.exists(idle)
+    assert os.path.exists(read)
+    assert retention.stats()['deleted_age'] == 1
+
+
+def test_stale_incoming_files_are_removed(tmp_path):
+    incoming = tmp_path / '.incoming'
+    incoming.mkdir()
+    stale, fresh = incoming / 'ingest.1.tmp', incoming / 'ingest.2.tmp'
+    stale.write_bytes(b'x')
+    fresh.write_bytes(b'x')
+    os.utime(stale, (time.time() - 7200, time.time() - 7200))
+    retention = UploadRetention(str(tmp_path), incoming_dir=str(incoming), incoming_max_age=3600)
+    retention.run_once()
+
+    assert not stale.exists() and fresh.exists()
+    assert retention.stats()['deleted_incoming'] == 1
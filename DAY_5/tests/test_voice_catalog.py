@@ -0,0 +1,48 @@
+import time
+
+import pytest
+
+from services.voice_catalog import CatalogFetchError, VoiceCatalog
+
+
+def make_catalog(results, **kwargs):
+    calls = []
+
+    def fetch():
+        calls.append(time.time())
+        result = results[min(len(calls), len(results)) - 1]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    catalog = VoiceCatalog(fetch, **kwargs)
+    return catalog, calls
+
+
+def test_first_get_fetches_then_serves_the_snapshot():
+    catalog, calls = make_catalog([[{'voiceId': 'en-US-ken'}]])
+    try:
+        first = catalog.get()
+        assert catalog.get() is first
+        assert len(calls) == 1
+        assert first.count == 1 and len(first.etag) == 32
+    finally:
+        catalog.stop()
+
+
+def test_failed_refresh_keeps_the_stale_snapshot():
+    catalog, calls = make_catalog([['a'], RuntimeError('down')])
+    try:
+        snapshot = catalog.refresh()
+        assert catalog.refresh() is snapshot
+        assert catalog.stats()['failures'] == 1
+        assert catalog.stats()['last_error'] == 'down'
+    finally:
+        catalog.stop()
+
+
+def test_failure_without_a_snapshot_raises():
+    catalog, _ = make_catalog([CatalogFetchError('bad key', 401)])
+    with pytest.raises(CatalogFetchError) as e:
+        catalog.refresh()
+    assert e.value.status_code == 401
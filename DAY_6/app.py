@@ -1,10 +1,17 @@
-from flask import Flask, render_template, request, jsonify, send_from_directory
+from flask import Flask, render_template, request, jsonify
 import requests
 import os
 import assemblyai as aai
 from werkzeug.utils import secure_filename
 from datetime import datetime
 
+from services import metrics
+from services.audio_store import AudioStore
+from services.file_delivery import FileDelivery
+from services.resumable_upload import UploadSessionError, UploadSessions
+from services.upload_ingest import UploadTooLarge, ingest_stream, init_flask as init_upload_ingest
+from services.upload_retention import UploadRetention
+
 # Load environment variables
 try:
     from dotenv import load_dotenv
@@ -17,20 +24,100 @@ if not aai_api_key:
     raise RuntimeError("ASSEMBLYAI_API_KEY not set in environment.")
 
 aai.settings.api_key = aai_api_key
+# Point the SDK at another AssemblyAI-compatible host, e.g. a local stub
+if os.getenv("ASSEMBLYAI_BASE_URL"):
+    aai.settings.base_url = os.getenv("ASSEMBLYAI_BASE_URL")
 
 app = Flask(__name__, static_folder='static', template_folder='templates')
 
+# Prometheus /metrics: per-route latency, in-flight, bytes and status counts
+metrics.init_flask(app)
+
 UPLOAD_FOLDER = os.path.join(os.path.dirname(__file__), "uploads")
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 ALLOWED_EXTENSIONS = {'webm', 'wav', 'mp3', 'ogg', 'm4a'}
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+# Recordings are streamed to disk in chunks and never held in memory whole;
+# bodies over the limit get 413 before (or while) they are read
+UPLOAD_MAX_BYTES = int(os.getenv('UPLOAD_MAX_BYTES', 25 * 1024 * 1024))
+UPLOAD_INCOMING_FOLDER = os.path.join(UPLOAD_FOLDER, '.incoming')
+app.config['MAX_CONTENT_LENGTH'] = UPLOAD_MAX_BYTES
+# Multipart file parts are written (and hashed) straight into the incoming
+# folder while the form is parsed; ingest_stream() then claims the file
+# instead of copying Werkzeug's spool file a second time
+init_upload_ingest(app, UPLOAD_INCOMING_FOLDER, UPLOAD_MAX_BYTES)
+# Uploads are stored by content hash (sharded dirs) and looked up by that ID
+upload_store = AudioStore(UPLOAD_FOLDER)
+# Served with Range, ETag/Last-Modified and browser-only caching;
+# FILE_OFFLOAD=x-accel-redirect (nginx) or x-sendfile (Apache) hands the body to the front proxy
+upload_delivery = FileDelivery(
+    UPLOAD_FOLDER,
+    f"private, max-age={int(os.getenv('UPLOAD_CACHE_MAX_AGE', 7 * 24 * 3600))}, immutable",
+    offload=os.getenv('FILE_OFFLOAD', '').lower(),
+    offload_prefix=os.getenv('UPLOADS_OFFLOAD_PREFIX', '/_protected/uploads/')
+)
+
+# Upload retention: total size cap and idle age, least recently accessed evicted
+# first, enforced by a background thread that rescans one shard per tick
+upload_retention = UploadRetention(
+    UPLOAD_FOLDER,
+    max_bytes=int(os.getenv('UPLOAD_MAX_TOTAL_BYTES', 2 * 1024 ** 3)),
+    max_age=int(os.getenv('UPLOAD_MAX_AGE', 7 * 24 * 3600)),
+    interval=float(os.getenv('UPLOAD_GC_INTERVAL', 1)),
+    incoming_dir=UPLOAD_INCOMING_FOLDER
+)
+metrics.CallbackGauge('upload_store_bytes', 'Bytes held in the upload store', lambda: upload_retention.stats()['bytes'])
+metrics.CallbackGauge('upload_store_files', 'Files held in the upload store', lambda: upload_retention.stats()['files'])
+metrics.CallbackGauge('upload_store_max_bytes', 'Upload store size limit', lambda: upload_retention.max_bytes or 0)
+metrics.CallbackGauge('upload_gc_deleted_total', 'Uploads removed by retention, by reason', lambda: [
+    (('age',), upload_retention.stats()['deleted_age']),
+    (('quota',), upload_retention.stats()['deleted_quota']),
+    (('incoming',), upload_retention.stats()['deleted_incoming']),
+], labelnames=('reason',), kind='counter')
+metrics.CallbackGauge('upload_gc_freed_bytes_total', 'Bytes freed by upload retention',
+                      lambda: upload_retention.stats()['freed_bytes'], kind='counter')
+
+@app.errorhandler(413)
+@app.errorhandler(UploadTooLarge)
+def upload_too_large(e):
+    return jsonify({'success': False, 'error': str(UploadTooLarge(UPLOAD_MAX_BYTES))}), 413
+
+# Resumable uploads for long recordings: the client creates a session, PUTs
+# checksummed chunks at the current offset (resuming from Upload-Offset after
+# a dropped connection), then finalizes. The assembled file is stored and
+# transcribed like a direct upload, so it gets the same UPLOAD_MAX_BYTES cap.
+# Idle sessions are expired by the upload retention thread. Session data sits
+# outside the shards that retention's size cap covers, so open sessions have
+# caps of their own: count (429 beyond it) and reserved bytes (507).
+upload_sessions = UploadSessions(
+    os.path.join(UPLOAD_FOLDER, '.sessions'),
+    max_bytes=min(int(os.getenv('UPLOAD_SESSION_MAX_BYTES', UPLOAD_MAX_BYTES)), UPLOAD_MAX_BYTES),
+    chunk_max_bytes=min(int(os.getenv('UPLOAD_CHUNK_MAX_BYTES', 8 * 1024 * 1024)), UPLOAD_MAX_BYTES),
+    ttl=int(os.getenv('UPLOAD_SESSION_TTL', 24 * 3600)),
+    max_sessions=int(os.getenv('UPLOAD_SESSION_MAX_OPEN', 64)),
+    max_total_bytes=int(os.getenv('UPLOAD_SESSION_MAX_TOTAL_BYTES', 512 * 1024 * 1024))
+)
+upload_retention.on_cycle.append(upload_sessions.expire)
+
+@app.errorhandler(UploadSessionError)
+def upload_session_error(e):
+    response = jsonify({'success': False, 'error': str(e), 'offset': e.offset})
+    if e.offset is not None:
+        response.headers['Upload-Offset'] = str(e.offset)
+    return response, e.status_code
+
+def session_response(session, status=200):
+    response = jsonify({'success': True, **session, 'url': f"/upload-sessions/{session['session_id']}"})
+    response.headers['Upload-Offset'] = str(session['offset'])
+    return response, status
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 @app.route('/health')
 def health():
-    return jsonify({"status": "ok", "message": "Server is healthy."})
+    return jsonify({"status": "ok", "message": "Server is healthy.", "uploads": upload_retention.stats(),
+                    "upload_sessions": upload_sessions.stats()})
 
 @app.route('/tts/test')
 def tts_test():
@@ -59,34 +146,141 @@ def upload_audio():
         return jsonify({'success': False, 'error': 'No selected audio file'}), 400
     if file and allowed_file(file.filename):
         filename = secure_filename(file.filename)
-        save_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(save_path)
-        file_size = os.path.getsize(save_path)
+        try:
+            ingested = ingest_stream(file.stream, UPLOAD_INCOMING_FOLDER, UPLOAD_MAX_BYTES)
+        except UploadTooLarge as e:
+            return jsonify({'success': False, 'error': str(e)}), 413
+        upload_id, created = upload_store.put_file(ingested, filename.rsplit('.', 1)[1])
+        upload_retention.record(upload_store.path_for(upload_id), ingested.size)
         return jsonify({
             'success': True,
+            'id': upload_id,
+            'url': f'/uploads/{upload_id}',
             'filename': filename,
             'content_type': file.content_type,
-            'size': file_size
+            'size': ingested.size,
+            'duplicate': not created
         })
     return jsonify({'success': False, 'error': 'Invalid file type'}), 400
 
-@app.route('/uploads/<filename>')
-def uploaded_file(filename):
-    return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
+@app.route('/uploads/<upload_id>')
+def uploaded_file(upload_id):
+    path = upload_store.path_for(upload_id)
+    if not path:
+        return jsonify({'success': False, 'error': 'Upload not found'}), 404
+    upload_retention.touch(path)
+    return upload_delivery.flask_response(path, upload_id, AudioStore.mimetype_for(path))
+
+def transcribe_path(path, size):
+    transcriber = aai.Transcriber()
+    # The SDK does upload, transcript and polling in one blocking call;
+    # given a path it streams the file from disk
+    with metrics.upstream_call('assemblyai', 'transcribe') as call:
+        call.bytes_out = size
+        transcript = transcriber.transcribe(path)
+        call.status = getattr(transcript.status, 'value', transcript.status)
+    return transcript
 
 @app.route('/transcribe/file', methods=['POST'])
 def transcribe_file():
     if 'audio' not in request.files:
         return jsonify({'success': False, 'error': 'No audio file provided.'}), 400
     file = request.files['audio']
-    audio_bytes = file.read()
     try:
-        transcriber = aai.Transcriber()
-        transcript = transcriber.transcribe(audio_bytes)
+        ingested = ingest_stream(file.stream, UPLOAD_INCOMING_FOLDER, UPLOAD_MAX_BYTES)
+    except UploadTooLarge as e:
+        return jsonify({'success': False, 'error': str(e)}), 413
+    try:
+        with ingested:
+            transcript = transcribe_path(ingested.path, ingested.size)
         return jsonify({'success': True, 'transcript': transcript.text}), 200
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/upload-sessions', methods=['POST'])
+def create_upload_session():
+    """
+    Start a resumable upload. JSON body: {"filename": "talk.webm", "size": <total bytes, optional>}.
+    """
+    data = request.get_json(silent=True) or {}
+    filename = secure_filename(data.get('filename') or '')
+    if not allowed_file(filename):
+        return jsonify({'success': False, 'error': 'Invalid file type'}), 400
+    size = data.get('size')
+    if size is not None and not isinstance(size, int):
+        return jsonify({'success': False, 'error': 'size must be an integer'}), 400
+    return session_response(upload_sessions.create(filename, size), 201)
+
+@app.route('/upload-sessions/<session_id>', methods=['GET', 'HEAD'])
+def upload_session_status(session_id):
+    # Where to resume: the Upload-Offset header / "offset" field
+    return session_response(upload_sessions.status(session_id))
+
+@app.route('/upload-sessions/<session_id>', methods=['PUT'])
+def upload_session_chunk(session_id):
+    """
+    Raw chunk body written at Upload-Offset (the session's current offset),
+    with its hex SHA-256 in X-Chunk-SHA256. A mismatched offset answers 409
+    and a bad checksum 422, both carrying the offset to resume from.
+    """
+    offset = request.headers.get('Upload-Offset', request.args.get('offset', ''))
+    if not offset.isdigit():
+        return jsonify({'success': False, 'error': 'Upload-Offset header is required'}), 400
+    session = upload_sessions.write_chunk(session_id, int(offset), request.stream,
+                                          request.content_length, request.headers.get('X-Chunk-SHA256'))
+    return session_response(session)
+
+@app.route('/upload-sessions/<session_id>', methods=['DELETE'])
+def cancel_upload_session(session_id):
+    upload_sessions.cancel(session_id)
+    return jsonify({'success': True})
+
+@app.route('/upload-sessions/<session_id>/finalize', methods=['POST'])
+def finalize_upload_session(session_id):
+    """
+    Store the assembled file like /upload-audio and, unless {"transcribe": false},
+    transcribe it. An optional {"sha256": ...} is checked against the whole file.
+    """
+    data = request.get_json(silent=True) or {}
+    ingested, filename = upload_sessions.finalize(session_id, UPLOAD_INCOMING_FOLDER, data.get('sha256'))
+    upload_id, created = upload_store.put_file(ingested, filename.rsplit('.', 1)[1])
+    path = upload_store.path_for(upload_id)
+    upload_retention.record(path, ingested.size)
+    result = {
+        'success': True,
+        'id': upload_id,
+        'url': f'/uploads/{upload_id}',
+        'filename': filename,
+        'size': ingested.size,
+        'sha256': ingested.sha256,
+        'duplicate': not created
+    }
+    if data.get('transcribe', True):
+        try:
+            result['transcript'] = transcribe_path(path, ingested.size).text
+        except Exception as e:
+            # The upload is kept (the session is gone): retry from the stored file
+            return jsonify({**result, 'success': False, 'error': str(e),
+                            'retry_url': f'/uploads/{upload_id}/transcribe'}), 500
+    return jsonify(result), 200
+
+@app.route('/uploads/<upload_id>/transcribe', methods=['POST'])
+def transcribe_upload(upload_id):
+    """
+    Transcribe an already stored upload, e.g. after a failed transcription on
+    finalize, without sending the file again.
+    """
+    path = upload_store.path_for(upload_id)
+    if not path:
+        return jsonify({'success': False, 'error': 'Upload not found'}), 404
+    upload_retention.touch(path)
+    try:
+        transcript = transcribe_path(path, os.path.getsize(path))
+    except Exception as e:
+        return jsonify({'success': False, 'id': upload_id, 'error': str(e),
+                        'retry_url': f'/uploads/{upload_id}/transcribe'}), 500
+    return jsonify({'success': True, 'id': upload_id, 'transcript': transcript.text}), 200
+
 @app.route('/')
 def index():
     # If you have templates/index.html, use render_template('index.html')
@@ -94,6 +288,16 @@ def index():
     with open('index.html', 'r', encoding='utf-8') as f:
         return f.read()
 
+def is_serving_process():
+    # The debug reloader runs app.py twice; background work runs only in the process that serves
+    if __name__ == '__main__' and os.getenv('FLASK_DEBUG', 'True').lower() == 'true':
+        return os.environ.get('WERKZEUG_RUN_MAIN') == 'true'
+    return True
+
+# Upload retention (and session expiry) runs in the serving process only
+if is_serving_process():
+    upload_retention.start()
+
 if __name__ == "__main__":
     host = os.getenv('FLASK_HOST', '0.0.0.0')
     port = int(os.getenv('FLASK_PORT', 5001))
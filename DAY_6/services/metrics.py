@@ -0,0 +1,390 @@
+import bisect
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+# Prometheus text exposition format without the prometheus_client dependency.
+# Recording is a dict lookup plus a few integer updates under a per-metric lock.
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children = {}
+        (registry or REGISTRY).register(self)
+
+    def labels(self, *values):
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        with self._lock:
+            children = list(self._children.items())
+        for values, child in children:
+            lines.extend(self._render_child(values, child))
+        return lines
+
+
+class _Value:
+    __slots__ = ('value', '_lock')
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount=1):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value):
+        self.value = value
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount=1):
+        self.labels().inc(amount)
+
+    def _render_child(self, values, child):
+        return [f'{self.name}{_labels(self.labelnames, values)} {_number(child.value)}']
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def set(self, value):
+        self.labels().set(value)
+
+
+class _HistogramValue:
+    __slots__ = ('buckets', 'counts', 'sum', 'count', '_lock')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            if index < len(self.counts):
+                self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS, registry=None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value):
+        self.labels().observe(value)
+
+    def _render_child(self, values, child):
+        with child._lock:
+            counts, total, count = list(child.counts), child.sum, child.count
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            lines.append(f'{self.name}_bucket{_labels(self.labelnames, values, ("le", _number(float(bound))))} {cumulative}')
+        lines.append(f'{self.name}_bucket{_labels(self.labelnames, values, ("le", "+Inf"))} {count}')
+        lines.append(f'{self.name}_sum{_labels(self.labelnames, values)} {_number(total)}')
+        lines.append(f'{self.name}_count{_labels(self.labelnames, values)} {count}')
+        return lines
+
+
+class CallbackGauge:
+    """
+    Gauge read at scrape time, e.g. from an existing stats() dict.
+    `fn` returns a number or a list of (label_values, number).
+    """
+
+    def __init__(self, name, documentation, fn, labelnames=(), kind='gauge', registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.fn = fn
+        self.labelnames = tuple(labelnames)
+        self.kind = kind
+        (registry or REGISTRY).register(self)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        try:
+            samples = self.fn()
+        except Exception:
+            return lines
+        if not isinstance(samples, list):
+            samples = [((), samples)]
+        for values, value in samples:
+            lines.append(f'{self.name}{_labels(self.labelnames, values)} {_number(value)}')
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics[metric.name] = metric
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+# HTTP server side
+http_requests = Counter('http_requests_total', 'HTTP requests by route, method and status',
+                        ('route', 'method', 'status'))
+http_latency = Histogram('http_request_duration_seconds', 'HTTP request latency by route',
+                         ('route', 'method'))
+http_in_flight = Gauge('http_requests_in_flight', 'HTTP requests currently being handled', ('route',))
+http_bytes_in = Counter('http_request_bytes_total', 'Request body bytes received (Content-Length)', ('route',))
+http_bytes_out = Counter('http_response_bytes_total', 'Response body bytes sent (when the length is known)', ('route',))
+
+# Upstream APIs (murf, assemblyai, gemini)
+upstream_requests = Counter('upstream_requests_total', 'Upstream API calls by status',
+                            ('upstream', 'operation', 'status'))
+upstream_latency = Histogram('upstream_request_duration_seconds', 'Upstream API call latency',
+                             ('upstream', 'operation'))
+upstream_in_flight = Gauge('upstream_requests_in_flight', 'Upstream API calls in flight', ('upstream',))
+upstream_bytes_out = Counter('upstream_request_bytes_total', 'Bytes sent to upstream APIs', ('upstream', 'operation'))
+upstream_bytes_in = Counter('upstream_response_bytes_total', 'Bytes received from upstream APIs', ('upstream', 'operation'))
+
+
+class UpstreamCall:
+    __slots__ = ('status', 'bytes_in', 'bytes_out')
+
+    def __init__(self):
+        self.status = 'error'
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def record(self, response, request_bytes=None):
+        """
+        Take status and sizes from a requests/httpx response. The request size
+        defaults to the Content-Length of the encoded request that was sent.
+        """
+        self.status = response.status_code
+        if request_bytes is None:
+            request_bytes = _content_length(getattr(response, 'request', None))
+        self.bytes_out = request_bytes
+        self.bytes_in = _content_length(response)
+        return response
+
+
+def _content_length(message):
+    length = message.headers.get('content-length') if message is not None else None
+    return int(length) if length and length.isdigit() else 0
+
+
+@contextmanager
+def upstream_call(upstream, operation):
+    """
+    Time one upstream call. Set call.status (or use call.record(response));
+    an exception leaves the status as "error".
+    """
+    call = UpstreamCall()
+    in_flight = upstream_in_flight.labels(upstream)
+    in_flight.inc()
+    started = time.perf_counter()
+    try:
+        yield call
+    finally:
+        in_flight.dec()
+        upstream_latency.labels(upstream, operation).observe(time.perf_counter() - started)
+        upstream_requests.labels(upstream, operation, call.status).inc()
+        if call.bytes_out:
+            upstream_bytes_out.labels(upstream, operation).inc(call.bytes_out)
+        if call.bytes_in:
+            upstream_bytes_in.labels(upstream, operation).inc(call.bytes_in)
+
+
+def _begin(route, request_bytes):
+    http_in_flight.labels(route).inc()
+    if request_bytes:
+        http_bytes_in.labels(route).inc(request_bytes)
+    return time.perf_counter()
+
+
+def _end(route, method, status, started, response_bytes):
+    http_in_flight.labels(route).dec()
+    http_latency.labels(route, method).observe(time.perf_counter() - started)
+    http_requests.labels(route, method, status).inc()
+    if response_bytes:
+        http_bytes_out.labels(route).inc(response_bytes)
+
+
+def init_flask(app, path='/metrics'):
+    """
+    Per-request metrics for a Flask app (route = URL rule, so cardinality stays
+    bounded) plus a GET /metrics endpoint.
+    """
+    from flask import Response, g, request
+
+    @app.before_request
+    def _metrics_start():
+        g.metrics_route = request.url_rule.rule if request.url_rule else 'unmatched'
+        g.metrics_started = _begin(g.metrics_route, request.content_length or 0)
+
+    @app.after_request
+    def _metrics_end(response):
+        started = g.pop('metrics_started', None)
+        if started is None:
+            return response
+        done = functools.partial(_end, g.metrics_route, request.method, response.status_code, started,
+                                 response.content_length)
+        if response.is_streamed:
+            # The body is sent after this hook returns; stop the clock when the
+            # server closes it (the length is known only if the header was set)
+            response.call_on_close(done)
+        else:
+            done()
+        return response
+
+    @app.teardown_request
+    def _metrics_error(exc):
+        # after_request does not run for unhandled exceptions
+        started = g.pop('metrics_started', None)
+        if started is not None:
+            _end(g.metrics_route, request.method, 500, started, 0)
+
+    def metrics_endpoint():
+        return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
+
+    app.add_url_rule(path, 'metrics', metrics_endpoint, methods=['GET'])
+
+
+class _AsgiMetricsMiddleware:
+    """
+    Plain ASGI middleware, so the clock stops when the last body message has
+    been sent (streamed, file and ranged responses included), not when the
+    handler returns its response object.
+    """
+
+    def __init__(self, app, route_of):
+        self.app = app
+        self.route_of = route_of
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        route = self.route_of(scope)
+        length = dict(scope['headers']).get(b'content-length', b'')
+        started = _begin(route, int(length) if length.isdigit() else 0)
+        state = {'status': 500, 'bytes': 0, 'done': False}
+
+        def finish():
+            if not state['done']:
+                state['done'] = True
+                _end(route, scope['method'], state['status'], started, state['bytes'])
+
+        async def timed_send(message):
+            kind = message['type']
+            if kind == 'http.response.start':
+                state['status'] = message['status']
+                length = dict(message.get('headers', [])).get(b'content-length', b'')
+                state['length'] = int(length) if length.isdigit() else 0
+            elif kind == 'http.response.body':
+                state['bytes'] += len(message.get('body', b''))
+            await send(message)
+            if kind == 'http.response.pathsend' or (kind == 'http.response.body' and not message.get('more_body')):
+                if kind == 'http.response.pathsend':
+                    state['bytes'] = state.get('length', 0)
+                finish()
+
+        try:
+            await self.app(scope, receive, timed_send)
+        finally:
+            # Errors and client disconnects end the request too
+            finish()
+
+
+def init_asgi(app, path='/metrics'):
+    """
+    Per-request metrics for a FastAPI/Starlette app plus a GET /metrics endpoint.
+    The route label is the matched path template, e.g. /audio/{audio_id}.
+    """
+    from starlette.responses import Response
+    from starlette.routing import Match
+
+    def route_of(scope):
+        for route in app.router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return getattr(route, 'path', 'unmatched')
+        return 'unmatched'
+
+    app.add_middleware(_AsgiMetricsMiddleware, route_of=route_of)
+
+    async def metrics_endpoint():
+        return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+    app.add_api_route(path, metrics_endpoint, methods=['GET'], include_in_schema=False)
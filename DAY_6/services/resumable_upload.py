@@ -0,0 +1,275 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from services.upload_ingest import CHUNK_SIZE, IngestedFile
+
+SESSION_ID = re.compile(r'^[0-9a-f]{32}$')
+
+
+class UploadSessionError(Exception):
+    """
+    A resumable upload request that cannot be applied. `offset` is the
+    session's current offset when the client should resume from there.
+    """
+
+    def __init__(self, message, status_code=400, offset=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.offset = offset
+
+
+class UploadSessions:
+    """
+    Resumable uploads: create a session, PUT chunks at the current offset
+    (each with its SHA-256), then finalize into an IngestedFile for the
+    normal upload path. Session data and metadata live on disk under `root`,
+    so a session survives a restart; idle sessions expire after `ttl` seconds
+    (call expire() periodically, e.g. from UploadRetention's on_cycle).
+
+    At most `max_sessions` sessions are open at once (429 beyond that), and
+    together they may reserve at most `max_total_bytes` (507): a session
+    reserves its declared size, or max_bytes when it declared none.
+    """
+
+    def __init__(self, root, max_bytes, chunk_max_bytes=8 * 1024 * 1024, ttl=24 * 3600,
+                 max_sessions=64, max_total_bytes=None):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.chunk_max_bytes = chunk_max_bytes
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.max_total_bytes = max_total_bytes
+        os.makedirs(root, exist_ok=True)
+        self._locks = {}  # session ID -> [lock, holders and waiters]
+        self._locks_guard = threading.Lock()
+        self._create_lock = threading.Lock()
+        self._counters = {'created': 0, 'chunks': 0, 'checksum_failures': 0, 'finalized': 0, 'expired': 0,
+                          'rejected_sessions': 0, 'rejected_bytes': 0}
+
+    def create(self, filename, size=None):
+        if size is not None and (size < 0 or size > self.max_bytes):
+            raise UploadSessionError(f"Upload exceeds the {self.max_bytes} byte limit", 413)
+        reserve = size if size is not None else self.max_bytes
+        with self._create_lock:
+            sessions, reserved = self._usage()
+            if self.max_sessions and sessions >= self.max_sessions:
+                self._count('rejected_sessions')
+                raise UploadSessionError(f"Too many open upload sessions ({self.max_sessions})", 429)
+            if self.max_total_bytes and reserved + reserve > self.max_total_bytes:
+                self._count('rejected_bytes')
+                raise UploadSessionError('Not enough upload session space; finish or cancel other uploads', 507)
+            session_id = uuid.uuid4().hex
+            now = time.time()
+            meta = {'id': session_id, 'filename': filename, 'size': size, 'offset': 0,
+                    'created_at': now, 'updated_at': now}
+            open(self._data_path(session_id), 'wb').close()
+            self._save(meta)
+        self._count('created')
+        return self._public(meta)
+
+    def status(self, session_id):
+        return self._public(self._load(session_id))
+
+    def write_chunk(self, session_id, offset, stream, length, checksum):
+        """
+        Append `length` bytes read from `stream` at `offset`, which must be the
+        session's current offset. The chunk is kept only if its SHA-256 matches
+        `checksum`; otherwise the session stays where it was.
+        """
+        if not checksum:
+            raise UploadSessionError('X-Chunk-SHA256 header is required')
+        if length is None or length <= 0:
+            raise UploadSessionError('Chunk body with a Content-Length is required', 411)
+        if length > self.chunk_max_bytes:
+            raise UploadSessionError(f"Chunk exceeds the {self.chunk_max_bytes} byte limit", 413)
+
+        with self._locked(session_id):
+            meta = self._load(session_id)
+            if offset != meta['offset']:
+                raise UploadSessionError(f"Expected offset {meta['offset']}", 409, meta['offset'])
+            limit = meta['size'] if meta['size'] is not None else self.max_bytes
+            if offset + length > limit:
+                raise UploadSessionError(f"Chunk runs past the declared size ({limit} bytes)", 413, meta['offset'])
+
+            digest = hashlib.sha256()
+            written = 0
+            with open(self._data_path(session_id), 'r+b') as f:
+                f.seek(offset)
+                try:
+                    while written < length:
+                        block = stream.read(min(CHUNK_SIZE, length - written))
+                        if not block:
+                            raise UploadSessionError('Chunk body shorter than Content-Length', 400, offset)
+                        digest.update(block)
+                        f.write(block)
+                        written += len(block)
+                    if digest.hexdigest() != checksum.strip().lower():
+                        self._count('checksum_failures')
+                        raise UploadSessionError('Chunk checksum mismatch', 422, offset)
+                except BaseException:
+                    # Bad or interrupted chunk: drop whatever part of it was written
+                    f.truncate(offset)
+                    raise
+
+            meta['offset'] = offset + length
+            meta['updated_at'] = time.time()
+            self._save(meta)
+        self._count('chunks')
+        return self._public(meta)
+
+    def finalize(self, session_id, incoming_dir, sha256=None):
+        """
+        Close the session and return its data as an IngestedFile in
+        incoming_dir (hashed in one streaming pass). A whole-file `sha256`,
+        if given, must match.
+        """
+        with self._locked(session_id):
+            meta = self._load(session_id)
+            if meta['size'] is not None and meta['offset'] != meta['size']:
+                raise UploadSessionError(f"Upload incomplete: {meta['offset']} of {meta['size']} bytes",
+                                         409, meta['offset'])
+            if meta['offset'] == 0:
+                raise UploadSessionError('Upload is empty', 400, 0)
+
+            digest = hashlib.sha256()
+            with open(self._data_path(session_id), 'rb') as f:
+                for block in iter(lambda: f.read(CHUNK_SIZE), b''):
+                    digest.update(block)
+            if sha256 and digest.hexdigest() != sha256.strip().lower():
+                raise UploadSessionError('File checksum mismatch', 422, meta['offset'])
+
+            ingested = IngestedFile(self._data_path(session_id), meta['offset'], digest.hexdigest())
+            ingested.move_to(os.path.join(incoming_dir, f"session.{session_id}.tmp"))
+            self._remove(session_id)
+        self._count('finalized')
+        return ingested, meta['filename']
+
+    def cancel(self, session_id):
+        with self._locked(session_id):
+            self._load(session_id)
+            self._remove(session_id)
+
+    def expire(self):
+        """
+        Drop sessions idle for longer than the TTL. A session is only removed
+        under its lock, after checking again that no chunk arrived meanwhile.
+        """
+        cutoff = time.time() - self.ttl
+        stale = []
+        with os.scandir(self.root) as entries:
+            for entry in entries:
+                try:
+                    if entry.name.endswith('.json') and entry.stat().st_mtime < cutoff:
+                        stale.append(entry.name[:-5])
+                except FileNotFoundError:
+                    pass
+        expired = 0
+        for session_id in stale:
+            with self._locked(session_id):
+                try:
+                    if os.stat(self._meta_path(session_id)).st_mtime >= time.time() - self.ttl:
+                        continue
+                except FileNotFoundError:
+                    continue
+                self._remove(session_id)
+            self._count('expired')
+            expired += 1
+        return expired
+
+    def stats(self):
+        with self._locks_guard:
+            counters = dict(self._counters)
+        sessions, reserved = self._usage()
+        return {**counters, 'open': sessions, 'reserved_bytes': reserved, 'max_sessions': self.max_sessions,
+                'max_total_bytes': self.max_total_bytes, 'ttl': self.ttl, 'chunk_max_bytes': self.chunk_max_bytes}
+
+    def _usage(self):
+        """
+        (open sessions, bytes they reserve), read from the metadata on disk so
+        every worker process sees the same totals. Idle sessions don't count.
+        """
+        cutoff = time.time() - self.ttl
+        sessions = reserved = 0
+        with os.scandir(self.root) as entries:
+            for entry in entries:
+                if not entry.name.endswith('.json'):
+                    continue
+                try:
+                    if entry.stat().st_mtime < cutoff:
+                        continue
+                    with open(entry.path, 'r', encoding='utf-8') as f:
+                        size = json.load(f).get('size')
+                except (OSError, ValueError):
+                    continue
+                sessions += 1
+                reserved += size if size is not None else self.max_bytes
+        return sessions, reserved
+
+    def _public(self, meta):
+        return {
+            'session_id': meta['id'],
+            'filename': meta['filename'],
+            'size': meta['size'],
+            'offset': meta['offset'],
+            'expires_at': meta['updated_at'] + self.ttl,
+            'chunk_max_bytes': self.chunk_max_bytes,
+        }
+
+    def _count(self, name):
+        with self._locks_guard:
+            self._counters[name] += 1
+
+    @contextmanager
+    def _locked(self, session_id):
+        # The lock is dropped from the table only when nobody holds or waits
+        # for it, so a concurrent request can never end up with a fresh one
+        with self._locks_guard:
+            entry = self._locks.setdefault(session_id, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._locks_guard:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._locks[session_id]
+
+    def _data_path(self, session_id):
+        return os.path.join(self.root, f"{session_id}.part")
+
+    def _meta_path(self, session_id):
+        return os.path.join(self.root, f"{session_id}.json")
+
+    def _load(self, session_id):
+        if not SESSION_ID.match(session_id or ''):
+            raise UploadSessionError('Upload session not found', 404)
+        try:
+            with open(self._meta_path(session_id), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (FileNotFoundError, ValueError):
+            raise UploadSessionError('Upload session not found', 404)
+        if meta['updated_at'] < time.time() - self.ttl:
+            self._remove(session_id)
+            raise UploadSessionError('Upload session expired', 404)
+        return meta
+
+    def _save(self, meta):
+        path = self._meta_path(meta['id'])
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, path)
+
+    def _remove(self, session_id):
+        for path in (self._data_path(session_id), self._meta_path(session_id)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,265 @@
+import heapq
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class UploadRetention:
+    """
+    Keeps a content-addressed upload folder (AudioStore layout: <root>/<aa>/<id>.<ext>)
+    under a total size and a maximum idle age.
+
+    Size and last access of every file are kept in memory. A background
+    thread rescans one shard directory per tick, so each file is revisited
+    once per cycle and no pass walks the whole tree. Files idle for longer
+    than max_age are removed as their shard comes up; while the total is over
+    max_bytes the least recently accessed files go first. Access times are
+    written to the file's atime, so several worker processes (and restarts)
+    agree on them. `on_cycle` callables run at the start of every cycle, for
+    other periodic cleanup that should share the thread.
+    """
+
+    def __init__(self, root, max_bytes=None, max_age=None, interval=1.0, max_deletes=100,
+                 incoming_dir=None, incoming_max_age=3600, touch_interval=60, on_cycle=()):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.interval = interval
+        self.max_deletes = max_deletes
+        self.incoming_dir = incoming_dir
+        self.incoming_max_age = incoming_max_age
+        self.touch_interval = touch_interval
+        self.on_cycle = list(on_cycle)
+
+        self._files = {}  # path -> [size, last_access]
+        self._by_shard = {}  # shard dir -> set of paths
+        self._total = 0
+        self._lock = threading.Lock()
+        self._shards = []
+        self._next_shard = 0
+        self._indexed = False  # True after the first full cycle
+        self._thread = None
+        self._stop = threading.Event()
+
+        self._counters = {
+            'passes': 0,
+            'cycles': 0,
+            'deleted_age': 0,
+            'deleted_quota': 0,
+            'deleted_incoming': 0,
+            'freed_bytes': 0,
+        }
+        self.last_pass_ms = None
+
+    def record(self, path, size):
+        """
+        A file was stored (or uploaded again): count it and mark it accessed now.
+        """
+        with self._lock:
+            self._set(path, size, time.time())
+        self._write_atime(path)
+
+    def touch(self, path):
+        """
+        A file was read. The atime is rewritten at most once per touch_interval.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._files.get(path)
+            if entry is not None:
+                if now - entry[1] < self.touch_interval:
+                    return
+                entry[1] = now
+        if entry is None:
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                return
+            with self._lock:
+                self._set(path, size, now)
+        self._write_atime(path)
+
+    def run_once(self):
+        """
+        One incremental pass: rescan the next shard, then evict down to the quota.
+        """
+        started = time.perf_counter()
+        if self._next_shard >= len(self._shards):
+            self._start_cycle()
+        if self._shards:
+            self._scan_shard(self._shards[self._next_shard])
+            self._next_shard += 1
+        if self.max_bytes:
+            self._enforce_quota()
+        with self._lock:
+            self._counters['passes'] += 1
+        self.last_pass_ms = round((time.perf_counter() - started) * 1000, 2)
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='upload-retention', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+            files = len(self._files)
+            total = self._total
+        return {
+            **counters,
+            'files': files,
+            'bytes': total,
+            'max_bytes': self.max_bytes,
+            'max_age': self.max_age,
+            'usage_ratio': round(total / self.max_bytes, 4) if self.max_bytes else None,
+            'indexed': self._indexed,
+            'last_pass_ms': self.last_pass_ms,
+        }
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.warning(f"Upload retention pass failed: {e}")
+            # The first cycle builds the index back to back; after that one shard per tick
+            if self._stop.wait(self.interval if self._indexed else 0.01):
+                return
+
+    def _set(self, path, size, accessed):
+        # Caller holds self._lock
+        entry = self._files.get(path)
+        if entry is not None:
+            self._total -= entry[0]
+        else:
+            self._by_shard.setdefault(os.path.dirname(path), set()).add(path)
+        self._files[path] = [size, accessed]
+        self._total += size
+
+    def _forget(self, path):
+        # Caller holds self._lock
+        entry = self._files.pop(path, None)
+        if entry is not None:
+            self._total -= entry[0]
+            self._by_shard.get(os.path.dirname(path), set()).discard(path)
+        return entry
+
+    @staticmethod
+    def _write_atime(path):
+        try:
+            st = os.stat(path)
+            os.utime(path, ns=(time.time_ns(), st.st_mtime_ns))
+        except OSError:
+            pass
+
+    def _start_cycle(self):
+        if self._shards:
+            with self._lock:
+                self._counters['cycles'] += 1
+            self._indexed = True
+        try:
+            with os.scandir(self.root) as entries:
+                self._shards = sorted(e.path for e in entries if e.is_dir() and len(e.name) == 2)
+        except FileNotFoundError:
+            self._shards = []
+        self._next_shard = 0
+        self._clean_incoming()
+        for hook in self.on_cycle:
+            try:
+                hook()
+            except Exception as e:
+                logger.warning(f"Upload retention hook {getattr(hook, '__name__', hook)} failed: {e}")
+
+    def _scan_shard(self, shard):
+        now = time.time()
+        seen = set()
+        try:
+            with os.scandir(shard) as entries:
+                for entry in entries:
+                    if not entry.is_file() or entry.name.endswith('.tmp'):
+                        continue
+                    try:
+                        st = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    seen.add(entry.path)
+                    with self._lock:
+                        known = self._files.get(entry.path)
+                        accessed = max(st.st_atime, known[1] if known else 0)
+                        self._set(entry.path, st.st_size, accessed)
+                    if self.max_age and now - accessed > self.max_age:
+                        self._delete(entry.path, 'deleted_age')
+        except FileNotFoundError:
+            pass
+        # Files removed behind our back (another worker, an operator)
+        with self._lock:
+            gone = self._by_shard.get(shard, set()) - seen
+        for path in gone:
+            if not os.path.exists(path):
+                with self._lock:
+                    self._forget(path)
+
+    def _enforce_quota(self):
+        with self._lock:
+            excess = self._total - self.max_bytes
+            if excess <= 0:
+                return
+            candidates = heapq.nsmallest(self.max_deletes, self._files.items(), key=lambda item: item[1][1])
+        for path, (size, accessed) in candidates:
+            if excess <= 0:
+                break
+            try:
+                atime = os.stat(path).st_atime
+            except FileNotFoundError:
+                with self._lock:
+                    self._forget(path)
+                continue
+            if atime > accessed + 1:
+                # Read since we indexed it (possibly by another worker): keep it
+                with self._lock:
+                    if path in self._files:
+                        self._files[path][1] = atime
+                continue
+            if self._delete(path, 'deleted_quota'):
+                excess -= size
+
+    def _delete(self, path, reason):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Could not remove upload {path}: {e}")
+            return False
+        with self._lock:
+            entry = self._forget(path)
+            self._counters[reason] += 1
+            if entry is not None:
+                self._counters['freed_bytes'] += entry[0]
+        return True
+
+    def _clean_incoming(self):
+        # Temp files left behind by interrupted ingests
+        if not self.incoming_dir:
+            return
+        cutoff = time.time() - self.incoming_max_age
+        try:
+            with os.scandir(self.incoming_dir) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_file() and entry.stat().st_mtime < cutoff:
+                            os.remove(entry.path)
+                            with self._lock:
+                                self._counters['deleted_incoming'] += 1
+                    except OSError:
+                        pass
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,134 @@
+import hashlib
+import io
+import os
+import threading
+import time
+
+import pytest
+
+from services.resumable_upload import UploadSessionError, UploadSessions
+from services.upload_retention import UploadRetention
+
+DATA = os.urandom(3000)
+
+
+def sha(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def put(sessions, session_id, offset, data, checksum=None):
+    return sessions.write_chunk(session_id, offset, io.BytesIO(data), len(data), checksum or sha(data))
+
+
+@pytest.fixture
+def sessions(tmp_path):
+    return UploadSessions(str(tmp_path / '.sessions'), max_bytes=len(DATA), chunk_max_bytes=2000)
+
+
+def test_chunks_resume_and_finalize(sessions, tmp_path):
+    session_id = sessions.create('talk.webm', len(DATA))['session_id']
+    put(sessions, session_id, 0, DATA[:2000])
+    assert sessions.status(session_id)['offset'] == 2000
+    put(sessions, session_id, 2000, DATA[2000:])
+
+    ingested, filename = sessions.finalize(session_id, str(tmp_path / '.incoming'), sha(DATA))
+    assert filename == 'talk.webm'
+    assert ingested.sha256 == sha(DATA)
+    with ingested.open() as f:
+        assert f.read() == DATA
+    assert sessions.stats()['finalized'] == 1
+    assert sessions._locks == {}
+
+
+def test_wrong_offset_is_409_with_resume_offset(sessions):
+    session_id = sessions.create('talk.webm', len(DATA))['session_id']
+    put(sessions, session_id, 0, DATA[:1000])
+    with pytest.raises(UploadSessionError) as e:
+        put(sessions, session_id, 0, DATA[:1000])
+    assert (e.value.status_code, e.value.offset) == (409, 1000)
+
+    with pytest.raises(UploadSessionError) as e:
+        sessions.finalize(session_id, '/unused')
+    assert (e.value.status_code, e.value.offset) == (409, 1000)
+
+
+def test_bad_checksum_is_422_and_drops_the_chunk(sessions):
+    session_id = sessions.create('talk.webm')['session_id']
+    with pytest.raises(UploadSessionError) as e:
+        put(sessions, session_id, 0, DATA[:1000], checksum=sha(b'other'))
+    assert (e.value.status_code, e.value.offset) == (422, 0)
+    assert sessions.status(session_id)['offset'] == 0
+    assert os.path.getsize(sessions._data_path(session_id)) == 0
+    assert sessions.stats()['checksum_failures'] == 1
+
+
+def test_size_limits(sessions):
+    with pytest.raises(UploadSessionError) as e:
+        sessions.create('talk.webm', len(DATA) + 1)
+    assert e.value.status_code == 413
+
+    session_id = sessions.create('talk.webm')['session_id']
+    put(sessions, session_id, 0, DATA[:2000])
+    with pytest.raises(UploadSessionError) as e:
+        put(sessions, session_id, 2000, DATA[:1500])
+    assert e.value.status_code == 413
+
+
+def test_cancel_while_a_chunk_is_written_waits_for_it(sessions):
+    session_id = sessions.create('talk.webm')['session_id']
+    release = threading.Event()
+
+    class SlowStream(io.BytesIO):
+        def read(self, size=-1):
+            release.wait(5)
+            return super().read(size)
+
+    writer = threading.Thread(target=sessions.write_chunk,
+                              args=(session_id, 0, SlowStream(DATA[:100]), 100, sha(DATA[:100])))
+    writer.start()
+    time.sleep(0.05)
+    canceller = threading.Thread(target=sessions.cancel, args=(session_id,))
+    canceller.start()
+    time.sleep(0.05)
+    assert canceller.is_alive()  # same lock as the writer, even though cancel() removes the session
+    release.set()
+    writer.join()
+    canceller.join()
+
+    with pytest.raises(UploadSessionError):
+        sessions.status(session_id)
+    assert sessions._locks == {}
+
+
+def test_retention_cycle_expires_idle_sessions(tmp_path):
+    sessions = UploadSessions(str(tmp_path / '.sessions'), max_bytes=len(DATA), ttl=60)
+    idle = sessions.create('old.webm')['session_id']
+    active = sessions.create('new.webm')['session_id']
+    old = time.time() - 120
+    os.utime(sessions._meta_path(idle), (old, old))
+
+    retention = UploadRetention(str(tmp_path), on_cycle=[sessions.expire])
+    retention.run_once()
+
+    assert sessions.stats()['expired'] == 1
+    assert not os.path.exists(sessions._data_path(idle))
+    assert sessions.status(active)['offset'] == 0
+
+
+def test_open_sessions_and_reserved_bytes_are_capped(tmp_path):
+    sessions = UploadSessions(str(tmp_path / '.sessions'), max_bytes=1000, max_sessions=3, max_total_bytes=2500)
+    first = sessions.create('a.webm', 1000)['session_id']
+    sessions.create('b.webm')  # no declared size: reserves max_bytes
+    with pytest.raises(UploadSessionError) as e:
+        sessions.create('c.webm', 600)
+    assert e.value.status_code == 507
+    sessions.create('c.webm', 500)
+    with pytest.raises(UploadSessionError) as e:
+        sessions.create('d.webm', 1)
+    assert e.value.status_code == 429
+
+    sessions.cancel(first)
+    sessions.create('d.webm', 1)
+    stats = sessions.stats()
+    assert (stats['open'], stats['reserved_bytes']) == (3, 1501)
+    assert (stats['rejected_sessions'], stats['rejected_bytes']) == (1, 1)
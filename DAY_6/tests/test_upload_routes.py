@@ -0,0 +1,40 @@
+import os
+
+import pytest
+
+pytest.importorskip('assemblyai')
+os.environ.setdefault('ASSEMBLYAI_API_KEY', 'test')
+
+import app as stt_app  # noqa: E402
+from services.audio_store import AudioStore  # noqa: E402
+from services.resumable_upload import UploadSessions  # noqa: E402
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.setattr(stt_app, 'upload_store', AudioStore(str(tmp_path / 'uploads')))
+    monkeypatch.setattr(stt_app, 'upload_sessions', UploadSessions(str(tmp_path / 'sessions'), max_bytes=1000))
+    monkeypatch.setattr(stt_app, 'UPLOAD_INCOMING_FOLDER', str(tmp_path / 'incoming'))
+    return stt_app.app.test_client()
+
+
+def test_failed_transcription_on_finalize_can_be_retried_from_the_stored_file(client, monkeypatch):
+    import hashlib
+
+    def failing(path, size):
+        raise RuntimeError('upstream down')
+
+    monkeypatch.setattr(stt_app, 'transcribe_path', failing)
+    session = client.post('/upload-sessions', json={'filename': 'talk.webm', 'size': 5}).get_json()
+    client.put(session['url'], data=b'hello', headers={'Upload-Offset': '0',
+                                                      'X-Chunk-SHA256': hashlib.sha256(b'hello').hexdigest()})
+    response = client.post(session['url'] + '/finalize', json={})
+    assert response.status_code == 500
+    retry_url = response.get_json()['retry_url']
+    assert client.post(session['url'] + '/finalize', json={}).status_code == 404
+
+    monkeypatch.setattr(stt_app, 'transcribe_path', lambda path, size: type('T', (), {'text': f'{size} bytes'}))
+    body = client.post(retry_url).get_json()
+    assert body['success'] and body['transcript'] == '5 bytes'
+    assert retry_url == f"/uploads/{body['id']}/transcribe"
+    assert client.post('/uploads/' + 'f' * 64 + '/transcribe').status_code == 404
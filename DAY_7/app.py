@@ -1,20 +1,70 @@
 import os
+import json
+import logging
 import time
+import asyncio
 import requests
-from fastapi import FastAPI, File, UploadFile, HTTPException, Request
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel
 from dotenv import load_dotenv
 
+from services import metrics, structured_log
+from services.audio_stitch import strip_id3
+from services.audio_store import AudioStore
+from services.file_delivery import FileDelivery
+from services.structured_log import log_event, request_logging_middleware
+from services.text_chunker import split_sentences, split_text
+from services.upload_ingest import MaxBodySizeMiddleware, UploadTooLarge, ingest_multipart
+
 # Load environment variables (.env file)
 load_dotenv()
 ASSEMBLY_API_KEY = os.getenv("ASSEMBLYAI_API_KEY")
 MURF_API_KEY = os.getenv("MURF_API_KEY")
+MURF_API_URL = os.getenv("MURF_API_URL", "https://api.murf.ai/v1/speech/generate")
+ASSEMBLYAI_BASE_URL = os.getenv("ASSEMBLYAI_BASE_URL", "https://api.assemblyai.com").rstrip("/")
+TTS_STREAM_PARALLELISM = int(os.getenv("TTS_STREAM_PARALLELISM", 4))
+TTS_STREAM_CHUNK_CHARS = int(os.getenv("TTS_STREAM_CHUNK_CHARS", 300))
+# Voice used when a request does not name one (the page leaves it to the server)
+DEFAULT_VOICE_ID = os.getenv("MURF_DEFAULT_VOICE", "en-US-natalie")
+
+# JSON logs written by a background thread; request handlers never block on them
+structured_log.setup_logging(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    verbose_sample_rate=float(os.getenv("LOG_VERBOSE_SAMPLE_RATE", 0.01)),
+    queue_size=int(os.getenv("LOG_QUEUE_SIZE", 10000))
+)
+logger = logging.getLogger("voice_agent")
+
+# Keep-alive session shared by the streaming TTS helpers
+murf_session = requests.Session()
+
+# Optional local copy of Murf audio, served at /audio/{audio_id}
+TTS_STORE_AUDIO = os.getenv("TTS_STORE_AUDIO", "False").lower() == "true"
+AUDIO_CACHE_MAX_AGE = int(os.getenv("AUDIO_CACHE_MAX_AGE", 31536000))
+AUDIO_FOLDER = os.path.join(os.path.dirname(__file__), "audio")
+audio_store = AudioStore(AUDIO_FOLDER)
+# FILE_OFFLOAD=x-accel-redirect (nginx) or x-sendfile (Apache) hands the body to the front proxy
+audio_delivery = FileDelivery(
+    AUDIO_FOLDER,
+    f"public, max-age={AUDIO_CACHE_MAX_AGE}, immutable",
+    offload=os.getenv("FILE_OFFLOAD", "").lower(),
+    offload_prefix=os.getenv("AUDIO_OFFLOAD_PREFIX", "/_protected/audio/")
+)
+
+# Recordings are streamed to disk in chunks (async file I/O) and handed on as
+# file handles; bodies over the limit get 413 before they are parsed
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", 25 * 1024 * 1024))
+UPLOAD_INCOMING_FOLDER = os.path.join(os.path.dirname(__file__), "uploads", ".incoming")
 
 # Ensure you're running from the folder that contains 'static/' and 'templates/'
 app = FastAPI()
+app.add_middleware(MaxBodySizeMiddleware, max_bytes=UPLOAD_MAX_BYTES, paths=["/tts/echo", "/transcribe/file"])
+app.middleware("http")(request_logging_middleware(logger))
+metrics.init_asgi(app)
 app.mount("/static", StaticFiles(directory="static"), name="static")
 templates = Jinja2Templates(directory="templates")
 
@@ -25,22 +75,32 @@ class EchoResponse(BaseModel):
     message: str
 
 # AssemblyAI transcription helper
-def transcribe_audio_assemblyai(audio_data: bytes, api_key: str):
-    upload_url = "https://api.assemblyai.com/v2/upload"
+def transcribe_audio_assemblyai(audio_data, api_key: str):
+    """
+    audio_data: bytes, or a binary file object that is streamed to AssemblyAI from disk
+    """
+    upload_url = f"{ASSEMBLYAI_BASE_URL}/v2/upload"
     headers = {"authorization": api_key}
-    upload_res = requests.post(upload_url, headers=headers, data=audio_data)
+    if isinstance(audio_data, (bytes, bytearray)):
+        size = len(audio_data)
+    else:
+        size = os.fstat(audio_data.fileno()).st_size
+    with metrics.upstream_call("assemblyai", "upload") as call:
+        upload_res = call.record(requests.post(upload_url, headers=headers, data=audio_data), size)
     if upload_res.status_code != 200:
         raise Exception(f"Upload failed: {upload_res.text}")
     audio_url = upload_res.json()["upload_url"]
 
-    transcript_endpoint = "https://api.assemblyai.com/v2/transcript"
-    trans_res = requests.post(transcript_endpoint, headers=headers, json={"audio_url": audio_url})
+    transcript_endpoint = f"{ASSEMBLYAI_BASE_URL}/v2/transcript"
+    with metrics.upstream_call("assemblyai", "transcript") as call:
+        trans_res = call.record(requests.post(transcript_endpoint, headers=headers, json={"audio_url": audio_url}))
     if trans_res.status_code != 200:
         raise Exception(f"Transcription request failed: {trans_res.text}")
     trans_id = trans_res.json()["id"]
 
     while True:
-        poll_res = requests.get(f"{transcript_endpoint}/{trans_id}", headers=headers).json()
+        with metrics.upstream_call("assemblyai", "poll") as call:
+            poll_res = call.record(requests.get(f"{transcript_endpoint}/{trans_id}", headers=headers)).json()
         if poll_res["status"] == "completed":
             return poll_res["text"]
         elif poll_res["status"] == "error":
@@ -80,22 +140,164 @@ async def tts(req: dict):
     # This just returns a sample file.
     return JSONResponse({"audio_url": "https://www.soundhelix.com/examples/mp3/SoundHelix-Song-1.mp3"})
 
+# Streaming TTS helpers
+def synthesize_sentence(text: str, voice_id: str) -> bytes:
+    headers = {
+        "api-key": MURF_API_KEY,
+        "Accept": "application/json",
+        "Content-Type": "application/json",
+    }
+    payload = {
+        "voiceId": voice_id,
+        "style": "Conversational",
+        "text": text,
+        "format": "MP3",
+        "sampleRate": 44100,
+        "effect": "none",
+    }
+    with metrics.upstream_call("murf", "generate") as call:
+        murf_response = call.record(murf_session.post(MURF_API_URL, headers=headers, json=payload, timeout=30))
+    if murf_response.status_code != 200:
+        raise Exception(f"Murf TTS failed: {murf_response.status_code} {murf_response.text}")
+    audio_url = murf_response.json().get("audioFile", "")
+    if not audio_url:
+        raise Exception("No audioFile URL in Murf response")
+    with metrics.upstream_call("murf", "audio") as call:
+        audio_res = call.record(murf_session.get(audio_url, timeout=30))
+    audio_res.raise_for_status()
+    return audio_res.content
+
+async def stream_sentence_audio(text: str, voice_id: str):
+    """
+    Yield MP3 audio sentence by sentence, in order, with up to
+    TTS_STREAM_PARALLELISM sentences synthesizing ahead of the one being sent.
+    """
+    # One Murf call per sentence; sentences over the limit are split further
+    sentences = [chunk for sentence in split_sentences(" ".join(text.split()))
+                 for chunk in split_text(sentence, TTS_STREAM_CHUNK_CHARS)]
+    semaphore = asyncio.Semaphore(TTS_STREAM_PARALLELISM)
+
+    async def run(sentence):
+        async with semaphore:
+            return await run_in_threadpool(synthesize_sentence, sentence, voice_id)
+
+    tasks = [asyncio.create_task(run(sentence)) for sentence in sentences]
+    try:
+        for index, task in enumerate(tasks):
+            audio = await task
+            yield audio if index == 0 else strip_id3(audio)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+@app.post("/tts/stream")
+async def tts_stream(req: dict):
+    """
+    Body: { "text": str, "voice_id": str }
+    Returns: audio/mpeg stream (chunked), one sentence at a time
+    """
+    text = req.get("text")
+    if text is not None and not isinstance(text, str):
+        raise HTTPException(400, 'Expected {"text": str, "voice_id": str}')
+    if not MURF_API_KEY:
+        raise HTTPException(500, "API keys not configured")
+    text = (text or "").strip()
+    if not text:
+        raise HTTPException(400, "Text cannot be empty")
+    parts = stream_sentence_audio(text, req.get("voice_id") or DEFAULT_VOICE_ID)
+    # Wait for the first sentence so a failure still returns a proper error
+    try:
+        first = await parts.__anext__()
+    except StopAsyncIteration:
+        raise HTTPException(400, "Text cannot be empty")
+    except Exception as e:
+        await parts.aclose()
+        log_event(logger, logging.WARNING, "tts_stream_failed", error=str(e))
+        raise HTTPException(502, f"Murf TTS failed: {str(e)}")
+
+    async def body():
+        yield first
+        try:
+            async for part in parts:
+                yield part
+        except Exception as e:
+            # Headers are already sent; end the stream early and log it
+            log_event(logger, logging.ERROR, "tts_stream_aborted", error=str(e))
+
+    return StreamingResponse(body(), media_type="audio/mpeg", headers={"Cache-Control": "no-store"})
+
+@app.websocket("/ws/tts")
+async def tts_websocket(websocket: WebSocket):
+    """
+    Send { "text": str, "voice_id": str } as JSON; receive one binary MP3
+    message per sentence in order, then { "event": "done" }.
+    """
+    await websocket.accept()
+    try:
+        while True:
+            try:
+                req = json.loads(await websocket.receive_text())
+            except ValueError:
+                await websocket.send_json({"event": "error", "error": "Message must be JSON"})
+                continue
+            if not isinstance(req, dict) or not isinstance(req.get("text") or "", str):
+                await websocket.send_json({"event": "error", "error": 'Expected {"text": str, "voice_id": str}'})
+                continue
+            text = (req.get("text") or "").strip()
+            if not text or not MURF_API_KEY:
+                await websocket.send_json({"event": "error", "error": "API keys not configured" if text else "Text cannot be empty"})
+                continue
+            try:
+                async for part in stream_sentence_audio(text, req.get("voice_id") or DEFAULT_VOICE_ID):
+                    await websocket.send_bytes(part)
+                await websocket.send_json({"event": "done"})
+            except WebSocketDisconnect:
+                raise
+            except Exception as e:
+                log_event(logger, logging.WARNING, "ws_tts_failed", error=str(e))
+                await websocket.send_json({"event": "error", "error": str(e)})
+    except WebSocketDisconnect:
+        pass
+
+async def ingest_audio_part(request, field):
+    """
+    The `field` file part of a multipart request, parsed from the raw body
+    straight into the incoming folder (UploadFile would spool it to disk first
+    and be copied again). Returns (IngestedFile, content_type).
+    """
+    try:
+        part = await ingest_multipart(request, field, UPLOAD_INCOMING_FOLDER, UPLOAD_MAX_BYTES)
+    except UploadTooLarge as e:
+        raise HTTPException(413, str(e))
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    if part is None:
+        raise HTTPException(400, f"No {field} file part")
+    ingested, _, content_type = part
+    return ingested, content_type
+
 @app.post("/tts/echo", response_model=EchoResponse)
-async def tts_echo(file: UploadFile = File(...)):
+async def tts_echo(request: Request):
+    """
+    Multipart body with the recording in the "file" part.
+    """
     if not MURF_API_KEY or not ASSEMBLY_API_KEY:
         raise HTTPException(500, "API keys not configured")
     allowed_types = [
         "audio/webm", "audio/wav", "audio/mp3", "audio/mpeg", "audio/ogg", "audio/m4a"
     ]
-    if file.content_type not in allowed_types:
+    ingested, content_type = await ingest_audio_part(request, "file")
+    if content_type not in allowed_types:
+        ingested.discard()
         raise HTTPException(400, f"Invalid file type. Allowed: {allowed_types}")
 
-    audio_data = await file.read()
-    if not audio_data:
-        raise HTTPException(400, "Empty audio file")
-
-    transcript = transcriber.transcribe(audio_data)
+    with ingested:
+        if not ingested.size:
+            raise HTTPException(400, "Empty audio file")
+        with ingested.open() as audio_file:
+            transcript = await run_in_threadpool(transcriber.transcribe, audio_file)
     if transcript.error:
+        log_event(logger, logging.WARNING, "transcription_failed", error=transcript.error)
         raise HTTPException(500, f"Transcription failed: {transcript.error}")
 
     transcribed_text = transcript.text or "[No speech detected]"
@@ -103,14 +305,13 @@ async def tts_echo(file: UploadFile = File(...)):
     if not transcript.text or transcript.text.strip() == "":
         return EchoResponse(audio_url="", transcription="[No speech detected]", message="No speech detected in audio")
 
-    murf_url = "https://api.murf.ai/v1/speech/generate"
     headers = {
         "api-key": MURF_API_KEY,
         "Accept": "application/json",
         "Content-Type": "application/json",
     }
     payload = {
-        "voiceId": "en-US-natalie",
+        "voiceId": DEFAULT_VOICE_ID,
         "style": "Conversational",
         "text": transcribed_text,
         "format": "MP3",
@@ -118,9 +319,14 @@ async def tts_echo(file: UploadFile = File(...)):
         "effect": "none",
     }
     try:
-        murf_response = requests.post(murf_url, headers=headers, json=payload, timeout=60)
+        with metrics.upstream_call("murf", "generate") as call:
+            murf_response = call.record(requests.post(MURF_API_URL, headers=headers, json=payload, timeout=60))
     except Exception as e:
+        log_event(logger, logging.WARNING, "murf_network_error", error=str(e))
         raise HTTPException(500, f"Murf API request failed: {str(e)}")
+    log_event(logger, logging.INFO, "murf_response", status=murf_response.status_code, characters=len(transcribed_text))
+    if logger.isEnabledFor(logging.DEBUG) and structured_log.sample_verbose():
+        log_event(logger, logging.DEBUG, "murf_response_detail", headers=dict(murf_response.headers), body=murf_response.text)
     if murf_response.status_code != 200:
         raise HTTPException(murf_response.status_code, f"Murf TTS failed: {murf_response.text}")
     murf_data = murf_response.json()
@@ -128,20 +334,46 @@ async def tts_echo(file: UploadFile = File(...)):
     if not audio_url:
         raise HTTPException(500, "No audioFile URL in Murf response")
 
+    if TTS_STORE_AUDIO:
+        try:
+            with metrics.upstream_call("murf", "audio") as call:
+                audio_id = await run_in_threadpool(audio_store.fetch_url, audio_url, murf_session, "mp3")
+                call.status = 200
+            audio_url = f"/audio/{audio_id}"
+        except Exception as e:
+            # fall back to the Murf URL
+            log_event(logger, logging.WARNING, "audio_store_failed", error=str(e))
+
     return EchoResponse(
         audio_url=audio_url,
         transcription=transcribed_text,
         message="Echo generated successfully with Murf voice!"
     )
 
+@app.get("/audio/{audio_id}")
+async def stored_audio(audio_id: str, request: Request):
+    """
+    Locally stored audio by content hash, with Range support, a strong ETag
+    and Last-Modified revalidation.
+    """
+    path = audio_store.path_for(audio_id)
+    if not path:
+        raise HTTPException(404, "Audio not found")
+    return audio_delivery.asgi_response(request, path, audio_id, AudioStore.mimetype_for(path))
+
 @app.post("/transcribe/file")
-async def transcribe_file(audio: UploadFile = File(...)):
+async def transcribe_file(request: Request):
     """
-    Uploads audio to AssemblyAI and returns transcription.
+    Uploads audio (multipart "audio" part) to AssemblyAI and returns transcription.
     """
     try:
-        audio_data = await audio.read()
-        text = transcribe_audio_assemblyai(audio_data, ASSEMBLY_API_KEY)
+        ingested, _ = await ingest_audio_part(request, "audio")
+    except HTTPException as e:
+        return JSONResponse({"success": False, "error": e.detail}, status_code=e.status_code)
+    try:
+        with ingested, ingested.open() as audio_file:
+            text = await run_in_threadpool(transcribe_audio_assemblyai, audio_file, ASSEMBLY_API_KEY)
         return JSONResponse({"success": True, "transcript": text})
     except Exception as e:
+        log_event(logger, logging.WARNING, "transcription_failed", error=str(e))
         return JSONResponse({"success": False, "error": str(e)})
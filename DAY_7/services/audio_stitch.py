@@ -0,0 +1,80 @@
+import struct
+
+STITCHABLE_FORMATS = {'MP3', 'WAV'}
+
+
+def strip_id3(data):
+    """
+    Remove ID3v2/ID3v1 tags so MP3 frame data can be appended to a stream.
+    """
+    # ID3v2 header at the front: "ID3", version(2), flags(1), syncsafe size(4)
+    if data[:3] == b'ID3' and len(data) >= 10:
+        size = 0
+        for byte in data[6:10]:
+            size = (size << 7) | (byte & 0x7F)
+        footer = 10 if data[5] & 0x10 else 0
+        data = data[10 + size + footer:]
+    # ID3v1 tag: last 128 bytes starting with "TAG"
+    if len(data) >= 128 and data[-128:-125] == b'TAG':
+        data = data[:-128]
+    return data
+
+
+def _stitch_mp3(parts):
+    # MP3 is a sequence of self-contained frames, so the frame data can be
+    # concatenated once the per-file ID3 tags are removed (keep the first).
+    out = bytearray(parts[0])
+    if len(out) >= 128 and out[-128:-125] == b'TAG':
+        del out[-128:]
+    for part in parts[1:]:
+        out += strip_id3(part)
+    return bytes(out)
+
+
+def _parse_wav(data):
+    if data[:4] != b'RIFF' or data[8:12] != b'WAVE':
+        raise ValueError('Not a RIFF/WAVE file')
+    fmt = None
+    frames = None
+    offset = 12
+    while offset + 8 <= len(data):
+        chunk_id, size = struct.unpack('<4sI', data[offset:offset + 8])
+        body = data[offset + 8:offset + 8 + size]
+        if chunk_id == b'fmt ':
+            fmt = body
+        elif chunk_id == b'data':
+            frames = body
+        offset += 8 + size + (size & 1)
+    if fmt is None or frames is None:
+        raise ValueError('WAV file without fmt or data chunk')
+    return fmt, frames
+
+
+def _stitch_wav(parts):
+    fmt, _ = _parse_wav(parts[0])
+    frames = []
+    for part in parts:
+        part_fmt, part_frames = _parse_wav(part)
+        if part_fmt[:16] != fmt[:16]:
+            raise ValueError('WAV chunks use different sample formats')
+        frames.append(part_frames)
+    payload = b''.join(frames)
+    fmt_chunk = b'fmt ' + struct.pack('<I', len(fmt)) + fmt + (b'\x00' if len(fmt) & 1 else b'')
+    data_chunk = b'data' + struct.pack('<I', len(payload)) + payload
+    body = b'WAVE' + fmt_chunk + data_chunk
+    return b'RIFF' + struct.pack('<I', len(body)) + body
+
+
+def stitch_audio(parts, audio_format):
+    """
+    Join audio files of the same format into one. Supports MP3 and WAV;
+    raises ValueError for anything else.
+    """
+    if not parts:
+        raise ValueError('Nothing to stitch')
+    audio_format = audio_format.upper()
+    if audio_format == 'MP3':
+        return _stitch_mp3(parts)
+    if audio_format == 'WAV':
+        return _stitch_wav(parts)
+    raise ValueError(f'Cannot stitch {audio_format} audio; supported: {sorted(STITCHABLE_FORMATS)}')
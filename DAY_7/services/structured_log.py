@@ -0,0 +1,166 @@
+import atexit
+import contextvars
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+# Request ID of the request being handled on this thread / task
+request_id_var = contextvars.ContextVar('request_id', default=None)
+
+_settings = {'verbose_sample_rate': 1.0}
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line: ts, level, logger, message, request_id plus any
+    fields passed as extra={'fields': {...}}.
+    """
+
+    def format(self, record):
+        entry = {
+            'ts': round(record.created, 3),
+            'level': record.levelname.lower(),
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        request_id = getattr(record, 'request_id', None)
+        if request_id:
+            entry['request_id'] = request_id
+        entry.update(getattr(record, 'fields', None) or {})
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class _NonBlockingQueueHandler(QueueHandler):
+    """
+    Enqueues the raw record without formatting it (the listener thread does
+    that) and drops it instead of blocking when the queue is full.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Capture the request ID now; the listener thread has no request context
+        record.request_id = request_id_var.get()
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_handler = None
+_listener = None
+
+
+def setup_logging(level='INFO', verbose_sample_rate=0.01, queue_size=10000, stream=None):
+    """
+    Route the root logger through a bounded in-memory queue to a background
+    thread that writes JSON lines. Safe to call more than once.
+    """
+    global _handler, _listener
+    _settings['verbose_sample_rate'] = verbose_sample_rate
+    root = logging.getLogger()
+    root.setLevel(level)
+    if _handler is not None:
+        return _handler
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JsonFormatter())
+    _handler = _NonBlockingQueueHandler(queue.Queue(maxsize=queue_size))
+    _listener = QueueListener(_handler.queue, output, respect_handler_level=True)
+    _listener.start()
+    root.handlers = [_handler]
+    atexit.register(_stop_listener)
+    # Pre-fork servers (gunicorn --preload) import the app before forking;
+    # the listener thread does not survive fork, so each child starts its own
+    os.register_at_fork(before=_stop_listener, after_in_parent=_start_listener,
+                        after_in_child=lambda: _start_listener(fresh_queue=True))
+    return _handler
+
+
+def _stop_listener():
+    if _listener is not None and _listener._thread is not None:
+        _listener.stop()
+
+
+def _start_listener(fresh_queue=False):
+    global _listener
+    if _handler is None:
+        return
+    if fresh_queue:
+        _handler.queue = queue.Queue(maxsize=_handler.queue.maxsize)
+        _handler.dropped = 0
+    _listener = QueueListener(_handler.queue, *_listener.handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def log_event(logger, level, event, **fields):
+    """
+    Log a structured event; `event` becomes the message, keyword args become fields.
+    """
+    if logger.isEnabledFor(level):
+        logger.log(level, event, extra={'fields': fields})
+
+
+def sample_verbose():
+    """
+    True for the configured share of calls; guard expensive debug payloads with it
+    so they are neither built nor logged for most requests.
+    """
+    rate = _settings['verbose_sample_rate']
+    return rate >= 1 or (rate > 0 and random.random() < rate)
+
+
+def new_request_id(incoming=None):
+    """
+    Use the caller's X-Request-ID if it looks sane, otherwise make one up.
+    """
+    if incoming and len(incoming) <= 128 and incoming.isprintable():
+        return incoming
+    return f"{int(time.time() * 1000):x}-{random.getrandbits(32):08x}"
+
+
+def request_logging_middleware(logger):
+    """
+    ASGI (FastAPI/Starlette) HTTP middleware: assigns the request ID, echoes
+    it as X-Request-ID and logs one "request" record per response.
+    Register with app.middleware('http')(request_logging_middleware(logger)).
+    """
+    async def middleware(request, call_next):
+        request_id = new_request_id(request.headers.get('x-request-id'))
+        token = request_id_var.set(request_id)
+        started = time.perf_counter()
+        try:
+            response = await call_next(request)
+        except Exception:
+            log_event(logger, logging.ERROR, 'request', method=request.method, path=request.url.path,
+                      status=500, duration_ms=round((time.perf_counter() - started) * 1000, 2))
+            raise
+        finally:
+            request_id_var.reset(token)
+        response.headers['X-Request-ID'] = request_id
+        log_event(logger, logging.INFO, 'request', method=request.method, path=request.url.path,
+                  status=response.status_code, duration_ms=round((time.perf_counter() - started) * 1000, 2),
+                  request_id=request_id)
+        return response
+
+    return middleware
+
+
+def stats():
+    return {
+        'queued': _handler.queue.qsize() if _handler else 0,
+        'dropped': _handler.dropped if _handler else 0,
+        'verbose_sample_rate': _settings['verbose_sample_rate'],
+    }
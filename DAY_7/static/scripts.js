@@ -13,10 +13,14 @@ document.addEventListener("DOMContentLoaded", () => {
         return;
       }
       try {
+        // Stream sentence by sentence when the browser can play MP3 via MediaSource
+        if (await playStreamingTTS(text)) return;
+
         const response = await fetch("/tts", {
           method: "POST",
           headers: { "Content-Type": "application/json" },
-          body: JSON.stringify({ text, voice_id: "en-US-ken", format: "mp3" })
+          // No voice_id: the server's default voice applies
+          body: JSON.stringify({ text, format: "mp3" })
         });
 
         const data = await response.json();
@@ -38,6 +42,58 @@ document.addEventListener("DOMContentLoaded", () => {
     });
   }
 
+  // Plays /tts/stream as it arrives; resolves false if streaming isn't supported
+  // or the server can't stream (e.g. no Murf key), so the caller falls back to /tts
+  async function playStreamingTTS(text) {
+    if (!window.MediaSource || !MediaSource.isTypeSupported("audio/mpeg")) {
+      return false;
+    }
+
+    const response = await fetch("/tts/stream", {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ text })
+    });
+
+    if (!response.ok || !response.body) {
+      const data = await response.json().catch(() => ({}));
+      console.warn("Streaming TTS unavailable, falling back to /tts:", data.error || data.detail || response.status);
+      return false;
+    }
+
+    const mediaSource = new MediaSource();
+    audioPlayer.src = URL.createObjectURL(mediaSource);
+    audioPlayerContainer.style.display = "block";
+    await new Promise((resolve) => mediaSource.addEventListener("sourceopen", resolve, { once: true }));
+
+    const sourceBuffer = mediaSource.addSourceBuffer("audio/mpeg");
+    sourceBuffer.mode = "sequence";
+    const reader = response.body.getReader();
+    let started = false;
+
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      await appendToBuffer(sourceBuffer, value);
+      // Start playback as soon as the first sentence is buffered
+      if (!started) {
+        started = true;
+        audioPlayer.play().catch(() => console.log("Auto-play prevented by browser"));
+      }
+    }
+
+    if (mediaSource.readyState === "open") mediaSource.endOfStream();
+    return true;
+  }
+
+  function appendToBuffer(sourceBuffer, chunk) {
+    return new Promise((resolve, reject) => {
+      sourceBuffer.addEventListener("updateend", resolve, { once: true });
+      sourceBuffer.addEventListener("error", reject, { once: true });
+      sourceBuffer.appendBuffer(chunk);
+    });
+  }
+
   // --- Echo Bot v2 Section ---
   let mediaRecorder, audioChunks = [], recordedBlob = null;
 
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The services package is imported as `services.X`, as when the app runs from DAY_7
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,65 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import app as voice_app
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(voice_app, 'MURF_API_KEY', None)
+    with TestClient(voice_app.app) as client:
+        yield client
+
+
+def test_ws_tts_rejects_bad_messages_and_keeps_the_socket(client):
+    with client.websocket_connect('/ws/tts') as ws:
+        ws.send_text('not json')
+        assert ws.receive_json() == {'event': 'error', 'error': 'Message must be JSON'}
+        ws.send_text('[1, 2]')
+        assert ws.receive_json()['event'] == 'error'
+        ws.send_json({'text': 5})
+        assert ws.receive_json()['event'] == 'error'
+        ws.send_json({'text': 'Hello.'})
+        assert ws.receive_json() == {'event': 'error', 'error': 'API keys not configured'}
+
+
+def test_stream_without_key_is_a_plain_error(client):
+    # The page falls back to /tts on any non-OK response
+    response = client.post('/tts/stream', json={'text': 'Hello.'})
+    assert response.status_code == 500
+
+
+def test_stream_rejects_non_string_text(client):
+    assert client.post('/tts/stream', json={'text': 5}).status_code == 400
+
+
+def test_stream_splits_long_sentences(monkeypatch):
+    import asyncio
+
+    calls = []
+    monkeypatch.setattr(voice_app, 'synthesize_sentence', lambda text, voice: calls.append((text, voice)) or b'ID3')
+    monkeypatch.setattr(voice_app, 'TTS_STREAM_CHUNK_CHARS', 20)
+
+    async def collect():
+        return [part async for part in voice_app.stream_sentence_audio('Short one. ' + 'word ' * 10, 'v')]
+
+    asyncio.run(collect())
+    assert [text for text, _ in calls][0] == 'Short one.'
+    assert all(len(text) <= 20 for text, _ in calls)
+
+
+def test_uploads_are_parsed_straight_into_the_incoming_folder(monkeypatch, tmp_path):
+    monkeypatch.setattr(voice_app, 'UPLOAD_INCOMING_FOLDER', str(tmp_path))
+    monkeypatch.setattr(voice_app, 'MURF_API_KEY', 'k')
+    monkeypatch.setattr(voice_app, 'ASSEMBLY_API_KEY', 'k')
+    monkeypatch.setattr(voice_app, 'transcribe_audio_assemblyai', lambda f, key: f.read().decode())
+    client = TestClient(voice_app.app)
+
+    response = client.post('/transcribe/file', files={'audio': ('a.webm', b'hello', 'audio/webm')})
+    assert response.json() == {'success': True, 'transcript': 'hello'}
+    response = client.post('/transcribe/file', files={'other': ('a.webm', b'hello', 'audio/webm')})
+    assert response.status_code == 400 and response.json()['success'] is False
+
+    response = client.post('/tts/echo', files={'file': ('a.txt', b'hello', 'text/plain')})
+    assert response.status_code == 400
+    assert list(tmp_path.iterdir()) == []